@@ -5,90 +5,109 @@ import json
 import os
 from ui.drag_drop import DragDropZone
 from ui.styles import apply_styles
-from utils.json_parser import parse_server_config
-from utils.powershell_manager import publish_to_environment, test_server_connection
+from ui.server_list_model import ServerListModel
+from ui.selection_model import SelectionModel
+from ui.progress_sink import ProgressSink
+from ui.event_channel import TkEventChannel
+from utils.json_parser import parse_server_config, preprocess_json_text
+from utils.app_publisher import AppPublisher
 from utils.config_manager import ConfigurationManager
+from utils.publish_engine import PublishEngine
+from utils.publish_pipeline import PublishPipeline, create_engine
+from utils.app_package import describe_app_file
+from utils.artifact_hash import get_artifact_hasher
+from utils.connection_probe import format_test_result, summarize_connection_tests
+from utils.credential_broker import CredentialBroker, collect_credentials, describe_credentials
 from utils.translations import get_text
 import uuid
 import threading
-from queue import Queue, Empty  # Import Empty explicitly
 import logging
 import traceback
 from datetime import datetime, timedelta
 from typing import List, Dict
 #Added import for credential manager
 from utils.credential_manager import CredentialManager
+from utils.retry_policy import RetryBudget
+from utils.rollout_scheduler import RolloutScheduler, describe_rollout_event
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging (set BC_PUBLISHER_LOG_LEVEL=DEBUG for verbose output)
+logging.basicConfig(level=os.environ.get('BC_PUBLISHER_LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
 class PublishWorker(threading.Thread):
-    def __init__(self, app_file_path: str, configs: List[Dict], credential_manager: CredentialManager, result_queue: Queue):
+    def __init__(self, app_file_path: str, configs: List[Dict], credential_manager: CredentialManager, channel: TkEventChannel,
+                 max_workers: int = PublishEngine.DEFAULT_MAX_WORKERS,
+                 per_host_limit: int = PublishEngine.DEFAULT_PER_HOST_LIMIT,
+                 force: bool = False, staged: bool = False):
         super().__init__()
-        self.app_file_path = app_file_path
         self.configs = configs
         self.credential_manager = credential_manager
-        self.result_queue = result_queue
+        self.channel = channel
+        self.broker = CredentialBroker(channel.post)
+        # Hashing, journaling, retries and the staged rollout are shared with the other front ends
+        self.pipeline = PublishPipeline(
+            app_file_path,
+            create_engine(len(configs), max_workers, per_host_limit),
+            force=force,
+            canary_size=RolloutScheduler.DEFAULT_CANARY_SIZE if staged else None,
+            credential_manager=credential_manager,
+            on_event=lambda event: self.channel.post('info', describe_rollout_event(event))
+        )
         self.daemon = True
         logger.debug("PublishWorker initialized")
 
     def run(self):
         try:
             logger.debug("Starting PublishWorker thread")
-            for config in self.configs:
-                if config['environmentType'].lower() == 'onprem':
-                    server_id = f"{config['server']}_{config['serverInstance']}"
-                    logger.debug(f"Processing server: {server_id}")
-
-                    # Try to get existing credentials
-                    existing_creds = self.credential_manager.get_credentials(server_id)
-                    if existing_creds:
-                        username = existing_creds['username']
-                        password = existing_creds['password']
-                    else:
-                        # Request credentials from main thread
-                        logger.debug(f"Requesting credentials for {server_id}")
-                        self.result_queue.put(('need_credentials', server_id, config))
-
-                        # Wait for credentials response with timeout
-                        try:
-                            logger.debug(f"Waiting for credentials for {server_id}")
-                            response = self.result_queue.get(timeout=60)
-                            if response[0] != 'credentials_provided':
-                                logger.warning(f"No credentials provided for {server_id}")
-                                self.result_queue.put(('failed', config['name'], "No credentials provided"))
-                                continue
-                            username = response[1]
-                            password = response[2]
-                        except Empty:
-                            logger.error(f"Timeout waiting for credentials for {server_id}")
-                            self.result_queue.put(('failed', config['name'], "Credential request timed out"))
-                            continue
-
-                    try:
-                        logger.debug(f"Publishing to {server_id}")
-                        success, message = publish_to_environment(
-                            self.app_file_path,
-                            config,
-                            username,
-                            password
-                        )
-
-                        if success:
-                            logger.debug(f"Successfully published to {server_id}, storing credentials")
-                            self.credential_manager.store_credentials(server_id, username, password)
-                        else:
-                            logger.warning(f"Failed to publish to {server_id}: {message}")
-
-                        self.result_queue.put(('progress', config['name'], success, message))
-                    except Exception as e:
-                        logger.error(f"Error publishing to {server_id}: {str(e)}\n{traceback.format_exc()}")
-                        self.result_queue.put(('failed', config['name'], f"Error: {str(e)}"))
+            deployment_id = self.pipeline.begin(self.configs)
+            if self.pipeline.digest:
+                self.channel.post('info', f"SHA-256: {self.pipeline.digest}")
+            self.channel.post('info', f"Deployment: {deployment_id}")
+            if self.pipeline.unchecked:
+                self.channel.post('info', f"{self.pipeline.unchecked} OnPrem server(s) cannot report their installed version "
+                                          "and are published even if already up to date")
+
+            # Resolve every credential up front so no publish thread waits on the UI
+            credentials, ready_configs, failed = collect_credentials(self.configs, self.credential_manager, self.broker)
+            for config, reason in failed:
+                self.pipeline.fail(config, reason)
+                self.channel.post('failed', config['name'], reason)
+
+            # Credentials are resolved, publish to all servers concurrently
+            for result in self.pipeline.run(ready_configs, credentials):
+                self.channel.post('progress', result['config']['name'], result['success'], result['message'])
 
         except Exception as e:
             logger.error(f"Worker thread error: {str(e)}\n{traceback.format_exc()}")
-            self.result_queue.put(('error', str(e)))
+            self.channel.post('error', str(e))
+        finally:
+            self.channel.post('done')
+
+class ConnectionTestWorker(threading.Thread):
+    """Tests connections to several servers concurrently and posts each result as it finishes"""
+
+    MAX_WORKERS = 16
+    PER_HOST_LIMIT = 4
+
+    def __init__(self, configs: List[Dict], channel: TkEventChannel):
+        super().__init__()
+        self.configs = configs
+        self.channel = channel
+        self.engine = PublishEngine(self.MAX_WORKERS, self.PER_HOST_LIMIT)
+        self.retry_policy = AppPublisher.create_probe_retry_policy(RetryBudget.for_targets(len(configs)))
+        self.daemon = True
+
+    def run(self):
+        try:
+            for result in self.engine.run(
+                self.configs, lambda config: AppPublisher.probe_connection(config, retry_policy=self.retry_policy)):
+                self.channel.post('tested', result['config']['name'], result['success'], result['message'],
+                                  result.get('timings', {}))
+        except Exception as e:
+            logger.error(f"Connection test worker error: {str(e)}\n{traceback.format_exc()}")
+            self.channel.post('error', str(e))
+        finally:
+            self.channel.post('done')
 
 class BCPublisherApp(TkinterDnD.Tk):
     def __init__(self):
@@ -119,17 +138,29 @@ class BCPublisherApp(TkinterDnD.Tk):
         self.config_manager = ConfigurationManager()
         #Added credential manager instance
         self.credential_manager = CredentialManager()
+        # Rows currently shown in the server list and the names of checked rows
+        self.server_list_model = ServerListModel()
+        self.selection = SelectionModel()
 
         # Configure main window grid weights
         self.grid_rowconfigure(0, weight=1)
         self.grid_columnconfigure(0, weight=1)
 
         self.setup_ui()
+        self.selection.add_listener(self.update_publish_button_state)
         self.center_window(self)
 
         # Load saved configurations
         self.update_server_list()
         self.progress_text = None  # Will store progress text widget
+        self.progress_sink = None  # Batches messages written to progress_text
+
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        """Write pending configuration changes before closing the window"""
+        self.config_manager.flush()
+        self.destroy()
 
     def center_window(self, window, width=None, height=None):
         """Center any window on the screen"""
@@ -241,7 +272,7 @@ class BCPublisherApp(TkinterDnD.Tk):
         # Create Treeview
         self.server_tree = ttk.Treeview(
             list_container,
-            columns=("selected", "type", "name", "environment"),
+            columns=("selected", "type", "name", "environment", "health"),
             show="headings",
             style="ServerList.Treeview",
             height=10
@@ -251,16 +282,18 @@ class BCPublisherApp(TkinterDnD.Tk):
         self.server_tree.tag_configure("checked", background='#313244')  # Use hover color for checked rows
 
         # Configure columns
-        self.server_tree.heading("selected", text=get_text('col_select'), anchor="center")
+        self.server_tree.heading("selected", text=get_text('col_select'), anchor="center", command=self.toggle_select_all)
         self.server_tree.heading("type", text=get_text('col_type'), anchor="center")
         self.server_tree.heading("name", text=get_text('col_name'), anchor="center")
         self.server_tree.heading("environment", text=get_text('col_environment'), anchor="center")
+        self.server_tree.heading("health", text=get_text('col_health'), anchor="center")
 
         # Configure column widths
         self.server_tree.column("selected", width=120, stretch=False, anchor="center")
         self.server_tree.column("type", width=150, stretch=False, anchor="center")
         self.server_tree.column("name", width=300, stretch=True, anchor="center")
         self.server_tree.column("environment", width=400, stretch=True, anchor="center")
+        self.server_tree.column("health", width=180, stretch=False, anchor="center")
 
         # Create scrollbar
         tree_scrollbar = ttk.Scrollbar(
@@ -302,6 +335,32 @@ class BCPublisherApp(TkinterDnD.Tk):
         )
         self.publish_button.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(10, 10))
 
+        # Targets already running this app version are skipped unless forced
+        self.force_publish = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            button_container,
+            text=get_text('force_publish'),
+            variable=self.force_publish,
+            background='#1e1e2e',
+            foreground='#cdd6f4',
+            selectcolor='#181825',
+            activebackground='#1e1e2e',
+            activeforeground='#cdd6f4'
+        ).pack(side=tk.RIGHT, padx=(0, 10))
+
+        # Staged rollouts publish to a canary first and abort when a wave fails too often
+        self.staged_rollout = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            button_container,
+            text=get_text('staged_rollout'),
+            variable=self.staged_rollout,
+            background='#1e1e2e',
+            foreground='#cdd6f4',
+            selectcolor='#181825',
+            activebackground='#1e1e2e',
+            activeforeground='#cdd6f4'
+        ).pack(side=tk.RIGHT, padx=(0, 10))
+
     def show_progress_dialog(self, title):
         """Create and center a progress dialog"""
         dialog = tk.Toplevel(self)
@@ -332,6 +391,7 @@ class BCPublisherApp(TkinterDnD.Tk):
             foreground='#cdd6f4'
         )
         self.progress_text.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+        self.progress_sink = ProgressSink(self.progress_text)
 
         # Add close button
         close_btn = ttk.Button(
@@ -357,13 +417,7 @@ class BCPublisherApp(TkinterDnD.Tk):
             messagebox.showerror("Error", get_text('select_app'))
             return
 
-        selected_configs = []
-        for item in self.server_tree.get_children():
-            values = self.server_tree.item(item)['values']
-            if values[0] == "☑":
-                index = int(item.split('_')[1])
-                if 0 <= index < len(self.config_manager.get_configurations()):
-                    selected_configs.append(self.config_manager.get_configurations()[index])
+        selected_configs = self.selection.selected_configs(self.config_manager)
 
         if not selected_configs:
             messagebox.showerror("Error", get_text('select_server'))
@@ -372,178 +426,159 @@ class BCPublisherApp(TkinterDnD.Tk):
         # Show progress dialog
         progress_dialog, progress_text, close_btn = self.show_progress_dialog(get_text('deployment_progress'))
 
-        # Initialize worker thread
-        result_queue = Queue()
-        worker = PublishWorker(
-            self.app_file_path,
-            selected_configs,
-            self.credential_manager,
-            result_queue
-        )
-
-        def check_queue():
+        def handle_event(event):
+            """Handle an event posted by the worker; runs on the Tk thread"""
             try:
-                while True:
-                    try:
-                        result = result_queue.get_nowait()
-                        if result[0] == 'need_credentials':
-                            server_id, config = result[1], result[2]
-                            username, password = self.show_credential_dialog(config)
-                            if username and password:
-                                result_queue.put(('credentials_provided', username, password))
-                            else:
-                                result_queue.put(('credentials_failed',))
-                        elif result[0] == 'progress':
-                            server_name, success, message = result[1], result[2], result[3]
-                            status = "✓" if success else "✗"
-                            self.update_progress(f"{status} {server_name}: {message}")
-                        elif result[0] == 'failed':
-                            server_name, message = result[1], result[2]
-                            self.update_progress(f"✗ {server_name}: {message}")
-                        elif result[0] == 'error':
-                            self.update_progress(f"Error: {result[1]}")
-                            break
-                    except Empty:
-                        break
-
-                if worker.is_alive():
-                    self.after(100, check_queue)
-                else:
+                if event[0] == 'need_credentials':
+                    request_id, missing = event[1], event[2]
+                    worker.broker.respond(request_id, self.show_credentials_dialog(missing))
+                elif event[0] == 'progress':
+                    server_name, success, message = event[1], event[2], event[3]
+                    status = "✓" if success else "✗"
+                    self.update_progress(f"{status} {server_name}: {message}")
+                elif event[0] == 'info':
+                    self.update_progress(event[1])
+                elif event[0] == 'failed':
+                    server_name, message = event[1], event[2]
+                    self.update_progress(f"✗ {server_name}: {message}")
+                elif event[0] == 'error':
+                    self.update_progress(f"Error: {event[1]}")
+                elif event[0] == 'done':
+                    channel.close()
                     close_btn.config(state="normal")
+                    # Show hosts whose circuit breaker opened during the rollout
+                    self.update_server_list()
             except Exception as e:
+                logger.error(f"Error handling worker event: {str(e)}\n{traceback.format_exc()}")
                 self.update_progress(f"Error checking progress: {str(e)}")
 
+        # Initialize worker thread; it wakes the UI through the channel instead of being polled
+        channel = TkEventChannel(self, handle_event)
+        worker = PublishWorker(
+            self.app_file_path,
+            selected_configs,
+            self.credential_manager,
+            channel,
+            force=self.force_publish.get(),
+            staged=self.staged_rollout.get()
+        )
         worker.start()
-        check_queue()
-
-
-    def handle_credential_requests(self, progress_window, close_btn):
-        for server_id, config in self.credential_requests.items():
-            username, password = self.show_credential_dialog(config)
-            if username and password:
-                logger.debug(f"Storing credentials for {server_id}")
-                self.credential_manager.store_credentials(server_id, username, password)
-                self.update_progress(f"✓ Credentials stored for {config['name']}")
-                self.result_queue.put(('credentials_provided', username, password))
-            else:
-                logger.debug(f"No credentials provided for {server_id}")
-                self.update_progress(f"✗ {config['name']}: No credentials provided")
-                self.credentials_collected = False
-                close_btn.configure(state="normal")
-                return
-
-
-    def check_queue(self):
-        """Check the result queue for updates and handle them"""
-        try:
-            while True:
-                try:
-                    result = self.result_queue.get_nowait()
-                    if result[0] == 'need_credentials':
-                        server_id, config = result[1], result[2]
-                        username, password = self.show_credential_dialog(config)
-                        if username and password:
-                            self.result_queue.put(('credentials_provided', username, password))
-                        else:
-                            self.result_queue.put(('credentials_failed',))
-                    elif result[0] == 'progress':
-                        server_name, success, message = result[1], result[2], result[3]
-                        status = "✓" if success else "✗"
-                        self.update_progress(f"{status} {server_name}: {message}")
-                    elif result[0] == 'failed':
-                        server_name, message = result[1], result[2]
-                        self.update_progress(f"✗ {server_name}: {message}")
-                    elif result[0] == 'error':
-                        self.update_progress(f"Error: {result[1]}")
-                        break
-                except Empty:
-                    break
-
-            if worker.is_alive():
-                self.after(100, self.check_queue)
-            else:
-                close_btn.config(state="normal")
-        except Exception as e:
-            logger.error(f"Error in check_queue: {str(e)}\n{traceback.format_exc()}")
-            self.update_progress(f"Error checking progress: {str(e)}")
 
     def update_progress(self, message):
         """Update progress text in the progress window"""
-        if self.progress_text:
+        if self.progress_sink:
             logger.debug(f"Progress update: {message}")
-            self.progress_text.insert(tk.END, f"{message}\n")
-            self.progress_text.see(tk.END)
-            self.progress_text.update()
+            self.progress_sink.write(message)
 
-    def show_credential_dialog(self, server_config):
-        """Show dialog to input server credentials"""
+    def show_credentials_dialog(self, missing):
+        """
+        Show one dialog asking for the credentials of every server in missing.
+
+        Args:
+            missing: List of (server_id, config) without stored credentials
+
+        Returns:
+            dict: (username, password) by server id for the servers that were filled in
+        """
         dialog = tk.Toplevel(self)
         dialog.title("Server Authentication")
         dialog.transient(self)
         dialog.grab_set()
 
-        # Configure dialog background and size
+        # Configure dialog background and size; rows scroll beyond a few servers
         dialog.configure(background='#1e1e2e')
-        width = 400
-        height = 300
+        width = 560
+        height = min(260 + 70 * len(missing), 600)
         dialog.minsize(width, height)
-        dialog.resizable(False, False)
 
-        # Main frame with padding
         main_frame = ttk.Frame(dialog, padding=20, style="Card.TFrame")
         main_frame.pack(fill=tk.BOTH, expand=True)
         main_frame.configure(style="Dark.TFrame")
 
-        # Header
-        header_text = f"Authentication Required\n{server_config['name']}"
         header = ttk.Label(
             main_frame,
-            text=header_text,
+            text=f"Authentication Required\n{len(missing)} server(s)",
             style="Header.TLabel",
             justify=tk.CENTER,
             font=("Segoe UI", 14, "bold"),
             background='#1e1e2e',
             foreground='#cdd6f4'
         )
-        header.pack(pady=(0, 20))
+        header.pack(pady=(0, 15))
 
-        # Username
-        username_label = ttk.Label(
-            main_frame,
-            text="Username",
-            background='#1e1e2e',
-            foreground='#cdd6f4'
-        )
-        username_label.pack(anchor="w", pady=(0, 5))
-        username_entry = ttk.Entry(main_frame)
-        username_entry.pack(fill=tk.X, pady=(0, 15))
+        # Reuse the first server's credentials for all servers
+        shared = tk.BooleanVar(value=False)
 
-        # Password
-        password_label = ttk.Label(
-            main_frame,
-            text="Password",
-            background='#1e1e2e',
-            foreground='#cdd6f4'
-        )
-        password_label.pack(anchor="w", pady=(0, 5))
-        password_entry = ttk.Entry(main_frame, show="•")
-        password_entry.pack(fill=tk.X, pady=(0, 20))
+        # Button frame is packed before the rows so it stays visible when the dialog shrinks
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=(10, 0))
+        button_frame.configure(style="Dark.TFrame")
 
-        result = {'username': None, 'password': None}
+        if len(missing) > 1:
+            tk.Checkbutton(
+                main_frame,
+                text="Use the first credentials for all servers",
+                variable=shared,
+                background='#1e1e2e',
+                foreground='#cdd6f4',
+                selectcolor='#181825',
+                activebackground='#1e1e2e',
+                activeforeground='#cdd6f4',
+                command=lambda: update_shared()
+            ).pack(side=tk.BOTTOM, anchor="w", pady=(10, 0))
+
+        canvas = tk.Canvas(main_frame, background='#1e1e2e', highlightthickness=0)
+        scrollbar = ttk.Scrollbar(main_frame, orient=tk.VERTICAL, command=canvas.yview)
+        rows_frame = ttk.Frame(canvas, style="Dark.TFrame")
+        rows_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
+        rows_window = canvas.create_window((0, 0), window=rows_frame, anchor="nw")
+        canvas.bind("<Configure>", lambda e: canvas.itemconfigure(rows_window, width=e.width))
+        canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        rows_frame.columnconfigure(1, weight=1)
+        rows_frame.columnconfigure(3, weight=1)
+
+        entries = []
+        for row, (server_id, config) in enumerate(missing):
+            ttk.Label(
+                rows_frame,
+                text=describe_credentials(config),
+                background='#1e1e2e',
+                foreground='#cdd6f4'
+            ).grid(row=row * 2, column=0, columnspan=4, sticky="w", pady=(8, 2))
+            ttk.Label(rows_frame, text="Username", background='#1e1e2e', foreground='#cdd6f4').grid(
+                row=row * 2 + 1, column=0, sticky="w", padx=(0, 5))
+            username_entry = ttk.Entry(rows_frame)
+            username_entry.grid(row=row * 2 + 1, column=1, sticky="ew", padx=(0, 10))
+            ttk.Label(rows_frame, text="Password", background='#1e1e2e', foreground='#cdd6f4').grid(
+                row=row * 2 + 1, column=2, sticky="w", padx=(0, 5))
+            password_entry = ttk.Entry(rows_frame, show="•")
+            password_entry.grid(row=row * 2 + 1, column=3, sticky="ew")
+            entries.append((server_id, username_entry, password_entry))
+
+        def update_shared():
+            state = "disabled" if shared.get() else "normal"
+            for _, username_entry, password_entry in entries[1:]:
+                username_entry.config(state=state)
+                password_entry.config(state=state)
+
+        result = {}
 
         def on_ok():
-            result['username'] = username_entry.get()
-            result['password'] = password_entry.get()
+            first_username, first_password = entries[0][1].get(), entries[0][2].get()
+            for server_id, username_entry, password_entry in entries:
+                if shared.get():
+                    username, password = first_username, first_password
+                else:
+                    username, password = username_entry.get(), password_entry.get()
+                if username and password:
+                    result[server_id] = (username, password)
             dialog.destroy()
 
         def on_cancel():
             dialog.destroy()
 
-        # Button frame
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(fill=tk.X, pady=(10, 0))
-        button_frame.configure(style="Dark.TFrame")
-
         # Create equal-width buttons with consistent styling
         button_width = 15
         cancel_btn = ttk.Button(
@@ -566,14 +601,10 @@ class BCPublisherApp(TkinterDnD.Tk):
         connect_btn.pack(side=tk.RIGHT, padx=(5, 0), expand=True)
 
         # Bind Enter key to submit
-        def on_return(event):
-            on_ok()
+        dialog.bind('<Return>', lambda event: on_ok())
 
-        dialog.bind('<Return>', on_return)
-        password_entry.bind('<Return>', on_return)
-
-        # Set initial focus to username field
-        username_entry.focus_set()
+        # Set initial focus to the first username field
+        entries[0][1].focus_set()
 
         # Center dialog on parent window
         self.center_window(dialog, width, height)
@@ -581,13 +612,15 @@ class BCPublisherApp(TkinterDnD.Tk):
         # Make dialog modal
         dialog.wait_window()
 
-        return result['username'], result['password']
+        return result
 
     def handle_app_drop(self, file_path):
         """Handle dropping an app file"""
         if file_path.lower().endswith('.app'):
             self.app_file_path = file_path
-            self.app_drop_zone.update_text(f"Selected: {os.path.basename(file_path)}")
+            self.app_drop_zone.update_text(f"Selected: {describe_app_file(file_path)}")
+            # Hash in the background so the digest is ready when publishing starts
+            get_artifact_hasher().start(file_path)
         else:
             messagebox.showerror("Error", get_text('invalid_app'))
 
@@ -608,27 +641,30 @@ class BCPublisherApp(TkinterDnD.Tk):
             item = self.server_tree.identify_row(event.y)
 
             if column == "#1" and item:  # Checkbox column
-                # Toggle selection state with larger symbols
-                current_values = self.server_tree.item(item)['values']
-                new_values = list(current_values)
-                new_values[0] = "☑" if current_values[0] == "☐" else "☐"
-
-                # Update both values and tags
-                tags = ("checked",) if new_values[0] == "☑" else ()
-                self.server_tree.item(item, values=new_values, tags=tags)
-
-                # Update publish button state
-                self.update_publish_button_state()
+                # Item ids are configuration names; the selection model notifies the buttons
+                self.selection.toggle(item)
+                self.render_checkbox(item)
+
+    def toggle_select_all(self):
+        """Select all servers, or clear the selection if everything is already selected"""
+        if len(self.selection) == len(self.server_list_model.order):
+            self.selection.clear()
+        else:
+            self.selection.select_all(self.server_list_model.order)
+        for item in self.server_list_model.order:
+            self.render_checkbox(item)
+
+    def render_checkbox(self, item):
+        """Show the selection state of a row in its checkbox column and tags"""
+        checked = self.selection.is_selected(item)
+        new_values = list(self.server_tree.item(item)['values'])
+        new_values[0] = "☑" if checked else "☐"
+        tags = ("checked",) if checked else ()
+        self.server_tree.item(item, values=new_values, tags=tags)
 
     def update_publish_button_state(self):
         """Update publish button and test connection button states based on selections"""
-        has_selection = False
-        for item in self.server_tree.get_children():
-            if self.server_tree.item(item)['values'][0] == "☑":
-                has_selection = True
-                break
-
-        new_state = "normal" if has_selection else "disabled"
+        new_state = "normal" if len(self.selection) else "disabled"
         self.publish_button.configure(state=new_state)
         self.test_connection_btn.configure(state=new_state)
 
@@ -642,31 +678,34 @@ class BCPublisherApp(TkinterDnD.Tk):
             messagebox.showerror("Error", f"Failed to process configuration: {str(e)}")
 
     def update_server_list(self):
-        """Update the server list with current configurations"""
-        # Clear existing items
-        for item in self.server_tree.get_children():
-            self.server_tree.delete(item)
-
-        # Add items from configuration manager
-        for i, config in enumerate(self.config_manager.get_configurations()):
-            env_type = config['environmentType']
-            name = config['name']
-
-            # Set the environment/instance detail based on type
-            if env_type.lower() == 'sandbox':
-                environment = config['environmentName']
-            else:  # OnPrem
-                environment = config['serverInstance']
-
-            # Insert item with checkbox
-            item_id = f"server_{i}"
+        """Update the server list with current configurations, changing only rows that differ"""
+        diff = self.server_list_model.update(self.config_manager.get_configurations_view())
+
+        for item_id in diff.removed:
+            self.server_tree.delete(item_id)
+        if diff.removed:
+            self.selection.retain(diff.order)
+
+        # Keep the checkbox state of rows whose details changed
+        for item_id, row in diff.updated:
+            checkbox = "☑" if self.selection.is_selected(item_id) else "☐"
+            self.server_tree.item(item_id, values=(checkbox, *row))
+
+        # Insert new rows; item ids are configuration names
+        for index, item_id, row in diff.added:
+            checked = self.selection.is_selected(item_id)
             self.server_tree.insert(
                 "",
-                tk.END,
+                index,
                 item_id,
-                values=("☐", env_type, name, environment)
+                values=("☑" if checked else "☐", *row),
+                tags=("checked",) if checked else ()
             )
 
+        if diff.reordered:
+            for index, item_id in enumerate(diff.order):
+                self.server_tree.move(item_id, "", index)
+
         # Update publish button state after loading list
         self.update_publish_button_state()
 
@@ -803,78 +842,38 @@ class BCPublisherApp(TkinterDnD.Tk):
             messagebox.showinfo("Info", get_text('no_configs'))
 
     def test_selected_connections(self):
-        """Testconnection to selected servers"""
-        selected_items = self.server_tree.get_children()
-        selected_configs = []
-        for item in selected_items:
-            values = self.server_tree.item(item)['values']
-            if values[0] == "☑":
-                index = int(item.split('_')[1])
-                if 0 <= index < len(self.config_manager.get_configurations()):
-                    selected_configs.append(self.config_manager.get_configurations()[index])
+        """Test connections to the selected servers concurrently"""
+        selected_configs = self.selection.selected_configs(self.config_manager)
 
         if not selected_configs:
             messagebox.showerror("Error", get_text('select_server_test'))
             return
 
         # Create and show progress window
-        progress_window, progress_text, close_btn = self.show_progress_window(get_text('connection_test_progress'))
+        progress_window, progress_text, close_btn = self.show_progress_dialog(get_text('connection_test_progress'))
+        close_btn.configure(state="disabled")
+        update_progress = self.update_progress
+        update_progress(f"Testing connection to {len(selected_configs)} server(s)...")
 
-        def update_progress(message):
-            if progress_text:
-                progress_text.insert(tk.END, f"{message}\n")
-                progress_text.see(tk.END)
-                progress_text.update()
-
-        # Test connection to each selected server
         test_results = []
-        for config in selected_configs:
-            update_progress(f"Testing connection to {config['name']}...")
-            success, message = test_server_connection(config)
-            test_results.append((config['name'], success, message))
-
-            # Update progress with result
-            status = "✓" if success else "✗"
-            update_progress(f"{status} {message}")
-
-        # Show final summary
-        update_progress("\nTest Summary:")
-        successful = sum(1 for _, success, _ in test_results if success)
-        failed = len(test_results) - successful
-        update_progress(f"Successful connections: {successful}")
-        update_progress(f"Failed connections: {failed}")
-
-        # Enable close button
-        close_btn.configure(state="normal")
-
-def preprocess_json_text(json_text):
-    """
-    Preprocess JSON text to handle common formatting issues.
-    Args    :
-        json_text (str): Raw JSON text
-    Returns:
-        str: Preprocessed JSON text
-    """
-    # Remove trailing commas before arrays and objects
-    processed_text = json_text.replace(",]", "]").replace(",}", "}")
-    processed_text = processed_text.replace(",\n]", "\n]").replace(",\n}", "\n}")
-
-    try:
-        # Try to parse as JSON first
-        config = json.loads(processed_text)
-        # If it's already a valid configuration object (has version and configurations)
-        if isinstance(config, dict) and 'version' in config and 'configurations' in config:
-            return processed_text
-    except json.JSONDecodeError:
-        pass
-
-    # Check if we have multiple objects without array brackets
-    stripped = processed_text.strip()
-    if stripped.count('{') > 1 and not (stripped.startswith('[') and stripped.endswith(']')):
-        # Wrap in array brackets if not already wrapped and contains multiple objects
-        processed_text = f'[{processed_text}]'
-
-    return processed_text
+
+        def handle_event(event):
+            """Handle an event posted by the worker; runs on the Tk thread"""
+            if event[0] == 'tested':
+                server_name, success, message, timings = event[1], event[2], event[3], event[4]
+                test_results.append((server_name, success, timings))
+                update_progress(format_test_result(success, message, timings))
+            elif event[0] == 'error':
+                update_progress(f"Error: {event[1]}")
+            elif event[0] == 'done':
+                channel.close()
+                for line in summarize_connection_tests(test_results):
+                    update_progress(line)
+                close_btn.configure(state="normal")
+                self.update_server_list()
+
+        channel = TkEventChannel(self, handle_event)
+        ConnectionTestWorker(selected_configs, channel).start()
 
 if __name__ == "__main__":
     app = BCPublisherApp()
@@ -0,0 +1,245 @@
+"""
+Headless entry point for publishing an extension without a GUI.
+
+Results are written to stdout as JSON lines, one object per server plus a
+final summary, so build agents can consume them. This module must not import
+any GUI toolkit.
+
+Every target's progress is recorded in a deployment journal, so an
+interrupted run can be finished later with --resume, which publishes only
+the targets that did not sync.
+
+With --canary the rollout is staged: the canary targets are published
+first, then waves of increasing size, and the remaining waves are aborted
+when too many targets in a wave fail.
+
+Example:
+    python main_cli.py MyApp.app --name "Test*" --workers 8
+    python main_cli.py --resume
+    python main_cli.py Hotfix.app --all --engine async --workers 512
+    python main_cli.py MyApp.app --all --canary 2 --max-failure-rate 0.1
+    bc-publish MyApp.app --type sandbox        (after pip install .)
+"""
+import argparse
+import fnmatch
+import json
+import logging
+import os
+import sys
+from typing import Dict, List
+
+from utils.async_engine import AsyncPublishEngine
+from utils.config_manager import ConfigurationManager
+from utils.credential_broker import get_server_id, needs_credentials
+from utils.credential_manager import CredentialManager
+from utils.deployment_journal import DeploymentJournal
+from utils.json_parser import parse_server_config, preprocess_json_text
+from utils.publish_engine import PublishEngine
+from utils.publish_pipeline import PublishPipeline
+from utils.retry_policy import RetryBudget, RetryPolicy
+from utils.rollout_scheduler import RolloutScheduler
+
+logger = logging.getLogger(__name__)
+
+PASSWORD_ENV_VAR = "BC_PUBLISH_PASSWORD"
+CLIENT_SECRET_ENV_VAR = "BC_PUBLISH_CLIENT_SECRET"
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="bc-publish",
+        description="Publish a Business Central extension to one or more servers without a GUI."
+    )
+    parser.add_argument("app", nargs="?", help="Path to the .app file to publish")
+    parser.add_argument("--config-file", default="saved_configurations.json",
+                        help="Saved configurations to select servers from (default: %(default)s)")
+    parser.add_argument("--import", dest="import_files", action="append", default=[], metavar="FILE",
+                        help="launch.json or configuration file to select servers from; may be repeated")
+    parser.add_argument("--name", dest="names", action="append", default=[], metavar="PATTERN",
+                        help="Configuration name or glob pattern to publish to; may be repeated")
+    parser.add_argument("--type", dest="environment_type", choices=["onprem", "sandbox"],
+                        help="Only publish to configurations of this environment type; on its own, publish to all of them")
+    parser.add_argument("--all", action="store_true", help="Publish to every available configuration")
+    parser.add_argument("--username", help=f"Username for OnPrem servers; the password is read from {PASSWORD_ENV_VAR}")
+    parser.add_argument("--client-id",
+                        help=f"App registration client ID for Sandbox environments; the secret is read from {CLIENT_SECRET_ENV_VAR}")
+    parser.add_argument("--force", action="store_true",
+                        help="Publish even to servers that already run this app version")
+    parser.add_argument("--resume", nargs="?", const="", metavar="DEPLOYMENT_ID",
+                        help="Finish an interrupted deployment, publishing only its unsynced targets "
+                             "(default: the most recent unfinished deployment)")
+    parser.add_argument("--journal", default=DeploymentJournal.DEFAULT_PATH,
+                        help="Deployment journal file (default: %(default)s)")
+    parser.add_argument("--engine", choices=["thread", "async"], default="thread",
+                        help="Publish on a thread pool or on a single event loop; with async, targets "
+                             "waiting for a host or a retry hold no thread (default: %(default)s)")
+    parser.add_argument("--workers", type=int,
+                        help="Maximum number of concurrent publishes (default: "
+                             f"{PublishEngine.DEFAULT_MAX_WORKERS} threads or "
+                             f"{AsyncPublishEngine.DEFAULT_MAX_CONCURRENCY} coroutines)")
+    parser.add_argument("--per-host", type=int, default=PublishEngine.DEFAULT_PER_HOST_LIMIT,
+                        help="Maximum number of concurrent publishes per server host (default: %(default)s)")
+    parser.add_argument("--max-attempts", type=int, default=RetryPolicy.DEFAULT_MAX_ATTEMPTS,
+                        help="Attempts per server for transient failures (default: %(default)s)")
+    parser.add_argument("--retry-budget", type=int,
+                        help="Maximum number of retries across all servers "
+                             f"(default: half the number of servers, at least {RetryBudget.MIN_RETRIES})")
+    parser.add_argument("--canary", type=int, metavar="N",
+                        help="Stage the rollout: publish to N canary servers first, then to waves of increasing size")
+    parser.add_argument("--wave-growth", type=float, default=RolloutScheduler.DEFAULT_GROWTH,
+                        help="Size of each wave relative to the previous one (default: %(default)s)")
+    parser.add_argument("--max-failure-rate", type=float, default=RolloutScheduler.DEFAULT_MAX_FAILURE_RATE,
+                        help="Abort the remaining waves when more than this fraction of a wave fails "
+                             "(default: %(default)s)")
+    parser.add_argument("--log-level", default="WARNING", help="Logging level written to stderr (default: %(default)s)")
+    return parser
+
+
+def load_configs(args) -> List[Dict]:
+    """Load the saved configurations or the imported files"""
+    if not args.import_files:
+        # The SQLite store answers this from its environment type index
+        return ConfigurationManager(args.config_file).find_configs(environment_type=args.environment_type)
+
+    configs = []
+    for file_path in args.import_files:
+        with open(file_path, 'r') as f:
+            configs.extend(parse_server_config(json.loads(preprocess_json_text(f.read()))))
+    return configs
+
+
+def select_configs(configs: List[Dict], args) -> List[Dict]:
+    """Filter configurations by the name patterns and environment type; --type alone selects the whole type"""
+    selected = []
+    for config in configs:
+        if args.environment_type and config['environmentType'].lower() != args.environment_type:
+            continue
+        if not args.all and args.names and not any(fnmatch.fnmatchcase(config['name'], pattern) for pattern in args.names):
+            continue
+        selected.append(config)
+    return selected
+
+
+def resolve_credentials(configs: List[Dict], credential_manager: CredentialManager, args) -> Dict:
+    """Map server ids to (username, password) from the command line or the credential store"""
+    credentials = {}
+    password = os.environ.get(PASSWORD_ENV_VAR)
+    client_secret = os.environ.get(CLIENT_SECRET_ENV_VAR)
+    for config in configs:
+        if not needs_credentials(config):
+            continue
+        server_id = get_server_id(config)
+        if server_id in credentials:
+            continue
+        is_sandbox = config['environmentType'].lower() == 'sandbox'
+        if is_sandbox and args.client_id and client_secret is not None:
+            credentials[server_id] = (args.client_id, client_secret)
+        elif not is_sandbox and args.username and password is not None:
+            credentials[server_id] = (args.username, password)
+        else:
+            stored = credential_manager.get_credentials(server_id)
+            if stored:
+                credentials[server_id] = (stored['username'], stored['password'])
+    return credentials
+
+
+def emit(record: Dict) -> None:
+    """Write one JSON line to stdout"""
+    sys.stdout.write(json.dumps(record) + "\n")
+    sys.stdout.flush()
+
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), stream=sys.stderr, force=True)
+
+    if args.workers is not None and args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.per_host < 1:
+        parser.error("--per-host must be at least 1")
+    if args.max_attempts < 1:
+        parser.error("--max-attempts must be at least 1")
+    if args.retry_budget is not None and args.retry_budget < 0:
+        parser.error("--retry-budget must not be negative")
+    if args.canary is not None and args.canary < 1:
+        parser.error("--canary must be at least 1")
+    if args.wave_growth < 1:
+        parser.error("--wave-growth must be at least 1")
+    if not 0 <= args.max_failure_rate <= 1:
+        parser.error("--max-failure-rate must be between 0 and 1")
+
+    journal = DeploymentJournal(args.journal)
+    deployment = None
+    if args.resume is not None:
+        try:
+            deployment = journal.find(args.resume or None)
+        except OSError as e:
+            parser.error(f"Failed to read deployment journal: {str(e)}")
+        if deployment is None:
+            parser.error(f"Deployment not found: {args.resume}" if args.resume else "No unfinished deployment to resume")
+        args.app = args.app or deployment.app_path
+    elif not args.app:
+        parser.error("the app file is required unless resuming")
+    elif not args.all and not args.names and not args.environment_type:
+        parser.error("select servers with --name, --type or --all")
+    if not os.path.exists(args.app):
+        parser.error(f"App file not found: {args.app}")
+
+    if deployment is not None:
+        selected = deployment.unfinished_configs()
+    else:
+        try:
+            selected = select_configs(load_configs(args), args)
+        except (OSError, ValueError) as e:
+            parser.error(f"Failed to load configurations: {str(e)}")
+        if not selected:
+            parser.error("No configurations match the selection")
+
+    credentials = resolve_credentials(selected, CredentialManager(), args)
+    if args.engine == "async":
+        max_workers = AsyncPublishEngine.DEFAULT_MAX_CONCURRENCY if args.workers is None else args.workers
+        engine = AsyncPublishEngine(max_workers, args.per_host)
+    else:
+        max_workers = PublishEngine.DEFAULT_MAX_WORKERS if args.workers is None else args.workers
+        engine = PublishEngine(max_workers, args.per_host)
+    pipeline = PublishPipeline(args.app, engine, journal, force=args.force, max_attempts=args.max_attempts,
+                               retry_budget=args.retry_budget, canary_size=args.canary,
+                               wave_growth=args.wave_growth, max_failure_rate=args.max_failure_rate,
+                               on_event=lambda event: emit({**event, 'deployment': pipeline.deployment_id}))
+    try:
+        deployment_id = pipeline.begin(selected, deployment)
+    except ValueError as e:
+        parser.error(str(e))
+    digest = pipeline.digest
+
+    succeeded = failed = 0
+    for result in pipeline.run(selected, credentials):
+        config = result['config']
+        if result['success']:
+            succeeded += 1
+        else:
+            failed += 1
+        emit({
+            'event': 'result',
+            'name': config['name'],
+            'environmentType': config['environmentType'],
+            'success': result['success'],
+            'message': result['message'],
+            'skipped': result.get('skipped', False),
+            'aborted': result.get('aborted', False),
+            'attempts': result.get('attempts', 0),
+            'sha256': digest,
+            'deployment': deployment_id,
+            'wave': result.get('wave'),
+            'elapsed': round(result['elapsed'], 3)
+        })
+
+    emit({'event': 'summary', 'total': len(selected), 'succeeded': succeeded, 'failed': failed, 'sha256': digest,
+          'deployment': deployment_id, 'retries': pipeline.budget.used, 'aborted': pipeline.aborted,
+          'version_unchecked': pipeline.unchecked})
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
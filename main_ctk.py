@@ -2,28 +2,42 @@ import customtkinter as ctk
 from tkinterdnd2 import DND_FILES, TkinterDnD
 import os
 import json
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict
 import threading
-from queue import Queue, Empty
 import logging
 from datetime import datetime, timedelta
 import traceback
 
 from utils.config_manager import ConfigurationManager
 from utils.credential_manager import CredentialManager
+from utils.retry_policy import RetryBudget
+from utils.rollout_scheduler import RolloutScheduler, describe_rollout_event
 from utils.json_parser import parse_server_config
 from utils.app_publisher import AppPublisher
+from utils.publish_engine import PublishEngine
+from utils.publish_pipeline import PublishPipeline, create_engine
+from utils.app_package import describe_app_file
+from utils.artifact_hash import get_artifact_hasher
+from utils.connection_probe import format_test_result, summarize_connection_tests
+from utils.credential_broker import CredentialBroker, collect_credentials, describe_credentials
 from utils.translations import get_text
+from ui.server_list_model import ServerListModel
+from ui.selection_model import SelectionModel
+from ui.progress_sink import ProgressSink
+from ui.event_channel import TkEventChannel
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
+# Configure logging (set BC_PUBLISHER_LOG_LEVEL=DEBUG for verbose output)
+logging.basicConfig(level=os.environ.get('BC_PUBLISHER_LOG_LEVEL', 'INFO').upper())
 logger = logging.getLogger(__name__)
 
 class DropFrame(ctk.CTkFrame):
-    def __init__(self, master, title: str, accept_extensions: List[str], placeholder: str, **kwargs):
+    def __init__(self, master, title: str, accept_extensions: List[str], placeholder: str,
+                 describe_file: Optional[Callable[[str], str]] = None, **kwargs):
         super().__init__(master, **kwargs)
 
         self.accept_extensions = accept_extensions
+        # Text shown for a selected file; defaults to its name
+        self.describe_file = describe_file or os.path.basename
         self.file_path = None
 
         # Enable DND
@@ -69,77 +83,188 @@ class DropFrame(ctk.CTkFrame):
         """Process the dropped/selected file"""
         if any(file_path.lower().endswith(ext) for ext in self.accept_extensions):
             self.file_path = file_path
-            self.drop_label.configure(text=f"Selected: {os.path.basename(file_path)}")
+            self.drop_label.configure(text=f"Selected: {self.describe_file(file_path)}")
             return True
         return False
 
+class VirtualServerList(ctk.CTkFrame):
+    """
+    Server list that only creates widgets for the rows that are visible.
+
+    A fixed pool of row widgets is rebound to different configurations as the
+    list scrolls, so the widget count does not grow with the inventory size.
+    """
+
+    ROW_HEIGHT = 36
+
+    def __init__(self, master, selection: SelectionModel, **kwargs):
+        super().__init__(master, **kwargs)
+        self.selection = selection
+        self.model = ServerListModel()
+        self.rows: List[tuple] = []
+        self.first_row = 0
+        self._pool = []
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body.bind("<Configure>", lambda event: self._render())
+        self.body.bind("<MouseWheel>", self._on_mousewheel)
+        self.body.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.body.bind("<Button-5>", lambda event: self.scroll_rows(3))
+
+    def set_configurations(self, configs):
+        """Show configs; redraws only when the rows actually changed"""
+        diff = self.model.update(configs)
+        if not diff:
+            return
+        self.rows = [self.model.rows[name] for name in self.model.order]
+        if diff.removed:
+            self.selection.retain(self.model.order)
+        self._render()
+
+    def _visible_count(self) -> int:
+        return max(1, self.body.winfo_height() // self.ROW_HEIGHT)
+
+    def _make_row(self):
+        """Create one pooled row widget"""
+        frame = ctk.CTkFrame(self.body, height=self.ROW_HEIGHT - 4)
+        var = ctk.BooleanVar()
+        check = ctk.CTkCheckBox(frame, text="", variable=var, width=40)
+        check.pack(side="left", padx=5)
+        labels = [ctk.CTkLabel(frame, text="", width=width) for width in (100, 200, 200, 160)]
+        for label in labels:
+            label.pack(side="left", padx=5)
+        for widget in (frame, *labels):
+            widget.bind("<MouseWheel>", self._on_mousewheel)
+            widget.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+            widget.bind("<Button-5>", lambda event: self.scroll_rows(3))
+        row = {'frame': frame, 'var': var, 'check': check, 'labels': labels, 'name': None}
+        check.configure(command=lambda: self._toggle(row))
+        return row
+
+    def _render(self):
+        """Bind the pooled row widgets to the rows in the visible window"""
+        visible = self._visible_count()
+        while len(self._pool) < visible:
+            self._pool.append(self._make_row())
+
+        self.first_row = max(0, min(self.first_row, len(self.rows) - visible))
+        for slot, row in enumerate(self._pool):
+            index = self.first_row + slot
+            if slot >= visible or index >= len(self.rows):
+                row['name'] = None
+                row['frame'].place_forget()
+                continue
+            name = self.rows[index][1]
+            row['name'] = name
+            row['var'].set(self.selection.is_selected(name))
+            for label, text in zip(row['labels'], self.rows[index]):
+                label.configure(text=text)
+            row['frame'].place(x=0, y=slot * self.ROW_HEIGHT, relwidth=1.0)
+
+        if self.rows:
+            self.scrollbar.set(self.first_row / len(self.rows),
+                               min(1.0, (self.first_row + visible) / len(self.rows)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _toggle(self, row):
+        if row['name'] is not None:
+            self.selection.set_selected(row['name'], row['var'].get())
+
+    def scroll_rows(self, delta: int):
+        self.first_row += delta
+        self._render()
+
+    def _on_mousewheel(self, event):
+        self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.first_row = int(float(args[0]) * len(self.rows))
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            self.scroll_rows(amount * (self._visible_count() if unit == "pages" else 1))
+            return
+        self._render()
+
 class PublishWorker(threading.Thread):
-    def __init__(self, app_file_path: str, configs: List[Dict], credential_manager: CredentialManager, result_queue: Queue):
+    def __init__(self, app_file_path: str, configs: List[Dict], credential_manager: CredentialManager, channel: TkEventChannel,
+                 max_workers: int = PublishEngine.DEFAULT_MAX_WORKERS,
+                 per_host_limit: int = PublishEngine.DEFAULT_PER_HOST_LIMIT,
+                 force: bool = False, staged: bool = False):
         super().__init__()
-        self.app_file_path = app_file_path
         self.configs = configs
         self.credential_manager = credential_manager
-        self.result_queue = result_queue
+        self.channel = channel
+        self.broker = CredentialBroker(channel.post)
+        # Hashing, journaling, retries and the staged rollout are shared with the other front ends
+        self.pipeline = PublishPipeline(
+            app_file_path,
+            create_engine(len(configs), max_workers, per_host_limit),
+            force=force,
+            canary_size=RolloutScheduler.DEFAULT_CANARY_SIZE if staged else None,
+            credential_manager=credential_manager,
+            on_event=lambda event: self.channel.post('info', describe_rollout_event(event))
+        )
         self.daemon = True
         logger.debug("PublishWorker initialized")
 
     def run(self):
         try:
             logger.debug("Starting PublishWorker thread")
-            for config in self.configs:
-                if config['environmentType'].lower() == 'onprem':
-                    server_id = f"{config['server']}_{config['serverInstance']}"
-                    logger.debug(f"Processing server: {server_id}")
-
-                    # Try to get existing credentials
-                    existing_creds = self.credential_manager.get_credentials(server_id)
-                    if existing_creds:
-                        logger.debug(f"Using existing credentials for {server_id}")
-                        username = existing_creds['username']
-                        password = existing_creds['password']
-                    else:
-                        # Request credentials from main thread
-                        logger.debug(f"Requesting credentials for {server_id}")
-                        self.result_queue.put(('need_credentials', server_id, config))
-
-                        # Wait for credentials response with timeout
-                        try:
-                            logger.debug(f"Waiting for credentials for {server_id}")
-                            response = self.result_queue.get(timeout=60)
-                            if response[0] != 'credentials_provided':
-                                logger.warning(f"No credentials provided for {server_id}")
-                                self.result_queue.put(('failed', config['name'], "No credentials provided"))
-                                continue
-                            username = response[1]
-                            password = response[2]
-                        except Empty:
-                            logger.error(f"Timeout waiting for credentials for {server_id}")
-                            self.result_queue.put(('failed', config['name'], "Credential request timed out"))
-                            continue
-
-                    try:
-                        logger.debug(f"Publishing to {server_id}")
-                        success, message = AppPublisher.publish_to_onprem(
-                            self.app_file_path,
-                            config,
-                            username,
-                            password
-                        )
-
-                        if success:
-                            logger.debug(f"Successfully published to {server_id}, storing credentials")
-                            self.credential_manager.store_credentials(server_id, username, password)
-                        else:
-                            logger.warning(f"Failed to publish to {server_id}: {message}")
-
-                        self.result_queue.put(('progress', config['name'], success, message))
-                    except Exception as e:
-                        logger.error(f"Error publishing to {server_id}: {str(e)}\n{traceback.format_exc()}")
-                        self.result_queue.put(('failed', config['name'], f"Error: {str(e)}"))
+            deployment_id = self.pipeline.begin(self.configs)
+            if self.pipeline.digest:
+                self.channel.post('info', f"SHA-256: {self.pipeline.digest}")
+            self.channel.post('info', f"Deployment: {deployment_id}")
+            if self.pipeline.unchecked:
+                self.channel.post('info', f"{self.pipeline.unchecked} OnPrem server(s) cannot report their installed version "
+                                          "and are published even if already up to date")
+
+            # Resolve every credential up front so no publish thread waits on the UI
+            credentials, ready_configs, failed = collect_credentials(self.configs, self.credential_manager, self.broker)
+            for config, reason in failed:
+                self.pipeline.fail(config, reason)
+                self.channel.post('failed', config['name'], reason)
+
+            # Credentials are resolved, publish to all servers concurrently
+            for result in self.pipeline.run(ready_configs, credentials):
+                self.channel.post('progress', result['config']['name'], result['success'], result['message'])
 
         except Exception as e:
             logger.error(f"Worker thread error: {str(e)}\n{traceback.format_exc()}")
-            self.result_queue.put(('error', str(e)))
+            self.channel.post('error', str(e))
+        finally:
+            self.channel.post('done')
+
+class ConnectionTestWorker(threading.Thread):
+    """Tests connections to several servers concurrently and posts each result as it finishes"""
+
+    MAX_WORKERS = 16
+    PER_HOST_LIMIT = 4
+
+    def __init__(self, configs: List[Dict], channel: TkEventChannel):
+        super().__init__()
+        self.configs = configs
+        self.channel = channel
+        self.engine = PublishEngine(self.MAX_WORKERS, self.PER_HOST_LIMIT)
+        self.retry_policy = AppPublisher.create_probe_retry_policy(RetryBudget.for_targets(len(configs)))
+        self.daemon = True
+
+    def run(self):
+        try:
+            for result in self.engine.run(
+                self.configs, lambda config: AppPublisher.probe_connection(config, retry_policy=self.retry_policy)):
+                self.channel.post('tested', result['config']['name'], result['success'], result['message'],
+                                  result.get('timings', {}))
+        except Exception as e:
+            logger.error(f"Connection test worker error: {str(e)}\n{traceback.format_exc()}")
+            self.channel.post('error', str(e))
+        finally:
+            self.channel.post('done')
 
 class BCPublisherApp(TkinterDnD.Tk):
     def __init__(self):
@@ -157,11 +282,20 @@ class BCPublisherApp(TkinterDnD.Tk):
         # Initialize managers
         self.config_manager = ConfigurationManager()
         self.credential_manager = CredentialManager()
+        self.selection = SelectionModel()
 
         # Setup UI
         self.setup_ui()
+        self.selection.add_listener(self.update_button_states)
         self.update_server_list()
 
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        """Write pending configuration changes before closing the window"""
+        self.config_manager.flush()
+        self.destroy()
+
     def setup_ui(self):
         # Main container with padding
         container = ctk.CTkFrame(self)
@@ -173,6 +307,7 @@ class BCPublisherApp(TkinterDnD.Tk):
             title=get_text('extension_file'),
             accept_extensions=['.app'],
             placeholder=get_text('drop_app'),
+            describe_file=self.select_app_file,
             height=100
         )
         self.app_drop.pack(fill="x", pady=(0, 10))
@@ -191,9 +326,9 @@ class BCPublisherApp(TkinterDnD.Tk):
         list_frame = ctk.CTkFrame(container)
         list_frame.pack(fill="both", expand=True, pady=(0, 10))
 
-        # Server list with scrollable frame
-        self.tree = ctk.CTkScrollableFrame(list_frame)
-        self.tree.pack(fill="both", expand=True)
+        # Virtualized server list
+        self.server_list = VirtualServerList(list_frame, self.selection)
+        self.server_list.pack(fill="both", expand=True)
 
         # Action buttons
         button_frame = ctk.CTkFrame(container)
@@ -215,67 +350,120 @@ class BCPublisherApp(TkinterDnD.Tk):
         )
         self.publish_btn.pack(side="right", padx=5)
 
+        # Targets already running this app version are skipped unless forced
+        self.force_publish = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            button_frame,
+            text=get_text('force_publish'),
+            variable=self.force_publish
+        ).pack(side="right", padx=5)
+
+        # Staged rollouts publish to a canary first and abort when a wave fails too often
+        self.staged_rollout = ctk.BooleanVar(value=False)
+        ctk.CTkCheckBox(
+            button_frame,
+            text=get_text('staged_rollout'),
+            variable=self.staged_rollout
+        ).pack(side="right", padx=5)
+
+    def select_app_file(self, file_path: str) -> str:
+        """Start hashing a selected app in the background and describe it for the drop zone"""
+        get_artifact_hasher().start(file_path)
+        return describe_app_file(file_path)
+
     def update_server_list(self):
-        # Clear existing items
-        for widget in self.tree.winfo_children():
-            widget.destroy()
-
-        # Add items from configuration manager
-        for i, config in enumerate(self.config_manager.get_configurations()):
-            row = ctk.CTkFrame(self.tree)
-            row.pack(fill="x", pady=2)
-
-            # Checkbox
-            var = ctk.BooleanVar()
-            check = ctk.CTkCheckBox(row, text="", variable=var, width=40)
-            check.pack(side="left", padx=5)
-
-            # Labels
-            ctk.CTkLabel(row, text=config['environmentType'], width=100).pack(side="left", padx=5)
-            ctk.CTkLabel(row, text=config['name'], width=200).pack(side="left", padx=5)
-            ctk.CTkLabel(row, text=config.get('serverInstance', ''), width=200).pack(side="left", padx=5)
-
-    def show_credential_dialog(self, server_config):
+        self.server_list.set_configurations(self.config_manager.get_configurations_view())
+        self.update_button_states()
+
+    def update_button_states(self):
+        """Enable the action buttons when at least one server is checked"""
+        new_state = "normal" if len(self.selection) else "disabled"
+        self.test_btn.configure(state=new_state)
+        self.publish_btn.configure(state=new_state)
+
+    def get_selected_configs(self) -> List[Dict]:
+        """Get the checked configurations in list order"""
+        return self.selection.selected_configs(self.config_manager)
+
+    def show_credentials_dialog(self, missing):
+        """
+        Show one dialog asking for the credentials of every server in missing.
+
+        Args:
+            missing: List of (server_id, config) without stored credentials
+
+        Returns:
+            dict: (username, password) by server id for the servers that were filled in
+        """
         dialog = ctk.CTkToplevel(self)
         dialog.title("Server Authentication")
-        dialog.geometry("400x300")
+        dialog.geometry(f"560x{min(260 + 70 * len(missing), 600)}")
         dialog.transient(self)
         dialog.grab_set()
 
         # Header
         header = ctk.CTkLabel(
             dialog,
-            text=f"Authentication Required\n{server_config['name']}",
+            text=f"Authentication Required\n{len(missing)} server(s)",
             font=("Segoe UI", 14, "bold")
         )
         header.pack(pady=20)
 
-        # Username
-        username_label = ctk.CTkLabel(dialog, text="Username")
-        username_label.pack(pady=(10, 0))
-        username_entry = ctk.CTkEntry(dialog)
-        username_entry.pack(pady=(0, 10), padx=20, fill="x")
-
-        # Password
-        password_label = ctk.CTkLabel(dialog, text="Password")
-        password_label.pack(pady=(10, 0))
-        password_entry = ctk.CTkEntry(dialog, show="•")
-        password_entry.pack(pady=(0, 20), padx=20, fill="x")
-
-        result = {'username': None, 'password': None}
+        # Buttons are packed before the rows so they stay visible
+        button_frame = ctk.CTkFrame(dialog)
+        button_frame.pack(side="bottom", fill="x", padx=20, pady=10)
+
+        # Reuse the first server's credentials for all servers
+        shared = ctk.BooleanVar(value=False)
+        if len(missing) > 1:
+            ctk.CTkCheckBox(
+                dialog,
+                text="Use the first credentials for all servers",
+                variable=shared,
+                command=lambda: update_shared()
+            ).pack(side="bottom", anchor="w", padx=20, pady=(10, 0))
+
+        rows_frame = ctk.CTkScrollableFrame(dialog)
+        rows_frame.pack(fill="both", expand=True, padx=20)
+        rows_frame.grid_columnconfigure(1, weight=1)
+        rows_frame.grid_columnconfigure(3, weight=1)
+
+        entries = []
+        for row, (server_id, config) in enumerate(missing):
+            ctk.CTkLabel(
+                rows_frame,
+                text=describe_credentials(config)
+            ).grid(row=row * 2, column=0, columnspan=4, sticky="w", pady=(8, 2))
+            ctk.CTkLabel(rows_frame, text="Username").grid(row=row * 2 + 1, column=0, sticky="w", padx=(0, 5))
+            username_entry = ctk.CTkEntry(rows_frame)
+            username_entry.grid(row=row * 2 + 1, column=1, sticky="ew", padx=(0, 10))
+            ctk.CTkLabel(rows_frame, text="Password").grid(row=row * 2 + 1, column=2, sticky="w", padx=(0, 5))
+            password_entry = ctk.CTkEntry(rows_frame, show="•")
+            password_entry.grid(row=row * 2 + 1, column=3, sticky="ew")
+            entries.append((server_id, username_entry, password_entry))
+
+        def update_shared():
+            state = "disabled" if shared.get() else "normal"
+            for _, username_entry, password_entry in entries[1:]:
+                username_entry.configure(state=state)
+                password_entry.configure(state=state)
+
+        result = {}
 
         def on_ok():
-            result['username'] = username_entry.get()
-            result['password'] = password_entry.get()
+            first_username, first_password = entries[0][1].get(), entries[0][2].get()
+            for server_id, username_entry, password_entry in entries:
+                if shared.get():
+                    username, password = first_username, first_password
+                else:
+                    username, password = username_entry.get(), password_entry.get()
+                if username and password:
+                    result[server_id] = (username, password)
             dialog.destroy()
 
         def on_cancel():
             dialog.destroy()
 
-        # Buttons
-        button_frame = ctk.CTkFrame(dialog)
-        button_frame.pack(fill="x", padx=20, pady=10)
-
         ctk.CTkButton(
             button_frame,
             text="Cancel",
@@ -297,17 +485,11 @@ class BCPublisherApp(TkinterDnD.Tk):
         dialog.geometry(f"+{x}+{y}")
 
         dialog.wait_window()
-        return result['username'], result['password']
+        return result
 
     def test_selected_connections(self):
-        """Test connection to selected servers"""
-        selected_servers = []
-        for widget in self.tree.winfo_children():
-            checkbox = widget.winfo_children()[0]  # First child is the checkbox
-            if isinstance(checkbox, ctk.CTkCheckBox) and checkbox.get():
-                index = list(self.tree.winfo_children()).index(widget)
-                if 0 <= index < len(self.config_manager.get_configurations()):
-                    selected_servers.append(self.config_manager.get_configurations()[index])
+        """Test connections to the selected servers concurrently"""
+        selected_servers = self.get_selected_configs()
 
         if not selected_servers:
             from tkinter import messagebox
@@ -317,17 +499,28 @@ class BCPublisherApp(TkinterDnD.Tk):
         # Create a progress dialog
         progress_dialog = self.show_progress_dialog(get_text('connection_test_progress'))
         progress_text = progress_dialog.winfo_children()[0]  # First child is the text widget
-
-        for config in selected_servers:
-            progress_text.insert('end', f"Testing connection to {config['name']}...\n")
-            progress_text.see('end')
-            progress_text.update()
-
-            success, message = AppPublisher.test_server_connection(config)
-            status = "✓" if success else "✗"
-            progress_text.insert('end', f"{status} {message}\n")
-            progress_text.see('end')
-            progress_text.update()
+        update_progress = ProgressSink(progress_text).write
+        update_progress(f"Testing connection to {len(selected_servers)} server(s)...")
+
+        test_results = []
+
+        def handle_event(event):
+            """Handle an event posted by the worker; runs on the Tk thread"""
+            if event[0] == 'tested':
+                server_name, success, message, timings = event[1], event[2], event[3], event[4]
+                test_results.append((server_name, success, timings))
+                update_progress(format_test_result(success, message, timings))
+            elif event[0] == 'error':
+                update_progress(f"Error: {event[1]}")
+            elif event[0] == 'done':
+                channel.close()
+                for line in summarize_connection_tests(test_results):
+                    update_progress(line)
+                # Show hosts whose circuit breaker opened during the tests
+                self.update_server_list()
+
+        channel = TkEventChannel(self, handle_event)
+        ConnectionTestWorker(selected_servers, channel).start()
 
     def show_progress_dialog(self, title):
         """Create and show a progress dialog"""
@@ -356,13 +549,7 @@ class BCPublisherApp(TkinterDnD.Tk):
             messagebox.showerror("Error", get_text('select_app'))
             return
 
-        selected_servers = []
-        for widget in self.tree.winfo_children():
-            checkbox = widget.winfo_children()[0]  # First child is the checkbox
-            if isinstance(checkbox, ctk.CTkCheckBox) and checkbox.get():
-                index = list(self.tree.winfo_children()).index(widget)
-                if 0 <= index < len(self.config_manager.get_configurations()):
-                    selected_servers.append(self.config_manager.get_configurations()[index])
+        selected_servers = self.get_selected_configs()
 
         if not selected_servers:
             from tkinter import messagebox
@@ -372,50 +559,42 @@ class BCPublisherApp(TkinterDnD.Tk):
         # Show progress dialog
         progress_dialog = self.show_progress_dialog(get_text('deployment_progress'))
         progress_text = progress_dialog.winfo_children()[0]
+        update_progress = ProgressSink(progress_text).write
 
-        def update_progress(message):
-            progress_text.insert('end', f"{message}\n")
-            progress_text.see('end')
-            progress_text.update()
+        def handle_event(event):
+            """Handle an event posted by the worker; runs on the Tk thread"""
+            try:
+                if event[0] == 'need_credentials':
+                    request_id, missing = event[1], event[2]
+                    worker.broker.respond(request_id, self.show_credentials_dialog(missing))
+                elif event[0] == 'progress':
+                    server_name, success, message = event[1], event[2], event[3]
+                    status = "✓" if success else "✗"
+                    update_progress(f"{status} {server_name}: {message}")
+                elif event[0] == 'info':
+                    update_progress(event[1])
+                elif event[0] == 'failed':
+                    server_name, message = event[1], event[2]
+                    update_progress(f"✗ {server_name}: {message}")
+                elif event[0] == 'error':
+                    update_progress(f"Error: {event[1]}")
+                elif event[0] == 'done':
+                    channel.close()
+                    self.update_server_list()
+            except Exception as e:
+                update_progress(f"Error checking progress: {str(e)}")
 
-        # Initialize worker thread
-        result_queue = Queue()
+        # Initialize worker thread; it wakes the UI through the channel instead of being polled
+        channel = TkEventChannel(self, handle_event)
         worker = PublishWorker(
             self.app_drop.file_path,
             selected_servers,
             self.credential_manager,
-            result_queue
+            channel,
+            force=self.force_publish.get(),
+            staged=self.staged_rollout.get()
         )
-
-        def check_progress():
-            try:
-                while True:
-                    try:
-                        result = result_queue.get_nowait()
-                        if result[0] == 'need_credentials':
-                            server_id, config = result[1], result[2]
-                            username, password = self.show_credential_dialog(config)
-                            if username and password:
-                                result_queue.put(('credentials_provided', username, password))
-                            else:
-                                result_queue.put(('credentials_failed',))
-                        elif result[0] == 'progress':
-                            server_name, success, message = result[1], result[2], result[3]
-                            status = "✓" if success else "✗"
-                            update_progress(f"{status} {server_name}: {message}")
-                        elif result[0] == 'error':
-                            update_progress(f"Error: {result[1]}")
-                            break
-                    except Empty:
-                        break
-
-                if worker.is_alive():
-                    self.after(100, check_progress)
-            except Exception as e:
-                update_progress(f"Error checking progress: {str(e)}")
-
         worker.start()
-        check_progress()
 
 def main():
     app = BCPublisherApp()
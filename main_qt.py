@@ -1,67 +1,113 @@
 import sys
 import os
 import json
+import logging
+import traceback
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QLabel, QPushButton, QFrame, QTreeWidget, QTreeWidgetItem,
-                            QMessageBox, QScrollArea, QTextEdit)
+                            QMessageBox, QScrollArea, QTextEdit, QCheckBox)
 from PyQt6.QtCore import Qt, QThread, pyqtSignal, QMimeData
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent
 
 from utils.config_manager import ConfigurationManager
 from utils.credential_manager import CredentialManager
+from utils.retry_policy import RetryBudget
+from utils.rollout_scheduler import RolloutScheduler, describe_rollout_event
 from utils.json_parser import parse_server_config
 from utils.app_publisher import AppPublisher
+from utils.publish_engine import PublishEngine
+from utils.publish_pipeline import PublishPipeline, create_engine
+from utils.app_package import describe_app_file
+from utils.artifact_hash import get_artifact_hasher
+from utils.connection_probe import format_test_result, summarize_connection_tests
+from utils.credential_broker import CredentialBroker, collect_credentials
 from utils.translations import get_text
+from ui.server_list_model import ServerListModel
+from ui.selection_model import SelectionModel
+
+logger = logging.getLogger(__name__)
 
 class PublishWorker(QThread):
     progress = pyqtSignal(str, bool, str)  # server_name, success, message
+    info = pyqtSignal(str)
+    error = pyqtSignal(str)
     finished = pyqtSignal()
-    credential_request = pyqtSignal(dict)
-    credential_response = None
+    credential_request = pyqtSignal(str, list)  # request_id, [(server_id, config)]
 
-    def __init__(self, app_file_path, configs, credential_manager):
+    def __init__(self, app_file_path, configs, credential_manager,
+                 max_workers=PublishEngine.DEFAULT_MAX_WORKERS,
+                 per_host_limit=PublishEngine.DEFAULT_PER_HOST_LIMIT,
+                 force=False, staged=False):
         super().__init__()
-        self.app_file_path = app_file_path
         self.configs = configs
         self.credential_manager = credential_manager
+        # Hashing, journaling, retries and the staged rollout are shared with the other front ends
+        self.pipeline = PublishPipeline(
+            app_file_path,
+            create_engine(len(configs), max_workers, per_host_limit),
+            force=force,
+            canary_size=RolloutScheduler.DEFAULT_CANARY_SIZE if staged else None,
+            credential_manager=credential_manager,
+            on_event=lambda event: self.info.emit(describe_rollout_event(event))
+        )
+        # Answered by the UI thread in response to credential_request
+        self.broker = CredentialBroker(self._post_credential_request)
 
     def run(self):
-        for config in self.configs:
-            if config['environmentType'].lower() == 'onprem':
-                server_id = f"{config['server']}_{config['serverInstance']}"
-                
-                # Try to get existing credentials
-                existing_creds = self.credential_manager.get_credentials(server_id)
-                if existing_creds:
-                    username = existing_creds['username']
-                    password = existing_creds['password']
-                else:
-                    # Request credentials from main thread
-                    self.credential_request.emit(config)
-                    while self.credential_response is None:
-                        self.msleep(100)
-                    
-                    if not self.credential_response:
-                        self.progress.emit(config['name'], False, "No credentials provided")
-                        continue
-                        
-                    username = self.credential_response['username']
-                    password = self.credential_response['password']
-                    self.credential_response = None
-
-                success, message = AppPublisher.publish_to_onprem(
-                    self.app_file_path,
-                    config,
-                    username,
-                    password
-                )
-
-                if success:
-                    self.credential_manager.store_credentials(server_id, username, password)
-
-                self.progress.emit(config['name'], success, message)
-
-        self.finished.emit()
+        try:
+            deployment_id = self.pipeline.begin(self.configs)
+            if self.pipeline.digest:
+                self.info.emit(f"SHA-256: {self.pipeline.digest}")
+            self.info.emit(f"Deployment: {deployment_id}")
+            if self.pipeline.unchecked:
+                self.info.emit(f"{self.pipeline.unchecked} OnPrem server(s) cannot report their installed version "
+                               "and are published even if already up to date")
+
+            # Resolve every credential up front so no publish thread waits on the UI
+            credentials, ready_configs, failed = collect_credentials(self.configs, self.credential_manager, self.broker)
+            for config, reason in failed:
+                self.pipeline.fail(config, reason)
+                self.progress.emit(config['name'], False, reason)
+
+            # Credentials are resolved, publish to all servers concurrently
+            for result in self.pipeline.run(ready_configs, credentials):
+                self.progress.emit(result['config']['name'], result['success'], result['message'])
+        except Exception as e:
+            # Journal and hashing errors must not leave the UI waiting for finished
+            logger.error(f"Worker thread error: {str(e)}\n{traceback.format_exc()}")
+            self.error.emit(str(e))
+        finally:
+            self.finished.emit()
+
+    def _post_credential_request(self, event, request_id, missing):
+        """Forward a broker request to the UI thread as a signal"""
+        self.credential_request.emit(request_id, missing)
+
+class ConnectionTestWorker(QThread):
+    tested = pyqtSignal(str, bool, str, dict)  # server_name, success, message, timings
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+    MAX_WORKERS = 16
+    PER_HOST_LIMIT = 4
+
+    def __init__(self, configs):
+        super().__init__()
+        self.configs = configs
+        self.engine = PublishEngine(self.MAX_WORKERS, self.PER_HOST_LIMIT)
+        self.retry_policy = AppPublisher.create_probe_retry_policy(RetryBudget.for_targets(len(configs)))
+
+    def run(self):
+        try:
+            # Tests run concurrently; each result is emitted as soon as it finishes
+            for result in self.engine.run(
+                self.configs, lambda config: AppPublisher.probe_connection(config, retry_policy=self.retry_policy)):
+                self.tested.emit(result['config']['name'], result['success'], result['message'], result.get('timings', {}))
+        except Exception as e:
+            logger.error(f"Connection test worker error: {str(e)}\n{traceback.format_exc()}")
+            self.error.emit(str(e))
+        finally:
+            self.finished.emit()
 
 class DropZone(QFrame):
     fileDropped = pyqtSignal(str)
@@ -103,10 +149,20 @@ class BCPublisherApp(QMainWindow):
         self.app_file_path = None
         self.config_manager = ConfigurationManager()
         self.credential_manager = CredentialManager()
+        # Rows currently shown in the server list, keyed by configuration name
+        self.server_list_model = ServerListModel()
+        self.server_items = {}
+        self.selection = SelectionModel()
 
         self.setup_ui()
+        self.selection.add_listener(self.update_button_states)
         self.update_server_list()
 
+    def closeEvent(self, event):
+        """Write pending configuration changes before closing the window"""
+        self.config_manager.flush()
+        super().closeEvent(event)
+
     def setup_ui(self):
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -128,7 +184,8 @@ class BCPublisherApp(QMainWindow):
             get_text('col_select'),
             get_text('col_type'),
             get_text('col_name'),
-            get_text('col_environment')
+            get_text('col_environment'),
+            get_text('col_health')
         ])
         self.server_tree.itemClicked.connect(self.handle_server_click)
         layout.addWidget(self.server_tree)
@@ -146,12 +203,22 @@ class BCPublisherApp(QMainWindow):
         self.publish_button.setEnabled(False)
         button_layout.addWidget(self.publish_button)
 
+        # Targets already running this app version are skipped unless forced
+        self.force_publish_check = QCheckBox(get_text('force_publish'))
+        button_layout.addWidget(self.force_publish_check)
+
+        # Staged rollouts publish to a canary first and abort when a wave fails too often
+        self.staged_rollout_check = QCheckBox(get_text('staged_rollout'))
+        button_layout.addWidget(self.staged_rollout_check)
+
         layout.addLayout(button_layout)
 
     def handle_app_drop(self, file_path):
         if file_path.lower().endswith('.app'):
             self.app_file_path = file_path
-            self.app_drop_zone.update_text(f"Selected: {os.path.basename(file_path)}")
+            self.app_drop_zone.update_text(f"Selected: {describe_app_file(file_path)}")
+            # Hash in the background so the digest is ready when publishing starts
+            get_artifact_hasher().start(file_path)
         else:
             QMessageBox.critical(self, "Error", get_text('invalid_app'))
 
@@ -167,41 +234,53 @@ class BCPublisherApp(QMainWindow):
             QMessageBox.critical(self, "Error", str(e))
 
     def update_server_list(self):
-        self.server_tree.clear()
-        for config in self.config_manager.get_configurations():
+        """Update the server list, changing only rows that differ"""
+        diff = self.server_list_model.update(self.config_manager.get_configurations_view())
+
+        for name in diff.removed:
+            item = self.server_items.pop(name)
+            self.server_tree.takeTopLevelItem(self.server_tree.indexOfTopLevelItem(item))
+        if diff.removed:
+            self.selection.retain(diff.order)
+
+        for name, row in diff.updated:
+            for column, text in enumerate(row, 1):
+                self.server_items[name].setText(column, text)
+
+        for index, name, row in diff.added:
             item = QTreeWidgetItem()
-            item.setText(0, "☐")
-            item.setText(1, config['environmentType'])
-            item.setText(2, config['name'])
-            item.setText(3, config['serverInstance'])
-            self.server_tree.addTopLevelItem(item)
+            item.setText(0, "☑" if self.selection.is_selected(name) else "☐")
+            for column, text in enumerate(row, 1):
+                item.setText(column, text)
+            self.server_tree.insertTopLevelItem(index, item)
+            self.server_items[name] = item
+
+        if diff.reordered:
+            for index, name in enumerate(diff.order):
+                item = self.server_items[name]
+                current = self.server_tree.indexOfTopLevelItem(item)
+                if current != index:
+                    self.server_tree.takeTopLevelItem(current)
+                    self.server_tree.insertTopLevelItem(index, item)
+
+        self.update_button_states()
 
     def handle_server_click(self, item, column):
         if column == 0:  # Checkbox column
-            item.setText(0, "☑" if item.text(0) == "☐" else "☐")
-            self.update_button_states()
+            checked = self.selection.toggle(item.text(2))
+            item.setText(0, "☑" if checked else "☐")
 
     def update_button_states(self):
-        has_selection = any(
-            item.text(0) == "☑"
-            for i in range(self.server_tree.topLevelItemCount())
-            for item in [self.server_tree.topLevelItem(i)]
-        )
+        has_selection = len(self.selection) > 0
         self.publish_button.setEnabled(has_selection)
         self.test_connection_btn.setEnabled(has_selection)
 
     def get_selected_configs(self):
-        selected_configs = []
-        for i in range(self.server_tree.topLevelItemCount()):
-            item = self.server_tree.topLevelItem(i)
-            if item.text(0) == "☑":
-                config = self.config_manager.get_configurations()[i]
-                selected_configs.append(config)
-        return selected_configs
-
-    def show_progress_dialog(self):
+        return self.selection.selected_configs(self.config_manager)
+
+    def show_progress_dialog(self, title=None):
         dialog = QWidget(self)
-        dialog.setWindowTitle(get_text('deployment_progress'))
+        dialog.setWindowTitle(title or get_text('deployment_progress'))
         layout = QVBoxLayout(dialog)
 
         self.progress_text = QTextEdit()
@@ -212,6 +291,33 @@ class BCPublisherApp(QMainWindow):
         dialog.show()
         return dialog
 
+    def test_selected_connections(self):
+        selected_configs = self.get_selected_configs()
+        if not selected_configs:
+            QMessageBox.critical(self, "Error", get_text('select_server_test'))
+            return
+
+        self.show_progress_dialog(get_text('connection_test_progress'))
+        self.progress_text.append(f"Testing connection to {len(selected_configs)} server(s)...")
+        test_results = []
+
+        self.test_worker = ConnectionTestWorker(selected_configs)
+
+        def handle_tested(server_name, success, message, timings):
+            test_results.append((server_name, success, timings))
+            self.progress_text.append(format_test_result(success, message, timings))
+
+        def handle_finished():
+            for line in summarize_connection_tests(test_results):
+                self.progress_text.append(line)
+            # Show hosts whose circuit breaker opened during the tests
+            self.update_server_list()
+
+        self.test_worker.tested.connect(handle_tested)
+        self.test_worker.error.connect(lambda message: self.progress_text.append(f"Error: {message}"))
+        self.test_worker.finished.connect(handle_finished)
+        self.test_worker.start()
+
     def publish_extension(self):
         if not self.app_file_path:
             QMessageBox.critical(self, "Error", get_text('select_app'))
@@ -229,21 +335,25 @@ class BCPublisherApp(QMainWindow):
         self.publish_worker = PublishWorker(
             self.app_file_path,
             selected_configs,
-            self.credential_manager
+            self.credential_manager,
+            force=self.force_publish_check.isChecked(),
+            staged=self.staged_rollout_check.isChecked()
         )
 
         def handle_progress(server_name, success, message):
             status = "✓" if success else "✗"
             self.progress_text.append(f"{status} {server_name}: {message}")
 
-        def handle_credential_request(config):
-            # Show credential dialog and send response back to worker
-            from utils.credential_dialog import get_credentials
-            credentials = get_credentials(self, config)
-            self.publish_worker.credential_response = credentials
+        def handle_credential_request(request_id, missing):
+            # Ask for all missing credentials at once and answer the waiting request
+            from utils.credential_dialog import get_batch_credentials
+            self.publish_worker.broker.respond(request_id, get_batch_credentials(self, missing))
 
         self.publish_worker.progress.connect(handle_progress)
+        self.publish_worker.info.connect(self.progress_text.append)
+        self.publish_worker.error.connect(lambda message: self.progress_text.append(f"Error: {message}"))
         self.publish_worker.credential_request.connect(handle_credential_request)
+        self.publish_worker.finished.connect(self.update_server_list)
         self.publish_worker.start()
 
 def main():
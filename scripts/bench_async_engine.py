@@ -0,0 +1,164 @@
+"""
+Publish to thousands of simulated OnPrem targets and report time, threads and memory.
+
+A local asyncio server stands in for the Business Central dev endpoints. It
+listens on several loopback addresses so the targets spread over many hosts,
+and answers each upload after --latency seconds, like a server running the
+schema sync. Compare both engines:
+
+    python scripts/bench_async_engine.py --targets 5000
+    python scripts/bench_async_engine.py --targets 5000 --engine thread --concurrency 64
+
+Usage: python scripts/bench_async_engine.py [--targets 5000] [--hosts 50] [--concurrency 256]
+       [--per-host 8] [--latency 0.2] [--app-size 65536] [--engine async|thread]
+"""
+import argparse
+import asyncio
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.app_publisher import AppPublisher
+from utils.async_engine import AsyncPublishEngine
+from utils.publish_engine import PublishEngine
+from utils.retry_policy import RetryPolicy
+
+
+class SimulatedServer:
+    """Accepts uploads on 127.0.0.1..127.0.0.<hosts> and answers after a fixed latency"""
+
+    def __init__(self, hosts: int, latency: float):
+        self.addresses = [f"127.0.0.{index + 1}" for index in range(hosts)]
+        self.latency = latency
+        self.port = None
+        self.uploads = 0
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+
+    async def _handle(self, reader, writer):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            await asyncio.sleep(self.latency)
+            self.uploads += 1
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _serve(self):
+        server = await asyncio.start_server(self._handle, host=self.addresses, port=0, backlog=4096)
+        self.port = server.sockets[0].getsockname()[1]
+        # Every address must share the port the first one was given
+        server.close()
+        await server.wait_closed()
+        self._server = await asyncio.start_server(self._handle, host=self.addresses, port=self.port, backlog=4096)
+        self._ready.set()
+        await self._server.serve_forever()
+
+    def start(self):
+        thread = threading.Thread(target=lambda: self._loop.run_until_complete(self._serve()), daemon=True)
+        thread.start()
+        self._ready.wait()
+
+
+class ThreadSampler:
+    """Samples the process's thread count in the background"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--targets", type=int, default=5000)
+    parser.add_argument("--hosts", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=AsyncPublishEngine.DEFAULT_MAX_CONCURRENCY)
+    parser.add_argument("--per-host", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--app-size", type=int, default=64 * 1024)
+    parser.add_argument("--engine", choices=["async", "thread"], default="async")
+    args = parser.parse_args()
+
+    server = SimulatedServer(args.hosts, args.latency)
+    server.start()
+
+    configs = [{
+        'name': f"Tenant{index:05d}",
+        'environmentType': 'OnPrem',
+        'server': f"http://{server.addresses[index % args.hosts]}:{server.port}",
+        'serverInstance': 'BC',
+        'tenant': f"tenant{index}",
+        'authentication': 'UserPassword'
+    } for index in range(args.targets)]
+    retry_policy = RetryPolicy(max_attempts=1)
+
+    def publish(config):
+        success, message, attempts = AppPublisher.publish(app_path, config, "bench", "bench", retry_policy)
+        return success, message, {'attempts': attempts}
+
+    async def publish_async(config):
+        success, message, attempts = await AppPublisher.publish_async(app_path, config, "bench", "bench", retry_policy)
+        return success, message, {'attempts': attempts}
+
+    with tempfile.NamedTemporaryFile(suffix=".app", delete=False) as f:
+        f.write(os.urandom(args.app_size))
+        app_path = f.name
+
+    try:
+        rss_before = max_rss_mb()
+        succeeded = 0
+        started = time.perf_counter()
+        with ThreadSampler() as threads:
+            if args.engine == "async":
+                engine = AsyncPublishEngine(args.concurrency, args.per_host)
+                results = engine.run(configs, publish_async)
+            else:
+                engine = PublishEngine(args.concurrency, args.per_host)
+                results = engine.run(configs, publish)
+            for result in results:
+                succeeded += result['success']
+        elapsed = time.perf_counter() - started
+    finally:
+        os.unlink(app_path)
+
+    print(f"engine:          {args.engine} (concurrency {args.concurrency}, {args.per_host} per host)")
+    print(f"targets:         {args.targets} on {args.hosts} hosts, {succeeded} succeeded")
+    print(f"wall time:       {elapsed:8.2f} s ({args.targets / elapsed:.0f} targets/s)")
+    print(f"peak threads:    {threads.peak:8d} (sampler and simulated server included)")
+    print(f"peak RSS:        {max_rss_mb():8.1f} MB (before the run: {rss_before:.1f} MB)")
+    return 0 if succeeded == args.targets else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
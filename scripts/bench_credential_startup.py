@@ -0,0 +1,39 @@
+"""
+Measure CredentialManager startup cost with a cold and a warm key cache.
+
+Usage: python scripts/bench_credential_startup.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.credential_manager import CredentialManager
+
+
+def time_first_access():
+    """Construct a manager and time construction plus the first credential lookup"""
+    started = time.perf_counter()
+    manager = CredentialManager()
+    constructed = time.perf_counter()
+    manager.get_credentials("bench_server")
+    accessed = time.perf_counter()
+    return (constructed - started) * 1000, (accessed - started) * 1000
+
+
+def main():
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+
+        construct_ms, cold_ms = time_first_access()
+        print(f"construction:           {construct_ms:8.1f} ms")
+        print(f"cold (key derived):     {cold_ms:8.1f} ms")
+
+        _, warm_ms = time_first_access()
+        print(f"warm (key from cache):  {warm_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
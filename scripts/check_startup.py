@@ -0,0 +1,79 @@
+"""
+Startup-time budget check for the application entry points.
+
+Imports the given module in a fresh interpreter with -X importtime, reports
+the slowest imports, and exits with status 1 if the total import time
+exceeds the budget or if a module that should be loaded lazily is imported
+at startup.
+
+Usage: python scripts/check_startup.py [--module main] [--budget-ms 400]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Heavy modules that must only be loaded on first use
+DEFERRED_MODULES = ['cryptography', 'requests', 'urllib3', 'asyncio', 'ssl']
+
+
+def measure_imports(module):
+    """Return a list of (cumulative_us, name) for top-level imports of module"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, _, cumulative_us, name = _split_line(line)
+        imports.append((int(cumulative_us), name))
+    return imports
+
+
+def _split_line(line):
+    """Split an importtime line into (label, self_us, cumulative_us, name)"""
+    label, rest = line.split(':', 1)
+    self_us, cumulative_us, name = rest.split('|')
+    return label, self_us.strip(), cumulative_us.strip(), name.rstrip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='main', help="Module to import (default: %(default)s)")
+    parser.add_argument('--budget-ms', type=float, default=400, help="Maximum total import time (default: %(default)s)")
+    parser.add_argument('--top', type=int, default=10, help="Number of slowest imports to show")
+    args = parser.parse_args()
+
+    imports = measure_imports(args.module)
+    # Only top-level entries (no indentation) add up to the total without double counting
+    top_level = [(us, name.strip()) for us, name in imports if not name.startswith('  ')]
+    total_ms = sum(us for us, _ in top_level) / 1000
+    loaded = {name.strip() for _, name in imports}
+
+    print(f"Import time for {args.module}: {total_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    for us, name in sorted(top_level, reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.1f} ms exceeds budget of {args.budget_ms:.0f} ms")
+    for module in DEFERRED_MODULES:
+        if module in loaded:
+            failures.append(f"{module} is imported at startup but should be loaded on first use")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
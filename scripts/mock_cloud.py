@@ -0,0 +1,130 @@
+"""
+Local stand-in for the cloud token endpoint and the environment dev endpoint.
+
+Point the publisher at it through the environment, e.g.
+
+    python scripts/mock_cloud.py --port 8765
+    BC_CLOUD_API_URL=http://127.0.0.1:8765 BC_CLOUD_LOGIN_URL=http://127.0.0.1:8765 python main.py
+
+Any client id and secret are accepted. Tokens expire after --token-lifetime
+seconds, and request counts are printed when the server stops.
+
+Usage: python scripts/mock_cloud.py [--port 8765] [--token-lifetime 3600] [--installed APP_ID=VERSION]
+"""
+import argparse
+import json
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+TOKEN_PATH = re.compile(r"^/(?P<tenant>[^/]+)/oauth2/v2\.0/token$")
+PUBLISH_PATH = re.compile(r"^/v2\.0/(?P<tenant>[^/]+)/(?P<environment>[^/]+)/dev/apps$")
+APPS_PATH = re.compile(r"^/admin/v[\d.]+/applications/BusinessCentral/environments/(?P<environment>[^/]+)/apps$")
+
+
+class MockCloudServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, token_lifetime=3600, installed=None):
+        super().__init__(address, MockCloudHandler)
+        self.token_lifetime = token_lifetime
+        # Installed app versions by app id, reported for every environment
+        self.installed = dict(installed or {})
+        self.tokens = {}
+        self.counts = {'token': 0, 'publish': 0, 'apps': 0, 'rejected': 0}
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class MockCloudHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _authorized(self, count):
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        server = self.server
+        with server.lock:
+            expires_at = server.tokens.get(token)
+            if expires_at is None or expires_at < time.monotonic():
+                server.counts['rejected'] += 1
+                return False
+            server.counts[count] += 1
+            return True
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if APPS_PATH.match(path) and self._authorized('apps'):
+            apps = [{'id': app_id, 'name': app_id, 'publisher': 'Mock', 'version': version, 'state': 'Installed'}
+                    for app_id, version in self.server.installed.items()]
+            self._reply(200, {'value': apps})
+            return
+        # Like the real service, unauthenticated requests are refused; connection tests count this as reachable
+        self._reply(401, {'error': {'code': 'Unauthorized', 'message': 'Authentication required'}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        path = urlparse(self.path).path
+        server = self.server
+
+        if TOKEN_PATH.match(path):
+            form = parse_qs(body.decode())
+            if form.get('grant_type') != ['client_credentials'] or not form.get('client_id'):
+                self._reply(400, {'error': 'invalid_request', 'error_description': 'Client credentials required'})
+                return
+            token = secrets.token_hex(16)
+            with server.lock:
+                server.counts['token'] += 1
+                server.tokens[token] = time.monotonic() + server.token_lifetime
+            self._reply(200, {'access_token': token, 'token_type': 'Bearer', 'expires_in': server.token_lifetime})
+            return
+
+        if PUBLISH_PATH.match(path):
+            if self._authorized('publish'):
+                self._reply(200, {'message': f"Received {len(body)} bytes"})
+            else:
+                self._reply(401, {'error': {'code': 'Unauthorized', 'message': 'The token is invalid or expired'}})
+            return
+
+        self._reply(404, {'message': f"Unknown path {path}"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-lifetime", type=int, default=3600)
+    parser.add_argument("--installed", action="append", default=[], metavar="APP_ID=VERSION",
+                        help="Report this app version as installed in every environment; may be repeated")
+    args = parser.parse_args()
+
+    installed = dict(item.split("=", 1) for item in args.installed)
+    server = MockCloudServer(("127.0.0.1", args.port), args.token_lifetime, installed)
+    print(f"Mock cloud endpoints listening on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Requests: {server.counts}")
+
+
+if __name__ == "__main__":
+    main()
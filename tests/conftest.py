@@ -0,0 +1,135 @@
+import io
+import json
+import threading
+import uuid
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scripts.mock_cloud import MockCloudServer
+from utils import circuit_breaker
+from utils.app_package import MANIFEST_NAME, NAVX_HEADER, NAVX_MAGIC
+from utils.app_publisher import AppPublisher
+from utils.token_cache import get_token_cache
+
+APP_ID = "6f0b5c4e-2d1a-4f3b-9c8d-7e6a5b4c3d2e"
+
+MANIFEST_XML = """<?xml version="1.0" encoding="utf-8"?>
+<Package xmlns="http://schemas.microsoft.com/navx/2015/manifest">
+  <App Id="{app_id}" Name="Demo" Publisher="Contoso" Version="{version}" Platform="24.0.0.0" Application="24.0.0.0" />
+  <Dependencies>
+    <Dependency Id="437DBF0E-84FF-417A-965D-ED2BB9650972" Name="Base Application" Publisher="Microsoft" MinVersion="24.0.0.0" />
+  </Dependencies>
+</Package>
+"""
+
+
+def build_app(path, version="1.0.0.0", app_id=APP_ID, package_id=None, navx=True):
+    """Write a .app file: a NAVX header followed by a zip holding the manifest"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr(MANIFEST_NAME, MANIFEST_XML.format(app_id=app_id, version=version))
+    content = buffer.getvalue()
+    with open(path, 'wb') as f:
+        if navx:
+            package_id = uuid.UUID(package_id) if package_id else uuid.uuid4()
+            f.write(NAVX_HEADER.pack(NAVX_MAGIC, NAVX_HEADER.size, 2, package_id.bytes_le, len(content), NAVX_MAGIC))
+        f.write(content)
+    return str(path)
+
+
+@pytest.fixture
+def make_app(tmp_path):
+    """Factory writing .app files into the test's temporary directory"""
+    def make(name="Demo.app", **kwargs):
+        return build_app(tmp_path / name, **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def app_file(make_app):
+    return make_app()
+
+
+@pytest.fixture(autouse=True)
+def fresh_process_state(monkeypatch):
+    """Circuit breakers and tokens are process-wide; start every test without them"""
+    monkeypatch.setattr(circuit_breaker, '_default_registry', None)
+    get_token_cache().clear()
+    yield
+    get_token_cache().clear()
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    Stands in for a Business Central dev endpoint.
+
+    Every request is recorded; responses are taken from the scripted list of
+    (status, headers, body) and are 200 OK once it is used up.
+    """
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.responses = []
+        self.requests = []
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def onprem_config(self, name="OnPrem1", tenant="default"):
+        return {'name': name, 'environmentType': 'OnPrem', 'server': self.url, 'serverInstance': 'BC',
+                'tenant': tenant, 'authentication': 'UserPassword'}
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.requests.append({'method': self.command, 'path': self.path, 'headers': dict(self.headers), 'body': body})
+            status, headers, payload = server.responses.pop(0) if server.responses else (200, {}, {})
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = _reply
+
+
+@pytest.fixture
+def stand_in_server():
+    server = StandInServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def mock_cloud(monkeypatch):
+    """Token and dev endpoints of the cloud service; the APP_ID 1.0.0.0 is installed everywhere"""
+    server = MockCloudServer(('127.0.0.1', 0), installed={APP_ID: "1.0.0.0"})
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(AppPublisher, 'CLOUD_API_URL', server.url)
+    monkeypatch.setattr(AppPublisher, 'CLOUD_LOGIN_URL', server.url)
+    yield server
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,60 @@
+import os
+import zipfile
+
+import pytest
+
+from utils.app_package import parse_version, read_app_manifest, read_navx_header
+
+
+def test_reads_the_manifest(make_app):
+    app_path = make_app(version="2.1.0.7", package_id="0f1e2d3c-4b5a-6978-8796-a5b4c3d2e1f0")
+
+    manifest = read_app_manifest(app_path)
+
+    assert manifest['id'] == "6f0b5c4e-2d1a-4f3b-9c8d-7e6a5b4c3d2e"
+    assert (manifest['name'], manifest['publisher'], manifest['version']) == ("Demo", "Contoso", "2.1.0.7")
+    assert manifest['package_id'] == "0f1e2d3c-4b5a-6978-8796-a5b4c3d2e1f0"
+    assert manifest['dependencies'] == [{'id': "437dbf0e-84ff-417a-965d-ed2bb9650972", 'name': "Base Application",
+                                         'publisher': "Microsoft", 'min_version': "24.0.0.0"}]
+
+
+def test_reads_a_plain_zip(make_app):
+    app_path = make_app(navx=False)
+
+    assert read_app_manifest(app_path)['version'] == "1.0.0.0"
+    with open(app_path, 'rb') as f:
+        assert read_navx_header(f)['header_size'] == 0
+
+
+def test_rebuilt_file_is_read_again(make_app):
+    app_path = make_app(version="1.0.0.0")
+    assert read_app_manifest(app_path)['version'] == "1.0.0.0"
+    stat = os.stat(app_path)
+
+    # Same size and timestamp, but a new build has a new package id
+    make_app(version="1.0.0.1")
+    os.utime(app_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    assert read_app_manifest(app_path)['version'] == "1.0.0.1"
+
+
+def test_rejects_files_that_are_not_apps(tmp_path):
+    not_an_app = tmp_path / "notes.app"
+    not_an_app.write_bytes(b"just some text")
+
+    with pytest.raises(ValueError, match="missing NAVX header"):
+        read_app_manifest(str(not_an_app))
+
+
+def test_rejects_apps_without_manifest(tmp_path):
+    app_path = tmp_path / "Empty.app"
+    with zipfile.ZipFile(app_path, 'w') as archive:
+        archive.writestr("readme.txt", "no manifest here")
+
+    with pytest.raises(ValueError, match="Not a valid app package"):
+        read_app_manifest(str(app_path))
+
+
+def test_parse_version_pads_to_four_parts():
+    assert parse_version("1.2") == (1, 2, 0, 0)
+    assert parse_version("1.10.0.0") > parse_version("1.9.0.0")
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from utils.app_package import read_app_manifest
+from utils.app_publisher import AppPublisher
+from utils.circuit_breaker import CIRCUIT_OPEN, OPEN, get_circuit_breakers
+from utils.installed_apps import InstalledAppsCache
+from utils.retry_policy import RetryPolicy
+
+
+def no_wait_policy(max_attempts=3):
+    return RetryPolicy(max_attempts=max_attempts, sleep=lambda delay: None)
+
+
+def sandbox_config(name="Sandbox1", tenant="contoso"):
+    return {'name': name, 'environmentType': 'Sandbox', 'environmentName': name.lower(), 'tenant': tenant}
+
+
+def test_onprem_publish_uploads_the_app(stand_in_server, app_file):
+    config = stand_in_server.onprem_config()
+
+    success, message, attempts = AppPublisher.publish(app_file, config, "admin", "secret", no_wait_policy())
+
+    assert success, message
+    assert attempts == 1
+    request, = stand_in_server.requests
+    assert request['path'].startswith("/BC/dev/apps?tenant=default&SchemaUpdateMode=forcesync")
+    assert request['headers']['Authorization'] == AppPublisher._create_auth_header("admin", "secret")
+    assert request['headers']['Content-Type'].startswith("multipart/form-data; boundary=")
+    with open(app_file, 'rb') as f:
+        assert f.read() in request['body']
+
+
+def test_onprem_validation_error_is_not_retried(stand_in_server, app_file):
+    stand_in_server.responses.append((422, {}, {'Message': "The app is missing a dependency"}))
+
+    success, message, attempts = AppPublisher.publish(app_file, stand_in_server.onprem_config(), "admin", "secret",
+                                                      no_wait_policy())
+
+    assert not success
+    assert attempts == 1
+    assert "HTTP 422: The app is missing a dependency" in message
+
+
+def test_onprem_unavailable_is_retried(stand_in_server, app_file):
+    stand_in_server.responses.append((503, {'Retry-After': "0"}, {'message': "Service Unavailable"}))
+
+    success, message, attempts = AppPublisher.publish(app_file, stand_in_server.onprem_config(), "admin", "secret",
+                                                      no_wait_policy())
+
+    assert success, message
+    assert attempts == 2
+    assert len(stand_in_server.requests) == 2
+
+
+def test_onprem_internal_error_is_not_repeated(stand_in_server, app_file):
+    # The server may still be syncing the app; publishing again would start a second sync
+    stand_in_server.responses.append((500, {}, {'message': "Internal Server Error"}))
+
+    success, _, attempts = AppPublisher.publish(app_file, stand_in_server.onprem_config(), "admin", "secret",
+                                                no_wait_policy())
+
+    assert not success
+    assert attempts == 1
+
+
+def test_async_publish_matches_the_sync_result(stand_in_server, app_file):
+    stand_in_server.responses.append((503, {'Retry-After': "0"}, {}))
+
+    success, message, attempts = asyncio.run(AppPublisher.publish_async(
+        app_file, stand_in_server.onprem_config(), "admin", "secret", no_wait_policy()))
+
+    assert success, message
+    assert attempts == 2
+
+
+def test_unreachable_server_opens_the_circuit(app_file):
+    config = {'name': "Down", 'environmentType': 'OnPrem', 'server': "http://127.0.0.1:1", 'serverInstance': 'BC',
+              'tenant': 'default'}
+
+    for _ in range(3):
+        success, _, _ = AppPublisher.publish(app_file, config, "admin", "secret", no_wait_policy(max_attempts=1))
+        assert not success
+
+    assert get_circuit_breakers().state(config) == OPEN
+    attempt = get_circuit_breakers().guard(config, lambda: pytest.fail("the host must not be contacted"))
+    assert attempt()[2]['kind'] == CIRCUIT_OPEN
+
+
+def test_sandbox_publish_reuses_the_token(mock_cloud, app_file):
+    for name in ("Sandbox1", "Sandbox2"):
+        success, message, _ = AppPublisher.publish(app_file, sandbox_config(name), "client", "secret", no_wait_policy())
+        assert success, message
+
+    assert mock_cloud.counts['token'] == 1
+    assert mock_cloud.counts['publish'] == 2
+
+
+def test_sandbox_publish_replaces_a_revoked_token(mock_cloud, app_file):
+    AppPublisher.publish(app_file, sandbox_config(), "client", "secret", no_wait_policy())
+    mock_cloud.tokens.clear()
+
+    success, message, attempts = AppPublisher.publish(app_file, sandbox_config(), "client", "secret", no_wait_policy())
+
+    assert success, message
+    assert attempts == 1
+    assert mock_cloud.counts == {'token': 2, 'publish': 2, 'apps': 0, 'rejected': 1}
+
+
+def test_sandbox_publish_skips_the_installed_version(mock_cloud, make_app):
+    installed_apps = InstalledAppsCache()
+    current = make_app("Current.app", version="1.0.0.0")
+    newer = make_app("Newer.app", version="1.1.0.0")
+
+    success, message, details = AppPublisher.publish_if_outdated(current, sandbox_config(), "client", "secret",
+                                                                 manifest=read_app_manifest(current),
+                                                                 installed_apps=installed_apps)
+    assert success and details['skipped'], message
+
+    success, message, details = AppPublisher.publish_if_outdated(newer, sandbox_config(), "client", "secret",
+                                                                 manifest=read_app_manifest(newer),
+                                                                 installed_apps=installed_apps)
+    assert success and not details['skipped'], message
+    assert mock_cloud.counts['apps'] == 1
+    assert mock_cloud.counts['publish'] == 1
+
+
+def test_sandbox_without_credentials_is_rejected(app_file):
+    success, message, attempts = AppPublisher.publish(app_file, sandbox_config(), None, None)
+
+    assert not success
+    assert attempts == 0
+    assert "no credentials" in message
@@ -0,0 +1,87 @@
+from utils.circuit_breaker import (CIRCUIT_OPEN, CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakerRegistry,
+                                   get_endpoint_key)
+from utils.retry_policy import SERVER_ERROR, TRANSIENT, UNCERTAIN, VALIDATION
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def outcome(kind=None):
+    if kind is None:
+        return lambda: (True, "ok", None)
+    return lambda: (False, kind, {'kind': kind, 'retry_after': None})
+
+
+def onprem(server, name="Target"):
+    return {'name': name, 'environmentType': 'OnPrem', 'server': server, 'serverInstance': 'BC'}
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=30, clock=FakeClock())
+    attempt = breaker.wrap(outcome(TRANSIENT), "host")
+
+    attempt()
+    attempt()
+    assert breaker.state == CLOSED
+    attempt()
+    assert breaker.state == OPEN
+    assert breaker.wrap(outcome(), "host")()[2]['kind'] == CIRCUIT_OPEN
+
+
+def test_half_open_admits_one_trial():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30, clock=clock)
+    breaker.wrap(outcome(SERVER_ERROR), "host")()
+
+    clock.now = 31
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_failed_trial_reopens():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, cooldown=30, clock=clock)
+    breaker.wrap(outcome(TRANSIENT), "host")()
+
+    clock.now = 31
+    breaker.wrap(outcome(TRANSIENT), "host")()
+    assert breaker.state == OPEN
+    assert breaker.retry_in() == 30
+
+
+def test_client_errors_and_uncertain_outcomes_keep_it_closed():
+    breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+
+    breaker.wrap(outcome(TRANSIENT), "host")()
+    # A 4xx answer proves the host is up and resets the count
+    breaker.wrap(outcome(VALIDATION), "host")()
+    breaker.wrap(outcome(TRANSIENT), "host")()
+    # A read timeout while the server syncs proves nothing either way
+    breaker.wrap(outcome(UNCERTAIN), "host")()
+    assert breaker.state == CLOSED
+
+
+def test_endpoints_are_keyed_by_scheme_host_and_port():
+    assert get_endpoint_key(onprem("bc01")) == "http://bc01:7049"
+    assert get_endpoint_key(onprem("https://BC01:7149")) == "https://bc01:7149"
+    assert get_endpoint_key({'name': "S", 'environmentType': 'Sandbox', 'tenant': "Contoso"}) == "sandbox:contoso"
+
+
+def test_registry_isolates_service_tiers_on_one_host():
+    registry = CircuitBreakerRegistry(failure_threshold=1, clock=FakeClock())
+    dead, healthy = onprem("http://bc01:7049"), onprem("http://bc01:8049")
+
+    registry.guard(dead, outcome(TRANSIENT))()
+
+    assert registry.state(dead) == OPEN
+    assert registry.state(healthy) == CLOSED
+    assert registry.guard(healthy, outcome())()[0]
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from utils.deployment_journal import FAILED, QUEUED, SYNCED, UPLOADING, DeploymentJournal
+
+
+def configs(*names):
+    return [{'name': name, 'environmentType': 'OnPrem', 'server': "bc01", 'serverInstance': 'BC'} for name in names]
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return DeploymentJournal(str(tmp_path / "journal.jsonl"))
+
+
+def test_replay_rebuilds_target_states(journal):
+    deployment_id = journal.begin("Demo.app", "abc", configs("A", "B", "C"))
+    task = journal.wrap(deployment_id, "abc", lambda config: (config['name'] != "B", f"{config['name']} done"))
+    for config in configs("A", "B"):
+        task(config)
+    journal.close()
+
+    deployment = journal.find(deployment_id)
+    assert deployment.states == {'A': SYNCED, 'B': FAILED, 'C': QUEUED}
+    assert deployment.messages['B'] == "B done"
+    assert deployment.sha256 == "abc"
+    assert not deployment.finished
+
+
+def test_resume_picks_up_unfinished_targets(journal):
+    deployment_id = journal.begin("Demo.app", "abc", configs("A", "B", "C"))
+    journal.record(deployment_id, "abc", "A", UPLOADING)
+    journal.record(deployment_id, "abc", "A", SYNCED)
+    journal.record(deployment_id, "abc", "B", UPLOADING)
+    journal.close()
+
+    deployment = journal.find()
+    assert deployment.id == deployment_id
+    assert [config['name'] for config in deployment.unfinished_configs()] == ["B", "C"]
+
+
+def test_complete_deployments_are_not_resumed(journal):
+    deployment_id = journal.begin("Demo.app", "abc", configs("A"))
+    journal.record(deployment_id, "abc", "A", SYNCED)
+    journal.finish(deployment_id, "abc")
+
+    assert journal.find() is None
+    assert journal.find(deployment_id).finished
+
+
+def test_torn_tail_is_skipped_and_terminated(journal):
+    deployment_id = journal.begin("Demo.app", "abc", configs("A", "B"))
+    journal.close()
+    # A crash in the middle of a write leaves a partial line
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"event": "target", "deployment": "' + deployment_id + '", "tar')
+
+    journal.record(deployment_id, "abc", "A", SYNCED)
+    journal.close()
+
+    deployment = journal.find(deployment_id)
+    assert deployment.states == {'A': SYNCED, 'B': QUEUED}
+    with open(journal.path, encoding='utf-8') as f:
+        last_line = f.read().splitlines()[-1]
+    assert json.loads(last_line)['state'] == SYNCED
+
+
+def test_task_exceptions_are_journaled(journal):
+    deployment_id = journal.begin("Demo.app", None, configs("A"))
+
+    def explode(config):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        journal.wrap(deployment_id, None, explode)(configs("A")[0])
+    journal.close()
+
+    deployment = journal.find(deployment_id)
+    assert deployment.states['A'] == FAILED
+    assert "boom" in deployment.messages['A']
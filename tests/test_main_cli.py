@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+import main_cli
+
+
+@pytest.fixture
+def config_file(tmp_path, stand_in_server, monkeypatch):
+    # The credential store lives in the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(main_cli.CredentialManager, 'get_credentials', lambda self, server_id: None)
+    path = tmp_path / "configs.json"
+    path.write_text(json.dumps([stand_in_server.onprem_config("A"), stand_in_server.onprem_config("B", tenant="b"),
+                                {'name': "NoCredentials", 'environmentType': 'Sandbox', 'environmentName': "x",
+                                 'tenant': "contoso"}]))
+    return str(path)
+
+
+def run(capsys, *argv):
+    exit_code = main_cli.main(list(argv))
+    return exit_code, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+@pytest.mark.parametrize("option, value", [
+    ("--workers", "0"), ("--per-host", "0"), ("--max-attempts", "0"), ("--retry-budget", "-1"),
+    ("--canary", "0"), ("--wave-growth", "0.5"), ("--max-failure-rate", "2")
+])
+def test_rejects_invalid_numbers(capsys, app_file, option, value):
+    with pytest.raises(SystemExit) as exit_info:
+        main_cli.main([app_file, "--all", option, value])
+
+    assert exit_info.value.code == 2
+    assert option in capsys.readouterr().err
+
+
+def test_publishes_and_reports_json_lines(capsys, tmp_path, app_file, config_file, stand_in_server, monkeypatch):
+    monkeypatch.setenv(main_cli.PASSWORD_ENV_VAR, "secret")
+
+    exit_code, records = run(capsys, app_file, "--import", config_file, "--type", "onprem", "--username", "admin",
+                             "--journal", str(tmp_path / "journal.jsonl"))
+
+    assert exit_code == 0
+    results = [record for record in records if record['event'] == 'result']
+    assert sorted(result['name'] for result in results) == ["A", "B"]
+    assert all(result['success'] and result['attempts'] == 1 for result in results)
+    assert records[-1]['event'] == 'summary'
+    assert records[-1]['succeeded'] == 2
+    assert len(stand_in_server.requests) == 2
+
+
+def test_targets_that_never_ran_report_no_attempts(capsys, tmp_path, app_file, config_file, monkeypatch):
+    monkeypatch.delenv(main_cli.CLIENT_SECRET_ENV_VAR, raising=False)
+
+    exit_code, records = run(capsys, app_file, "--import", config_file, "--name", "NoCredentials",
+                             "--journal", str(tmp_path / "journal.jsonl"))
+
+    assert exit_code == 1
+    result, = [record for record in records if record['event'] == 'result']
+    assert not result['success']
+    assert result['attempts'] == 0
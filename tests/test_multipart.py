@@ -0,0 +1,28 @@
+from email.parser import BytesParser
+from email.policy import HTTP
+
+from utils.multipart import MultipartFileStream
+
+
+def test_body_is_valid_multipart(tmp_path):
+    app_path = tmp_path / "Demo.app"
+    content = bytes(range(256)) * 50
+    app_path.write_bytes(content)
+    stream = MultipartFileStream(str(app_path), chunk_size=1000)
+
+    body = b"".join(stream)
+
+    assert len(body) == len(stream)
+    message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {stream.content_type}\r\n\r\n".encode() + body)
+    part, = message.iter_parts()
+    assert part.get_filename() == "Demo.app"
+    assert part.get_param('name', header='content-disposition') == "file"
+    assert part.get_payload(decode=True) == content
+
+
+def test_body_can_be_sent_again(tmp_path):
+    app_path = tmp_path / "Demo.app"
+    app_path.write_bytes(b"x" * 5000)
+    stream = MultipartFileStream(str(app_path), chunk_size=1024)
+
+    assert b"".join(stream) == b"".join(stream)
@@ -0,0 +1,101 @@
+import random
+import socket
+
+import pytest
+import requests
+
+from utils.retry_policy import (AUTH, PERMANENT, SERVER_ERROR, THROTTLED, TRANSIENT, UNCERTAIN, VALIDATION,
+                                RetryBudget, RetryPolicy, classify_exception, classify_publish_exception,
+                                classify_status, parse_retry_after)
+
+
+def scripted(*outcomes):
+    """An attempt returning the given (success, message, failure) outcomes in order"""
+    remaining = list(outcomes)
+    return lambda: remaining.pop(0)
+
+
+def failure(kind, retry_after=None):
+    return False, kind, {'kind': kind, 'retry_after': retry_after}
+
+
+@pytest.mark.parametrize("status, kind", [
+    (429, THROTTLED), (401, AUTH), (403, AUTH), (408, TRANSIENT), (422, VALIDATION),
+    (500, SERVER_ERROR), (503, SERVER_ERROR), (501, PERMANENT)
+])
+def test_classify_status(status, kind):
+    assert classify_status(status) == kind
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("soon") is None
+
+
+def test_connection_failures_are_transient():
+    assert classify_exception(ConnectionRefusedError())['kind'] == TRANSIENT
+    assert classify_exception(socket.timeout())['kind'] == TRANSIENT
+    assert classify_exception(requests.ConnectTimeout())['kind'] == TRANSIENT
+
+
+def test_publish_read_timeout_is_uncertain():
+    # The server may have received the app and be syncing it
+    assert classify_publish_exception(requests.ReadTimeout())['kind'] == UNCERTAIN
+    assert classify_publish_exception(requests.ConnectTimeout())['kind'] == TRANSIENT
+
+
+def test_retries_until_success():
+    delays = []
+    policy = RetryPolicy(max_attempts=3, sleep=delays.append, rng=random.Random(1))
+
+    success, message, attempts = policy.run(scripted(failure(TRANSIENT), failure(SERVER_ERROR), (True, "ok", None)))
+
+    assert (success, message, attempts) == (True, "ok", 3)
+    assert len(delays) == 2
+    assert 0 <= delays[0] <= RetryPolicy.DEFAULT_BASE_DELAY
+    assert 0 <= delays[1] <= RetryPolicy.DEFAULT_BASE_DELAY * 2
+
+
+def test_stops_after_max_attempts():
+    policy = RetryPolicy(max_attempts=2, sleep=lambda delay: None)
+
+    success, _, attempts = policy.run(scripted(failure(TRANSIENT), failure(TRANSIENT), (True, "ok", None)))
+
+    assert not success
+    assert attempts == 2
+
+
+@pytest.mark.parametrize("kind", [VALIDATION, AUTH, PERMANENT, UNCERTAIN])
+def test_does_not_retry_final_failures(kind):
+    policy = RetryPolicy(sleep=lambda delay: pytest.fail("must not wait"))
+
+    assert policy.run(scripted(failure(kind))) == (False, kind, 1)
+
+
+def test_honours_retry_after_up_to_max_delay():
+    delays = []
+    policy = RetryPolicy(max_delay=10, sleep=delays.append)
+
+    policy.run(scripted(failure(THROTTLED, retry_after=3), failure(THROTTLED, retry_after=60), (True, "ok", None)))
+
+    assert delays == [3, 10]
+
+
+def test_budget_is_shared_across_targets():
+    budget = RetryBudget(1)
+    policy = RetryPolicy(max_attempts=5, budget=budget, sleep=lambda delay: None)
+
+    assert policy.run(scripted(failure(TRANSIENT), (True, "ok", None)))[2] == 2
+    assert policy.run(scripted(failure(TRANSIENT), (True, "ok", None)))[2] == 1
+    assert budget.used == 1
+
+
+def test_budget_scales_with_targets():
+    assert RetryBudget.for_targets(4).max_retries == RetryBudget.MIN_RETRIES
+    assert RetryBudget.for_targets(100).max_retries == 50
+
+
+def test_rejects_zero_attempts():
+    with pytest.raises(ValueError):
+        RetryPolicy(max_attempts=0)
@@ -0,0 +1,73 @@
+import pytest
+
+from utils.publish_engine import PublishEngine
+from utils.rollout_scheduler import RolloutScheduler, interleave_by_host, plan_waves
+
+
+def configs(count, hosts=1):
+    return [{'name': f"T{index}", 'environmentType': 'OnPrem', 'server': f"bc{index % hosts}", 'serverInstance': 'BC'}
+            for index in range(count)]
+
+
+def names(targets):
+    return [config['name'] for config in targets]
+
+
+def test_waves_grow_from_the_canary():
+    waves = plan_waves(configs(10), canary_size=1, growth=2)
+
+    assert [len(wave) for wave in waves] == [1, 2, 4, 3]
+
+
+def test_waves_span_hosts():
+    ordered = interleave_by_host(configs(6, hosts=3))
+
+    assert names(ordered) == ["T0", "T1", "T2", "T3", "T4", "T5"]
+    assert len({config['server'] for config in plan_waves(configs(6, hosts=3), canary_size=3)[0]}) == 3
+
+
+def test_invalid_plan_is_rejected():
+    with pytest.raises(ValueError):
+        plan_waves(configs(3), canary_size=0)
+    with pytest.raises(ValueError):
+        RolloutScheduler(PublishEngine(), max_failure_rate=1.5)
+
+
+def test_all_waves_run_when_healthy():
+    events = []
+    scheduler = RolloutScheduler(PublishEngine(), canary_size=1, growth=2, on_event=events.append)
+
+    results = list(scheduler.run(configs(7), lambda config: (True, "ok")))
+
+    assert sorted(result['wave'] for result in results) == [1, 2, 2, 3, 3, 3, 3]
+    assert [event['size'] for event in events] == [1, 2, 4]
+    assert not scheduler.aborted
+
+
+def test_failing_wave_aborts_the_rest():
+    events = []
+    scheduler = RolloutScheduler(PublishEngine(), canary_size=1, growth=2, max_failure_rate=0.2,
+                                 on_event=events.append)
+    attempted = []
+
+    def task(config):
+        attempted.append(config['name'])
+        return config['name'] != "T2", "failed" if config['name'] == "T2" else "ok"
+
+    results = list(scheduler.run(configs(7), task))
+
+    assert scheduler.aborted
+    assert sorted(attempted) == ["T0", "T1", "T2"]
+    aborted = [result for result in results if result.get('aborted')]
+    assert names(result['config'] for result in aborted) == ["T3", "T4", "T5", "T6"]
+    assert all(not result['success'] and result['wave'] is None and result['attempts'] == 0 for result in aborted)
+    assert events[-1] == {'event': 'aborted', 'wave': 2, 'waves': 3, 'failure_rate': 0.5, 'remaining': 4}
+
+
+def test_failing_last_wave_is_not_an_abort():
+    scheduler = RolloutScheduler(PublishEngine(), canary_size=1, max_failure_rate=0)
+
+    results = list(scheduler.run(configs(1), lambda config: (False, "failed")))
+
+    assert not scheduler.aborted
+    assert len(results) == 1
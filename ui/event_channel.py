@@ -0,0 +1,65 @@
+import itertools
+import tkinter as tk
+from queue import Queue, Empty
+from typing import Callable
+
+_channel_ids = itertools.count(1)
+
+
+class TkEventChannel:
+    """
+    Channel between a worker thread and the Tk event loop.
+
+    Worker events go through their own queue, and each post wakes the Tk
+    loop with a virtual event, so the UI handles them right away without
+    polling. The channel only carries events towards the UI; replies go
+    back through a CredentialBroker, so a worker never reads its own events.
+    """
+
+    def __init__(self, widget, handler: Callable[[tuple], None]):
+        """
+        Args:
+            widget: Tk widget whose event loop handles the events (usually the root window)
+            handler: Called on the Tk thread with each event tuple posted by the worker
+        """
+        self.widget = widget
+        self.handler = handler
+        self.events = Queue()
+        self.virtual_event = f"<<BCWorkerEvent{next(_channel_ids)}>>"
+        self._draining = False
+        self._closed = False
+        self._binding = widget.bind(self.virtual_event, self._drain, add='+')
+
+    def post(self, *event) -> None:
+        """Send an event to the UI; safe to call from worker threads"""
+        self.events.put(event)
+        if self._closed:
+            return
+        try:
+            self.widget.event_generate(self.virtual_event, when='tail')
+        except (tk.TclError, RuntimeError):
+            # The window is gone or the main loop has stopped
+            self._closed = True
+
+    def close(self) -> None:
+        """Stop delivering events to the handler"""
+        if not self._closed:
+            self._closed = True
+            self.widget.unbind(self.virtual_event, self._binding)
+
+    def _drain(self, event=None) -> None:
+        """Handle every queued event; runs on the Tk thread"""
+        # A handler may open a modal dialog, which runs a nested event loop;
+        # events arriving meanwhile are handled once the outer drain resumes
+        if self._draining:
+            return
+        self._draining = True
+        try:
+            while True:
+                try:
+                    worker_event = self.events.get_nowait()
+                except Empty:
+                    break
+                self.handler(worker_event)
+        finally:
+            self._draining = False
@@ -0,0 +1,55 @@
+import tkinter as tk
+from collections import deque
+
+
+class ProgressSink:
+    """
+    Buffers progress messages and writes them to a text widget in batches.
+
+    Messages are collected and flushed at most once per frame interval with
+    a single insert, instead of inserting and redrawing per line. Only the
+    newest max_lines lines are kept, both in the pending buffer and in the
+    widget. Works with tk.Text and customtkinter's CTkTextbox.
+
+    write() must be called from the Tk thread.
+    """
+
+    FRAME_INTERVAL_MS = 50
+    MAX_LINES = 5000
+
+    def __init__(self, widget, interval_ms: int = FRAME_INTERVAL_MS, max_lines: int = MAX_LINES):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.max_lines = max_lines
+        self._pending = deque(maxlen=max_lines)
+        self._line_count = 0
+        self._flush_scheduled = False
+        self._closed = False
+
+    def write(self, message: str) -> None:
+        """Queue a message; it is shown with the next frame"""
+        if self._closed:
+            return
+        self._pending.extend(message.split("\n"))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.widget.after(self.interval_ms, self.flush)
+
+    def flush(self) -> None:
+        """Write all pending messages to the widget in one insert"""
+        self._flush_scheduled = False
+        if self._closed or not self._pending:
+            return
+        lines = list(self._pending)
+        self._pending.clear()
+        try:
+            self.widget.insert(tk.END, "\n".join(lines) + "\n")
+            self._line_count += len(lines)
+            excess = self._line_count - self.max_lines
+            if excess > 0:
+                self.widget.delete("1.0", f"{excess + 1}.0")
+                self._line_count = self.max_lines
+            self.widget.see(tk.END)
+        except tk.TclError:
+            # The progress window was closed
+            self._closed = True
@@ -0,0 +1,84 @@
+from typing import Callable, Dict, Iterable, List, Set
+
+
+class SelectionModel:
+    """
+    Set of selected configuration names that the server lists bind to.
+
+    Listeners are called with no arguments whenever the selection changes,
+    so views can refresh checkboxes and button states without scanning
+    every row.
+    """
+
+    def __init__(self):
+        self._selected: Set[str] = set()
+        self._listeners: List[Callable[[], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._selected)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._selected
+
+    def __iter__(self):
+        return iter(self._selected)
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Register a callback invoked after every selection change"""
+        self._listeners.append(listener)
+
+    def _notify(self) -> None:
+        for listener in self._listeners:
+            listener()
+
+    def is_selected(self, name: str) -> bool:
+        return name in self._selected
+
+    def set_selected(self, name: str, selected: bool) -> None:
+        """Select or deselect a single configuration"""
+        if selected == (name in self._selected):
+            return
+        if selected:
+            self._selected.add(name)
+        else:
+            self._selected.discard(name)
+        self._notify()
+
+    def toggle(self, name: str) -> bool:
+        """Toggle a configuration and return its new state"""
+        selected = name not in self._selected
+        self.set_selected(name, selected)
+        return selected
+
+    def select_all(self, names: Iterable[str]) -> None:
+        """Select every given configuration name"""
+        before = len(self._selected)
+        self._selected.update(names)
+        if len(self._selected) != before:
+            self._notify()
+
+    def select_where(self, configs: Iterable[Dict], predicate: Callable[[Dict], bool]) -> None:
+        """Select the configurations for which predicate(config) is true"""
+        self.select_all(config['name'] for config in configs if predicate(config))
+
+    def clear(self) -> None:
+        """Deselect everything"""
+        if self._selected:
+            self._selected.clear()
+            self._notify()
+
+    def retain(self, names: Iterable[str]) -> None:
+        """Drop selected names that are not in names, e.g. after configurations were removed"""
+        remaining = self._selected.intersection(names)
+        if len(remaining) != len(self._selected):
+            self._selected = remaining
+            self._notify()
+
+    def selected_configs(self, config_manager) -> List[Dict]:
+        """Resolve the selection to configurations, in inventory order"""
+        indexed = []
+        for name in self._selected:
+            index = config_manager.get_index(name)
+            if index is not None:
+                indexed.append((index, config_manager.find_config_by_name(name)))
+        return [config for _, config in sorted(indexed, key=lambda item: item[0])]
@@ -0,0 +1,87 @@
+from typing import Dict, List, Tuple
+
+from utils.circuit_breaker import HALF_OPEN, OPEN, get_circuit_breakers
+from utils.translations import get_text
+
+
+def get_environment_detail(config: Dict) -> str:
+    """Get the environment name (Sandbox) or server instance (OnPrem) shown for a configuration"""
+    if config['environmentType'].lower() == 'sandbox':
+        return config.get('environmentName', '')
+    return config.get('serverInstance', '')
+
+
+def get_host_health(config: Dict) -> str:
+    """Describe the circuit breaker of the configuration's host; empty while it is closed"""
+    state = get_circuit_breakers().state(config)
+    if state == OPEN:
+        return get_text('host_unavailable')
+    if state == HALF_OPEN:
+        return get_text('host_recovering')
+    return ""
+
+
+def build_row(config: Dict) -> Tuple[str, str, str, str]:
+    """Build the displayed (type, name, environment, host health) values for a configuration"""
+    return (config['environmentType'], config['name'], get_environment_detail(config), get_host_health(config))
+
+
+class ServerListDiff:
+    """Changes needed to bring a rendered server list up to date"""
+
+    def __init__(self):
+        self.removed: List[str] = []
+        self.added: List[Tuple[int, str, Tuple]] = []
+        self.updated: List[Tuple[str, Tuple]] = []
+        self.order: List[str] = []
+        self.reordered = False
+
+    def __bool__(self):
+        return bool(self.removed or self.added or self.updated or self.reordered)
+
+
+class ServerListModel:
+    """
+    Remembers the rows currently rendered in a server list, keyed by
+    configuration name, and computes the minimal set of inserts, updates,
+    removals and moves for a new list of configurations.
+    """
+
+    def __init__(self):
+        self.rows: Dict[str, Tuple] = {}
+        self.order: List[str] = []
+
+    def update(self, configs) -> ServerListDiff:
+        """
+        Compare configs with the rendered rows and record them as rendered.
+
+        Args:
+            configs: Current configurations in display order
+
+        Returns:
+            ServerListDiff: Rows to remove, add (with their index) and update,
+            and whether existing rows changed their relative order
+        """
+        diff = ServerListDiff()
+        new_rows = {}
+        for config in configs:
+            name = config['name']
+            new_rows[name] = build_row(config)
+            diff.order.append(name)
+
+        diff.removed = [name for name in self.order if name not in new_rows]
+        for index, name in enumerate(diff.order):
+            row = new_rows[name]
+            old_row = self.rows.get(name)
+            if old_row is None:
+                diff.added.append((index, name, row))
+            elif old_row != row:
+                diff.updated.append((name, row))
+
+        # Existing rows keep their relative order unless the list was rearranged
+        kept = [name for name in self.order if name in new_rows]
+        diff.reordered = kept != [name for name in diff.order if name in self.rows]
+
+        self.rows = new_rows
+        self.order = diff.order
+        return diff
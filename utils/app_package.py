@@ -0,0 +1,216 @@
+import logging
+import os
+import struct
+import threading
+import uuid
+import xml.etree.ElementTree as ET
+import zipfile
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "NavxManifest.xml"
+NAVX_MAGIC = b"NAVX"
+# magic, header size, format version, package id, content length, magic
+NAVX_HEADER = struct.Struct("<4sII16sQ4s")
+
+
+def _local_name(tag: str) -> str:
+    """Strip the XML namespace from a tag"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_version(version: str) -> Tuple[int, ...]:
+    """Parse a version such as '1.2.3.4' into a comparable tuple, padded to four parts"""
+    parts = tuple(int(part) for part in version.strip().split('.'))
+    return parts + (0,) * (4 - len(parts))
+
+
+def read_navx_header(f: BinaryIO) -> Dict:
+    """
+    Read the NAVX header at the start of a .app file.
+
+    Returns:
+        dict: 'header_size' (offset of the embedded zip), 'format_version',
+        'package_id' and 'content_length'; a plain zip without header
+        yields header_size 0 and no package id
+
+    Raises:
+        ValueError: If the header is truncated or malformed
+    """
+    f.seek(0)
+    data = f.read(NAVX_HEADER.size)
+    if not data.startswith(NAVX_MAGIC):
+        if data.startswith(b"PK"):
+            return {'header_size': 0, 'format_version': None, 'package_id': None, 'content_length': None}
+        raise ValueError("Not a valid app package: missing NAVX header")
+    if len(data) < NAVX_HEADER.size:
+        raise ValueError("Not a valid app package: truncated NAVX header")
+
+    magic, header_size, format_version, package_id, content_length, end_magic = NAVX_HEADER.unpack(data)
+    if end_magic != NAVX_MAGIC or header_size < NAVX_HEADER.size:
+        raise ValueError("Not a valid app package: malformed NAVX header")
+    return {
+        'header_size': header_size,
+        'format_version': format_version,
+        'package_id': str(uuid.UUID(bytes_le=package_id)),
+        'content_length': content_length
+    }
+
+
+class _ZipWindow:
+    """Read-only view of the embedded zip, so offsets in the archive start at zero"""
+
+    def __init__(self, f: BinaryIO, offset: int):
+        self._f = f
+        self._offset = offset
+        self._f.seek(offset)
+
+    def seekable(self):
+        return True
+
+    def seek(self, position, whence=os.SEEK_SET):
+        if whence == os.SEEK_SET:
+            position += self._offset
+        result = self._f.seek(position, whence)
+        return result - self._offset
+
+    def tell(self):
+        return self._f.tell() - self._offset
+
+    def read(self, size=-1):
+        return self._f.read(size)
+
+
+def _parse_manifest(manifest_xml: bytes) -> Dict:
+    """Parse NavxManifest.xml into the app's identity, requirements and dependencies"""
+    try:
+        root = ET.fromstring(manifest_xml)
+    except ET.ParseError as e:
+        raise ValueError(f"Invalid {MANIFEST_NAME}: {str(e)}")
+
+    app = next((element for element in root if _local_name(element.tag) == 'App'), None)
+    if app is None or not app.get('Id') or not app.get('Version'):
+        raise ValueError(f"{MANIFEST_NAME} has no App element with Id and Version")
+
+    dependencies = []
+    for element in root:
+        if _local_name(element.tag) != 'Dependencies':
+            continue
+        for dependency in element:
+            dependencies.append({
+                'id': (dependency.get('Id') or dependency.get('AppId') or '').lower(),
+                'name': dependency.get('Name', ''),
+                'publisher': dependency.get('Publisher', ''),
+                'min_version': dependency.get('MinVersion') or dependency.get('Version', '')
+            })
+
+    return {
+        'id': app.get('Id').lower(),
+        'name': app.get('Name', ''),
+        'publisher': app.get('Publisher', ''),
+        'version': app.get('Version'),
+        'platform': app.get('Platform'),
+        'application': app.get('Application'),
+        'runtime': app.get('Runtime'),
+        'target': app.get('Target'),
+        'dependencies': dependencies
+    }
+
+
+def _read_manifest_uncached(f: BinaryIO, header: Dict) -> Dict:
+    """Extract and parse the manifest; only the zip directory and the manifest entry are read"""
+    try:
+        with zipfile.ZipFile(_ZipWindow(f, header['header_size'])) as archive:
+            manifest_xml = archive.read(MANIFEST_NAME)
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise ValueError(f"Not a valid app package: {str(e)}")
+    return _parse_manifest(manifest_xml)
+
+
+class ManifestCache:
+    """
+    Remembers parsed manifests by (path, size, mtime, package id).
+
+    The package id from the NAVX header identifies the build, so a rebuilt
+    file with the same size and timestamp is still parsed again. A lookup
+    costs a stat and a 40-byte read.
+    """
+
+    DEFAULT_MAX_ENTRIES = 32
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, app_path: str) -> Dict:
+        """Get the manifest of an app file, parsing it only if it changed"""
+        path = os.path.realpath(app_path)
+        with open(path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            header = read_navx_header(f)
+            key = (path, stat.st_size, stat.st_mtime_ns, header['package_id'])
+
+            with self._lock:
+                manifest = self._entries.get(key)
+                if manifest is not None:
+                    self._entries.move_to_end(key)
+                    return dict(manifest)
+
+            manifest = _read_manifest_uncached(f, header)
+            manifest['package_id'] = header['package_id']
+            logger.debug(f"Read manifest of {app_path}: {manifest['name']} {manifest['version']}")
+
+        with self._lock:
+            self._entries[key] = manifest
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return dict(manifest)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_default_cache = ManifestCache()
+
+
+def read_app_manifest(app_path: str) -> Dict:
+    """
+    Read the manifest of an extension from its .app file.
+
+    A .app file is a NAVX header followed by a zip archive whose
+    NavxManifest.xml describes the app. Results are cached until the file
+    changes.
+
+    Returns:
+        dict: 'id', 'name', 'publisher', 'version', 'platform',
+        'application', 'runtime', 'target', 'package_id' and 'dependencies'
+        (each with 'id', 'name', 'publisher' and 'min_version')
+
+    Raises:
+        ValueError: If the file is not a valid .app package
+        OSError: If the file cannot be read
+    """
+    return _default_cache.get(app_path)
+
+
+def describe_app(manifest: Dict) -> str:
+    """Short description of an app, e.g. 'My App 1.0.0.0 by Contoso'"""
+    description = f"{manifest['name']} {manifest['version']}"
+    if manifest.get('publisher'):
+        description += f" by {manifest['publisher']}"
+    return description
+
+
+def describe_app_file(app_path: str) -> str:
+    """Describe a selected .app file by name and, if readable, its manifest"""
+    file_name = os.path.basename(app_path)
+    try:
+        return f"{file_name} ({describe_app(read_app_manifest(app_path))})"
+    except (OSError, ValueError) as e:
+        logger.warning(f"Cannot read manifest of {app_path}: {str(e)}")
+        return file_name
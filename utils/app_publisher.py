@@ -1,11 +1,31 @@
 import os
-import requests
+import logging
 from urllib.parse import urljoin, urlparse
 from base64 import b64encode
-from utils.powershell_manager import publish_to_environment, test_server_connection
+from utils.multipart import MultipartFileStream
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRequestError(Exception):
+    """No access token could be acquired, so the request was not sent; the cause is chained"""
+
 
 class AppPublisher:
     DEFAULT_PORT = "7049"
+    ADMIN_API_PATH = "admin/v2.21/applications/BusinessCentral/environments/"
+    # (connect, read) timeouts; publishing waits for the schema sync to finish
+    PUBLISH_TIMEOUT = (10, 600)
+    # Time budget in seconds for a whole connection test, per server
+    PROBE_TIMEOUT = 15
+    # Connection tests retry once; a second timeout already means a 30 second wait
+    PROBE_ATTEMPTS = 2
+    TOKEN_TIMEOUT = (10, 30)
+    QUERY_TIMEOUT = (10, 60)
+    # Cloud endpoints; override through the environment to target a mock service
+    CLOUD_API_URL = os.environ.get('BC_CLOUD_API_URL', 'https://api.businesscentral.dynamics.com')
+    CLOUD_LOGIN_URL = os.environ.get('BC_CLOUD_LOGIN_URL', 'https://login.microsoftonline.com')
+    CLOUD_SCOPE = os.environ.get('BC_CLOUD_SCOPE', 'https://api.businesscentral.dynamics.com/.default')
 
     @staticmethod
     def _create_auth_header(username, password):
@@ -15,13 +35,18 @@ class AppPublisher:
         return f"Basic {encoded}"
 
     @staticmethod
-    def _create_publish_url(server, instance, tenant):
-        """Create the publishing URL for Business Central"""
+    def _create_base_url(server, instance):
+        """Create the base URL of a Business Central server instance"""
         parsed_url = urlparse(server)
         if parsed_url.scheme:
-            base_url = f"{parsed_url.scheme}://{parsed_url.hostname}:{AppPublisher.DEFAULT_PORT}/{instance}/"
-        else:
-            base_url = f"http://{server}:{AppPublisher.DEFAULT_PORT}/{instance}/"
+            port = parsed_url.port or AppPublisher.DEFAULT_PORT
+            return f"{parsed_url.scheme}://{parsed_url.hostname}:{port}/{instance}/"
+        return f"http://{server}:{AppPublisher.DEFAULT_PORT}/{instance}/"
+
+    @staticmethod
+    def _create_publish_url(server, instance, tenant):
+        """Create the publishing URL for Business Central"""
+        base_url = AppPublisher._create_base_url(server, instance)
 
         path = f"dev/apps"
         params = {
@@ -35,13 +60,482 @@ class AppPublisher:
         return f"{url}?{param_str}"
 
     @staticmethod
-    def publish_to_onprem(app_path, config, username=None, password=None):
+    def _describe_error(response):
+        """Extract a readable error message from a failed response"""
+        try:
+            body = response.json()
+            error = body.get('error')
+            message = (body.get('Message') or body.get('message') or body.get('error_description')
+                       or (error.get('message') if isinstance(error, dict) else error))
+            if message:
+                return f"HTTP {response.status_code}: {message}"
+        except ValueError:
+            pass
+        text = response.text.strip()
+        return f"HTTP {response.status_code}: {text[:200] or response.reason}"
+
+    @staticmethod
+    def _create_sandbox_publish_url(config):
+        """Create the dev endpoint URL of a cloud environment"""
+        base_url = AppPublisher.CLOUD_API_URL.rstrip('/')
+        schema_update_mode = config.get('schemaUpdateMode', 'Synchronize').lower()
+        return f"{base_url}/v2.0/{config['tenant']}/{config['environmentName']}/dev/apps?SchemaUpdateMode={schema_update_mode}"
+
+    @staticmethod
+    def _acquire_sandbox_token(tenant, client_id, client_secret):
+        """
+        Request an access token with the client credentials flow
+
+        Returns:
+            tuple: (access_token, expires_in_seconds)
+        """
+        import requests
+        from utils.session_pool import get_session_pool
+
+        url = f"{AppPublisher.CLOUD_LOGIN_URL.rstrip('/')}/{tenant}/oauth2/v2.0/token"
+        logger.debug(f"Requesting access token for tenant {tenant}")
+        response = get_session_pool().get_session(url).post(
+            url,
+            data={
+                'grant_type': 'client_credentials',
+                'client_id': client_id,
+                'client_secret': client_secret,
+                'scope': AppPublisher.CLOUD_SCOPE
+            },
+            timeout=AppPublisher.TOKEN_TIMEOUT
+        )
+        if not response.ok:
+            raise requests.HTTPError(f"Token request failed: {AppPublisher._describe_error(response)}", response=response)
+        body = response.json()
+        return body['access_token'], body.get('expires_in', 3600)
+
+    @staticmethod
+    def _send_with_token(method, url, config, client_id, client_secret, headers=None, **kwargs):
+        """
+        Send a request to a cloud environment with a cached bearer token.
+        A rejected token is dropped and the request is retried once with a fresh one,
+        so a streamed body must be iterable more than once.
+
+        Raises:
+            TokenRequestError: If no token could be acquired
+            requests.RequestException: If the request itself fails
+        """
+        import requests
+        from utils.session_pool import get_session_pool
+        from utils.token_cache import get_token_cache
+
+        token_key = f"{config['tenant']}/{client_id}".lower()
+        token_cache = get_token_cache()
+
+        def acquire():
+            return AppPublisher._acquire_sandbox_token(config['tenant'], client_id, client_secret)
+
+        session = get_session_pool().get_session(url)
+        for attempt in range(2):
+            try:
+                token = token_cache.get_token(token_key, acquire)
+            except (requests.RequestException, KeyError, ValueError) as e:
+                raise TokenRequestError(str(e)) from e
+            response = session.request(method, url, headers={**(headers or {}), 'Authorization': f"Bearer {token}"}, **kwargs)
+            if response.status_code != 401 or attempt:
+                return response
+            # The token was revoked or expired early; get a fresh one and retry once
+            token_cache.invalidate(token_key, token)
+
+    @staticmethod
+    def _check_publishable(config, username):
+        """
+        Return why config cannot be published to, or None.
+
+        These failures are permanent; nothing is sent and nothing is retried.
+        """
+        env_type = config['environmentType'].lower()
+        if env_type == 'sandbox' and not username:
+            message = f"Publication to {config['name']} failed: no credentials (client id and secret) for the sandbox"
+        elif env_type not in ('onprem', 'sandbox'):
+            message = f"Publication to {config['name']} failed: unsupported environment type {config['environmentType']!r}"
+        else:
+            return None
+        logger.error(message)
+        return message
+
+    @staticmethod
+    def publish(app_path, config, username=None, password=None, retry_policy=None):
+        """
+        Publish an app to the environment described by config.
+
+        Transient failures are retried according to retry_policy (a default
+        RetryPolicy if None).
+
+        Returns:
+            tuple: (success, message, attempts)
+        """
+        rejected = AppPublisher._check_publishable(config, username)
+        if rejected:
+            return False, rejected, 0
+        if config['environmentType'].lower() == 'onprem':
+            return AppPublisher.publish_to_onprem(app_path, config, username, password, retry_policy)
+        return AppPublisher.publish_to_sandbox(app_path, config, username, password, retry_policy)
+
+    @staticmethod
+    def _run_with_retry(attempt, config, retry_policy):
+        """Run a single-attempt publish under the host's circuit breaker and the retry policy"""
+        from utils.circuit_breaker import get_circuit_breakers
+        from utils.retry_policy import RetryPolicy, describe_attempts
+
+        attempt = get_circuit_breakers().guard(config, attempt)
+        success, message, attempts = (retry_policy or RetryPolicy()).run(attempt, config['name'])
+        return success, describe_attempts(message, attempts), attempts
+
+    @staticmethod
+    def publish_to_sandbox(app_path, config, client_id, client_secret, retry_policy=None):
+        """
+        Publish an app to a cloud sandbox through its dev endpoint, authenticating
+        with an app registration (client id and secret). Tokens are cached per
+        tenant and client id, so publishing to many environments of one tenant
+        acquires a single token.
+
+        Returns:
+            tuple: (success, message, attempts)
+        """
+        if not os.path.exists(app_path):
+            logger.error(f"App file not found: {app_path}")
+            return False, f"App file not found: {app_path}", 1
+
+        return AppPublisher._run_with_retry(
+            lambda: AppPublisher._publish_to_sandbox_once(app_path, config, client_id, client_secret),
+            config, retry_policy)
+
+    @staticmethod
+    def _publish_to_sandbox_once(app_path, config, client_id, client_secret):
+        """Make one publish attempt; returns (success, message, failure)"""
+        import requests
+        from utils.retry_policy import classify_exception, classify_publish_exception, classify_publish_response
+
+        app_name = os.path.basename(app_path)
+        url = AppPublisher._create_sandbox_publish_url(config)
+
+        try:
+            body = MultipartFileStream(app_path)
+            logger.debug(f"Uploading {app_name} ({len(body)} bytes) to {url}")
+            response = AppPublisher._send_with_token(
+                'POST', url, config, client_id, client_secret,
+                headers={'Content-Type': body.content_type},
+                data=body,
+                timeout=AppPublisher.PUBLISH_TIMEOUT
+            )
+
+            if response.ok:
+                message = f"Successfully published {app_name} to {config['name']} (Sandbox: {config['environmentName']})"
+                logger.info(message)
+                return True, message, None
+
+            error_msg = AppPublisher._describe_error(response)
+            logger.error(f"Publication to {config['name']} failed: {error_msg}")
+            return False, f"Publication to {config['name']} failed: {error_msg}", classify_publish_response(response)
+
+        except TokenRequestError as e:
+            # Token requests are safe to repeat, unlike the upload
+            logger.error(f"Token request for {config['name']} failed: {str(e)}")
+            return False, f"Publication to {config['name']} failed: {str(e)}", classify_exception(e.__cause__)
+        except (requests.RequestException, OSError, KeyError, ValueError) as e:
+            logger.error(f"Publication failed: {str(e)}")
+            return False, f"Publication to {config['name']} failed: {str(e)}", classify_publish_exception(e)
+
+    @staticmethod
+    def publish_to_onprem(app_path, config, username=None, password=None, retry_policy=None):
         """
         Publish an app to an on-premises Business Central server
+
+        Returns:
+            tuple: (success, message, attempts)
+        """
+        if not os.path.exists(app_path):
+            logger.error(f"App file not found: {app_path}")
+            return False, f"App file not found: {app_path}", 1
+
+        return AppPublisher._run_with_retry(
+            lambda: AppPublisher._publish_to_onprem_once(app_path, config, username, password),
+            config, retry_policy)
+
+    @staticmethod
+    def _publish_to_onprem_once(app_path, config, username, password):
+        """Make one publish attempt; returns (success, message, failure)"""
+        # requests is imported on first use to keep application startup fast
+        import requests
+        from utils.retry_policy import classify_publish_exception, classify_publish_response
+        from utils.session_pool import get_session_pool
+
+        app_name = os.path.basename(app_path)
+        url = AppPublisher._create_publish_url(config['server'], config['serverInstance'], config.get('tenant', 'default'))
+
+        try:
+            # Stream the file in chunks so concurrent uploads don't each hold a full copy in memory
+            body = MultipartFileStream(app_path)
+            headers = {'Content-Type': body.content_type}
+            if username:
+                headers['Authorization'] = AppPublisher._create_auth_header(username, password)
+
+            session = get_session_pool().get_session(url)
+            logger.debug(f"Uploading {app_name} ({len(body)} bytes) to {url}")
+            response = session.post(
+                url,
+                headers=headers,
+                data=body,
+                timeout=AppPublisher.PUBLISH_TIMEOUT
+            )
+
+            if response.ok:
+                message = f"Successfully published {app_name} to {config['name']} (OnPrem: {config['serverInstance']}"
+                message += f" as {username})" if username else ")"
+                logger.info(message)
+                return True, message, None
+
+            error_msg = AppPublisher._describe_error(response)
+            logger.error(f"Publication to {config['name']} failed: {error_msg}")
+            return False, f"Publication to {config['name']} failed: {error_msg}", classify_publish_response(response)
+
+        except (requests.RequestException, OSError) as e:
+            logger.error(f"Publication failed: {str(e)}")
+            return False, f"Publication to {config['name']} failed: {str(e)}", classify_publish_exception(e)
+
+    @staticmethod
+    def can_check_installed_version(config):
         """
-        return publish_to_environment(app_path, config, username, password)
+        Whether a target reports the full installed version of its extensions.
+
+        Only cloud environments do, through the admin center API. The OnPrem
+        automation API lists extensions with just their major and minor
+        version, which cannot tell builds apart, so OnPrem targets are
+        published even when they already run the version.
+        """
+        return config['environmentType'].lower() == 'sandbox'
+
+    @staticmethod
+    def get_installed_apps(config, username=None, password=None):
+        """
+        Query the extensions installed on a cloud environment.
+
+        OnPrem targets are not queried and report nothing; see
+        can_check_installed_version().
+
+        Returns:
+            dict: Installed version ('1.2.3.4') by app id
+
+        Raises:
+            TokenRequestError: If no token could be acquired
+            requests.RequestException: If the query fails
+        """
+        import requests
+
+        if not AppPublisher.can_check_installed_version(config):
+            return {}
+
+        url = f"{AppPublisher.CLOUD_API_URL.rstrip('/')}/{AppPublisher.ADMIN_API_PATH}{config['environmentName']}/apps"
+        response = AppPublisher._send_with_token('GET', url, config, username, password,
+                                                 timeout=AppPublisher.QUERY_TIMEOUT)
+        if not response.ok:
+            raise requests.HTTPError(f"Installed extensions query failed: {AppPublisher._describe_error(response)}",
+                                     response=response)
+
+        installed = {}
+        for app in response.json().get('value', []):
+            if app.get('state', 'Installed') == 'Installed' and app.get('version'):
+                installed[app['id']] = app['version']
+        return installed
+
+    @staticmethod
+    def publish_if_outdated(app_path, config, username=None, password=None, manifest=None, installed_apps=None, force=False,
+                            digest=None, retry_policy=None):
+        """
+        Publish an app unless the target already runs the same version.
+
+        Args:
+            manifest: Identity of the app (see utils.app_package.read_app_manifest); no check without it
+            installed_apps: InstalledAppsCache shared by the rollout, so each target is queried once
+            force: Publish even if the same version is installed
+            digest: SHA-256 of the app file, recorded with the result for auditing
+            retry_policy: RetryPolicy for the upload, usually sharing the rollout's RetryBudget
+
+        Returns:
+            tuple: (success, message, details) where details['skipped'] tells
+            whether the target was already up to date, details['sha256']
+            holds the digest and details['attempts'] the number of uploads
+        """
+        if manifest and installed_apps is not None and not force:
+            skipped = AppPublisher._skip_if_installed(config, username, password, manifest, installed_apps, digest)
+            if skipped:
+                return skipped
+
+        success, message, attempts = AppPublisher.publish(app_path, config, username, password, retry_policy)
+        return AppPublisher._publish_result(app_path, config, manifest, installed_apps, digest, success, message, attempts)
+
+    @staticmethod
+    def _skip_if_installed(config, username, password, manifest, installed_apps, digest):
+        """Return the skipped result if the target already runs the manifest's version, else None"""
+        import requests
+        from utils.app_package import parse_version
+
+        try:
+            installed = installed_apps.get(
+                config, lambda: AppPublisher.get_installed_apps(config, username, password))
+            version = installed.get(manifest['id'])
+            if version and parse_version(version) == parse_version(manifest['version']):
+                message = f"{manifest['name']} {manifest['version']} is already installed on {config['name']}, skipped"
+                logger.info(f"{message} (sha256 {digest})")
+                return True, message, {'skipped': True, 'sha256': digest, 'attempts': 0}
+        except (requests.RequestException, TokenRequestError, ValueError, KeyError) as e:
+            # The check is an optimisation; publish when it cannot be made
+            logger.warning(f"Could not check installed extensions on {config['name']}: {str(e)}")
+        return None
+
+    @staticmethod
+    def _publish_result(app_path, config, manifest, installed_apps, digest, success, message, attempts):
+        """Record a finished publish and build its (success, message, details) result"""
+        if success and manifest and installed_apps is not None:
+            installed_apps.record(config, manifest['id'], manifest['version'])
+        logger.info(f"{'Published' if success else 'Failed to publish'} {os.path.basename(app_path)} "
+                    f"to {config['name']} (sha256 {digest})")
+        return success, message, {'skipped': False, 'sha256': digest, 'attempts': attempts}
+
+    # Coroutine counterparts used by AsyncPublishEngine. Retries, backoff and
+    # the circuit breaker run on the event loop; each HTTP request goes
+    # through the same pooled requests sessions as the thread engine, on the
+    # loop's default executor.
+
+    @staticmethod
+    async def publish_if_outdated_async(app_path, config, username=None, password=None, manifest=None,
+                                        installed_apps=None, force=False, digest=None, retry_policy=None):
+        """Coroutine version of publish_if_outdated()"""
+        import asyncio
+
+        if manifest and installed_apps is not None and not force:
+            skipped = await asyncio.to_thread(AppPublisher._skip_if_installed, config, username, password,
+                                              manifest, installed_apps, digest)
+            if skipped:
+                return skipped
+
+        success, message, attempts = await AppPublisher.publish_async(app_path, config, username, password, retry_policy)
+        # Recording takes the installed-extensions lock, held by queries running on other threads
+        return await asyncio.to_thread(AppPublisher._publish_result, app_path, config, manifest, installed_apps,
+                                       digest, success, message, attempts)
+
+    @staticmethod
+    async def publish_async(app_path, config, username=None, password=None, retry_policy=None):
+        """
+        Coroutine version of publish().
+
+        Returns:
+            tuple: (success, message, attempts)
+        """
+        import asyncio
+        from utils.circuit_breaker import get_circuit_breakers
+        from utils.retry_policy import RetryPolicy, describe_attempts
+
+        rejected = AppPublisher._check_publishable(config, username)
+        if rejected:
+            return False, rejected, 0
+        if not os.path.exists(app_path):
+            logger.error(f"App file not found: {app_path}")
+            return False, f"App file not found: {app_path}", 1
+
+        if config['environmentType'].lower() == 'onprem':
+            once = AppPublisher._publish_to_onprem_once
+        else:
+            once = AppPublisher._publish_to_sandbox_once
+        attempt = get_circuit_breakers().guard_async(
+            config, lambda: asyncio.to_thread(once, app_path, config, username, password))
+        success, message, attempts = await (retry_policy or RetryPolicy()).run_async(attempt, config['name'])
+        return success, describe_attempts(message, attempts), attempts
+
+    @staticmethod
+    def _create_test_url(config):
+        """Create the URL requested by connection tests"""
+        if config['environmentType'].lower() == 'sandbox':
+            return f"{AppPublisher.CLOUD_API_URL.rstrip('/')}/v2.0/{config['tenant']}/{config['environmentName']}/"
+        return AppPublisher._create_base_url(config['server'], config['serverInstance'])
+
+    @staticmethod
+    def create_probe_retry_policy(budget=None):
+        """Retry policy for connection tests: few attempts, short delays"""
+        from utils.retry_policy import RetryPolicy
+        return RetryPolicy(max_attempts=AppPublisher.PROBE_ATTEMPTS, base_delay=0.5, max_delay=2.0, budget=budget)
+
+    @staticmethod
+    def probe_connection(config, timeout=None, retry_policy=None):
+        """
+        Test connection to a Business Central server and measure its latency.
+
+        Connection errors and server errors are retried according to
+        retry_policy (by default one quick retry). Hosts whose circuit
+        breaker is open are reported as failed without being contacted.
+
+        Returns:
+            tuple: (success, message, details) where details holds the last
+            probe's 'timings' (DNS, connect, TLS and first-byte milliseconds)
+            and the number of 'attempts'
+        """
+        from utils.circuit_breaker import get_circuit_breakers
+        from utils.connection_probe import probe_url
+        from utils.retry_policy import describe_attempts
+
+        if config['environmentType'].lower() not in ('onprem', 'sandbox'):
+            return (False, f"Connection test failed for {config['name']}: "
+                           f"unsupported environment type {config['environmentType']!r}", {'timings': {}, 'attempts': 0})
+
+        url = AppPublisher._create_test_url(config)
+        last = {'timings': {}}
+
+        def attempt():
+            last['timings'] = probe_url(url, timeout=timeout or AppPublisher.PROBE_TIMEOUT)
+            return AppPublisher._probe_outcome(config, last['timings'])
+
+        policy = retry_policy or AppPublisher.create_probe_retry_policy()
+        success, message, attempts = policy.run(get_circuit_breakers().guard(config, attempt), config['name'])
+        return success, describe_attempts(message, attempts), {'timings': last['timings'], 'attempts': attempts}
+
+    @staticmethod
+    def _probe_outcome(config, timings):
+        """Judge a probe result; returns (success, message, failure)"""
+        from utils.retry_policy import classify_status
+
+        if timings['error']:
+            logger.error(f"Connection test failed: {timings['error']}")
+            return (False, f"Connection test failed for {config['name']}: {timings['error']}",
+                    {'kind': timings['error_kind'], 'retry_after': None})
+        # Any non-server-error answer (including 401) proves the instance is reachable
+        if timings['status'] < 500:
+            env_type = config['environmentType'].lower()
+            target = f"Sandbox: {config['environmentName']}" if env_type == 'sandbox' else f"OnPrem: {config['serverInstance']}"
+            return True, f"Test connection successful to {config['name']} ({target})", None
+        return (False, f"Connection test failed for {config['name']}: HTTP {timings['status']}",
+                {'kind': classify_status(timings['status']), 'retry_after': None})
+
+    @staticmethod
+    async def probe_connection_async(config, timeout=None, retry_policy=None):
+        """Coroutine version of probe_connection()"""
+        from utils.circuit_breaker import get_circuit_breakers
+        from utils.connection_probe import probe_url_async
+        from utils.retry_policy import describe_attempts
+
+        if config['environmentType'].lower() not in ('onprem', 'sandbox'):
+            return (False, f"Connection test failed for {config['name']}: "
+                           f"unsupported environment type {config['environmentType']!r}", {'timings': {}, 'attempts': 0})
+
+        url = AppPublisher._create_test_url(config)
+        last = {'timings': {}}
+
+        async def attempt():
+            last['timings'] = await probe_url_async(url, timeout=timeout or AppPublisher.PROBE_TIMEOUT)
+            return AppPublisher._probe_outcome(config, last['timings'])
+
+        policy = retry_policy or AppPublisher.create_probe_retry_policy()
+        success, message, attempts = await policy.run_async(get_circuit_breakers().guard_async(config, attempt),
+                                                             config['name'])
+        return success, describe_attempts(message, attempts), {'timings': last['timings'], 'attempts': attempts}
 
     @staticmethod
     def test_server_connection(config):
         """Test connection to a Business Central server."""
-        return test_server_connection(config)
\ No newline at end of file
+        success, message, _ = AppPublisher.probe_connection(config)
+        return success, message
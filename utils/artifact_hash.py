@@ -0,0 +1,100 @@
+import hashlib
+import logging
+import mmap
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _file_key(path: str) -> Tuple[int, int, int, int]:
+    """Identify a file's current content by (device, inode, size, mtime)"""
+    stat = os.stat(path)
+    return (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def sha256_file(path: str, chunk_size: int = 8 * 1024 * 1024) -> str:
+    """
+    Compute the SHA-256 of a file by streaming it through a memory map.
+
+    hashlib releases the GIL for large updates, so hashing on a background
+    thread does not stall the UI.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return digest.hexdigest()
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, size, chunk_size):
+                    digest.update(view[offset:offset + chunk_size])
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+class ArtifactHasher:
+    """
+    Computes artifact digests once and shares them.
+
+    start() begins hashing on a background thread, typically when a file is
+    dropped; digest() returns the result, waiting for it if needed. Results
+    are memoised by (device, inode, size, mtime), so publishing one artifact
+    to many targets hashes it once, and a changed file is hashed again.
+    """
+
+    MAX_ENTRIES = 32
+
+    def __init__(self):
+        self._results: Dict[Tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self, path: str) -> Future:
+        """Start hashing path in the background unless its digest is known or pending"""
+        key = _file_key(path)
+        with self._lock:
+            future = self._results.get(key)
+            if future is None or (future.done() and future.exception() is not None):
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="hash")
+                future = self._executor.submit(self._hash, path)
+                self._results.pop(key, None)
+                self._results[key] = future
+                # Forget the oldest artifacts; their files have usually changed since
+                while len(self._results) > self.MAX_ENTRIES:
+                    del self._results[next(iter(self._results))]
+            return future
+
+    @staticmethod
+    def _hash(path: str) -> str:
+        digest = sha256_file(path)
+        logger.debug(f"SHA-256 of {path}: {digest}")
+        return digest
+
+    def digest(self, path: str, timeout: Optional[float] = None) -> str:
+        """
+        Get the SHA-256 of path.
+
+        Raises:
+            OSError: If the file cannot be read
+            concurrent.futures.TimeoutError: If hashing does not finish within timeout
+        """
+        return self.start(path).result(timeout=timeout)
+
+
+_default_hasher = None
+_default_hasher_lock = threading.Lock()
+
+
+def get_artifact_hasher() -> ArtifactHasher:
+    """Get the process-wide artifact hasher"""
+    global _default_hasher
+    with _default_hasher_lock:
+        if _default_hasher is None:
+            _default_hasher = ArtifactHasher()
+        return _default_hasher
@@ -0,0 +1,163 @@
+import logging
+import queue
+import threading
+import time
+import traceback
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Tuple
+
+from utils.publish_engine import get_host_key
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class AsyncPublishEngine:
+    """
+    Runs one coroutine per configuration on a single event loop.
+
+    A semaphore caps the total number of in-flight tasks (max_concurrency)
+    and each host is drained by at most per_host_limit coroutines, the same
+    limits PublishEngine enforces with threads. Targets waiting for a slot,
+    a host or a retry backoff cost a coroutine instead of a thread; only
+    requests in progress hold a thread of the loop's default executor, which
+    run() sizes to max_concurrency.
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 256
+    DEFAULT_PER_HOST_LIMIT = 2
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY, per_host_limit: int = DEFAULT_PER_HOST_LIMIT):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if per_host_limit < 1:
+            raise ValueError("per_host_limit must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.per_host_limit = per_host_limit
+
+    async def run_async(self, configs: List[Dict],
+                        task: Callable[[Dict], Awaitable[Tuple]]) -> AsyncIterator[Dict]:
+        """
+        Await task(config) for every configuration and yield results as they complete.
+
+        Args:
+            configs: Configurations to process
+            task: Coroutine function returning a (success, message) tuple,
+                optionally followed by a dict of extra result fields
+
+        Yields:
+            dict: Result with 'config', 'success', 'message' and 'elapsed' keys,
+            plus any extra fields returned by the task
+        """
+        import asyncio
+
+        pending: Dict[str, deque] = {}
+        for config in configs:
+            pending.setdefault(get_host_key(config), deque()).append(config)
+
+        slots = asyncio.Semaphore(self.max_concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def drain(host_queue: deque):
+            try:
+                while host_queue:
+                    config = host_queue.popleft()
+                    async with slots:
+                        results.put_nowait(await self._run_task(task, config))
+            except Exception as e:
+                # Surface bugs instead of leaving the caller waiting for results that never come
+                results.put_nowait(e)
+
+        workers = [
+            asyncio.create_task(drain(host_queue))
+            for host_queue in pending.values()
+            for _ in range(min(self.per_host_limit, len(host_queue)))
+        ]
+        try:
+            for _ in range(len(configs)):
+                result = await results.get()
+                if isinstance(result, Exception):
+                    raise result
+                yield result
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    @staticmethod
+    async def _run_task(task: Callable[[Dict], Awaitable[Tuple]], config: Dict) -> Dict:
+        """Await a single task, converting exceptions into failed results."""
+        started = time.monotonic()
+        details = {}
+        try:
+            outcome = await task(config)
+            success, message = outcome[0], outcome[1]
+            if len(outcome) > 2:
+                details = outcome[2]
+        except Exception as e:
+            logger.error(f"Task for {config['name']} raised: {str(e)}\n{traceback.format_exc()}")
+            success, message = False, f"Error: {str(e)}"
+        result = {
+            'config': config,
+            'success': success,
+            'message': message,
+            'elapsed': time.monotonic() - started
+        }
+        result.update(details)
+        return result
+
+    def run(self, configs: List[Dict], task: Callable[[Dict], Awaitable[Tuple]]) -> Iterator[Dict]:
+        """
+        Run the engine on its own event loop thread and yield results in the caller's thread.
+
+        This bridges the engine to code that is not async, such as the GUI
+        workers, which forward each result to the Tk or Qt event loop. Closing
+        the iterator early cancels the remaining tasks.
+        """
+        # asyncio is imported on first use to keep application startup fast
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+
+        results: queue.Queue = queue.Queue()
+        loop = asyncio.new_event_loop()
+        # Every in-flight task may be waiting on a blocking request
+        loop.set_default_executor(ThreadPoolExecutor(self.max_concurrency, thread_name_prefix="publish-io"))
+        main_task = None
+
+        async def pump():
+            async for result in self.run_async(configs, task):
+                results.put(result)
+
+        def run_loop():
+            nonlocal main_task
+            asyncio.set_event_loop(loop)
+            try:
+                main_task = loop.create_task(pump())
+                loop.run_until_complete(main_task)
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                results.put(e)
+            finally:
+                loop.run_until_complete(loop.shutdown_default_executor())
+                loop.close()
+                results.put(_DONE)
+
+        thread = threading.Thread(target=run_loop, name="publish-loop", daemon=True)
+        thread.start()
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if thread.is_alive() and main_task is not None:
+                try:
+                    loop.call_soon_threadsafe(main_task.cancel)
+                except RuntimeError:
+                    pass  # The loop finished in the meantime
+            thread.join()
@@ -0,0 +1,196 @@
+import logging
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+from utils.retry_policy import SERVER_ERROR, TRANSIENT, UNCERTAIN
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Failure kind reported for calls the breaker refused; never retried
+CIRCUIT_OPEN = 'circuit_open'
+
+# Failures that say the host itself is unhealthy; a 4xx answer proves it is up
+HOST_FAILURES = frozenset({TRANSIENT, SERVER_ERROR})
+
+
+def get_endpoint_key(config: Dict) -> str:
+    """
+    Return the key of the service a configuration talks to.
+
+    OnPrem servers are keyed by scheme://host:port, as several service tiers
+    often run on one machine and a dead tier says nothing about the others.
+    Sandbox environments share the tenant's cloud endpoint.
+    """
+    if config['environmentType'].lower() == 'onprem':
+        from utils.app_publisher import AppPublisher
+
+        server = config['server']
+        parsed = urlparse(server if '://' in server else f"http://{server}")
+        port = parsed.port or AppPublisher.DEFAULT_PORT
+        return f"{parsed.scheme}://{parsed.hostname or server}:{port}".lower()
+    return f"sandbox:{config.get('tenant', '')}".lower()
+
+
+class CircuitBreaker:
+    """
+    Fails fast on a host after repeated connection or server errors.
+
+    After failure_threshold consecutive failures the breaker opens and calls
+    are refused for cooldown seconds. It then half-opens and admits a single
+    trial call: success closes it, failure opens it for another cooldown.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _state(self, now: float) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        return OPEN if now - self._opened_at < self.cooldown else HALF_OPEN
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(self._clock())
+
+    def retry_in(self) -> float:
+        """Seconds until an open breaker admits a trial call"""
+        with self._lock:
+            if self._opened_at is None:
+                return 0.0
+            return max(0.0, self._opened_at + self.cooldown - self._clock())
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; in the half-open state only one trial runs at a time"""
+        with self._lock:
+            now = self._clock()
+            state = self._state(now)
+            if state == CLOSED:
+                return True
+            if state == OPEN:
+                return False
+            # A trial that never reported back does not block the host forever
+            if self._trial_started is not None and now - self._trial_started < self.cooldown:
+                return False
+            self._trial_started = now
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("Circuit closed after a successful trial call")
+            self._failures = 0
+            self._opened_at = None
+            self._trial_started = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            now = self._clock()
+            self._failures += 1
+            self._trial_started = None
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = now
+
+    def wrap(self, attempt: Callable[[], Tuple[bool, str, Optional[Dict]]], host: str):
+        """
+        Guard a single attempt returning (success, message, failure).
+
+        Refused calls fail with kind CIRCUIT_OPEN without touching the host.
+        """
+        def guarded():
+            if not self.allow():
+                return self._refused(host)
+            success, message, failure = attempt()
+            self._record(failure, host)
+            return success, message, failure
+
+        return guarded
+
+    def _refused(self, host: str) -> Tuple[bool, str, Dict]:
+        return (False, f"{host} is unavailable after repeated failures, next try in {self.retry_in():.0f}s",
+                {'kind': CIRCUIT_OPEN, 'retry_after': None})
+
+    def _record(self, failure: Optional[Dict], host: str) -> None:
+        if failure is not None and failure['kind'] in HOST_FAILURES:
+            self.record_failure()
+            if self.state == OPEN:
+                logger.warning(f"Circuit for {host} opened for {self.cooldown:.0f}s")
+        elif failure is None or failure['kind'] != UNCERTAIN:
+            # An uncertain outcome, such as a read timeout while the server syncs, proves nothing either way
+            self.record_success()
+
+    def wrap_async(self, attempt: Callable[[], Awaitable[Tuple[bool, str, Optional[Dict]]]], host: str):
+        """Like wrap(), for a coroutine function"""
+        async def guarded():
+            if not self.allow():
+                return self._refused(host)
+            success, message, failure = await attempt()
+            self._record(failure, host)
+            return success, message, failure
+
+        return guarded
+
+
+class CircuitBreakerRegistry:
+    """
+    One circuit breaker per endpoint (see get_endpoint_key).
+
+    This is finer than the publish engine's per-host concurrency limit, which
+    groups every service tier on a machine because they share its resources.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._clock = clock
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(self, config: Dict) -> CircuitBreaker:
+        key = get_endpoint_key(config)
+        with self._lock:
+            breaker = self._breakers.get(key)
+            if breaker is None:
+                breaker = self._breakers[key] = CircuitBreaker(self.failure_threshold, self.cooldown, self._clock)
+            return breaker
+
+    def guard(self, config: Dict, attempt: Callable[[], Tuple[bool, str, Optional[Dict]]]):
+        """Guard an attempt against config with its endpoint's breaker"""
+        return self.get(config).wrap(attempt, get_endpoint_key(config))
+
+    def guard_async(self, config: Dict, attempt: Callable[[], Awaitable[Tuple[bool, str, Optional[Dict]]]]):
+        """Like guard(), for a coroutine function"""
+        return self.get(config).wrap_async(attempt, get_endpoint_key(config))
+
+    def state(self, config: Dict) -> str:
+        """State of the breaker for config's endpoint; CLOSED for endpoints never contacted"""
+        with self._lock:
+            breaker = self._breakers.get(get_endpoint_key(config))
+        return breaker.state if breaker is not None else CLOSED
+
+
+_default_registry = None
+_default_registry_lock = threading.Lock()
+
+
+def get_circuit_breakers() -> CircuitBreakerRegistry:
+    """Get the process-wide circuit breakers, shared by publishing and connection tests"""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = CircuitBreakerRegistry()
+        return _default_registry
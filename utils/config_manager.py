@@ -1,37 +1,101 @@
-import json
-import os
-from typing import List, Dict, Optional
-import tkinter.messagebox as messagebox
+from collections.abc import Sequence
+from typing import List, Dict, Optional, Tuple
+from .config_store import create_config_store
 from .translations import get_text
 
+class ConfigurationView(Sequence):
+    """Read-only view of the configuration list that does not copy it."""
+
+    def __init__(self, configurations: List[Dict]):
+        self._configurations = configurations
+
+    def __getitem__(self, index):
+        return self._configurations[index]
+
+    def __len__(self) -> int:
+        return len(self._configurations)
+
+    def __iter__(self):
+        return iter(self._configurations)
+
 class ConfigurationManager:
-    def __init__(self, config_file: str = "saved_configurations.json"):
-        """Initialize the configuration manager with a storage file path."""
+    def __init__(self, config_file: str = "saved_configurations.json", storage=None):
+        """
+        Initialize the configuration manager with a storage file path.
+
+        Args:
+            config_file: JSON file, or SQLite database (.db, .sqlite, .sqlite3)
+            storage: Storage backend to use instead of the one derived from config_file
+        """
         self.config_file = config_file
+        self.storage = storage or create_config_store(config_file)
         self.configurations: List[Dict] = []
+        # Maps configuration name to its position in self.configurations
+        self._name_index: Dict[str, int] = {}
         self.load_configurations()
 
+    def _rebuild_index(self) -> None:
+        """Rebuild the name index after the configuration list was replaced."""
+        self._name_index = {config['name']: i for i, config in enumerate(self.configurations)}
+
+    def _changed(self, rows: Optional[List[Tuple[int, Dict]]] = None) -> None:
+        """
+        Persist a modification with a single write.
+
+        Args:
+            rows: Changed (position, configuration) rows, or None if the whole list changed
+        """
+        if rows is None:
+            self.save_configurations()
+            return
+        try:
+            self.storage.upsert(rows, self.configurations)
+        except Exception as e:
+            print(f"Error saving configurations: {e}")
+
     def load_configurations(self) -> None:
         """Load saved configurations from file if it exists."""
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    self.configurations = json.load(f)
+            self.configurations = self.storage.load()
         except Exception as e:
             print(f"Error loading configurations: {e}")
             self.configurations = []
+        self._rebuild_index()
 
     def save_configurations(self) -> None:
         """Save current configurations to file."""
         try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.configurations, f, indent=2)
+            self.storage.save_all(self.configurations)
+        except Exception as e:
+            print(f"Error saving configurations: {e}")
+
+    def flush(self) -> None:
+        """Write pending changes to storage; call before the application exits."""
+        try:
+            self.storage.flush()
         except Exception as e:
             print(f"Error saving configurations: {e}")
 
     def find_config_by_name(self, name: str) -> Optional[Dict]:
         """Find a configuration by its name."""
-        return next((config for config in self.configurations if config['name'] == name), None)
+        idx = self._name_index.get(name)
+        return self.configurations[idx] if idx is not None else None
+
+    def find_configs(self, environment_type: Optional[str] = None, server: Optional[str] = None,
+                     tenant: Optional[str] = None) -> List[Dict]:
+        """Find configurations by environment type, server and tenant."""
+        if hasattr(self.storage, 'find'):
+            return self.storage.find(environment_type, server, tenant)
+        return [
+            config for config in self.configurations
+            if (environment_type is None or config['environmentType'].lower() == environment_type.lower())
+            and (server is None or config.get('server') == server)
+            and (tenant is None or config.get('tenant') == tenant)
+        ]
+
+    def get_index(self, name: str) -> Optional[int]:
+        """Get the position of a configuration in the list by its name."""
+        return self._name_index.get(name)
 
     def add_configurations(self, new_configs: List[Dict], ask_overwrite: bool = True) -> None:
         """
@@ -41,30 +105,37 @@ class ConfigurationManager:
             new_configs: List of new configurations to add
             ask_overwrite: Whether to ask for confirmation before overwriting existing configs
         """
+        changed_rows = []
         for new_config in new_configs:
-            existing_config = self.find_config_by_name(new_config['name'])
+            idx = self._name_index.get(new_config['name'])
 
-            if existing_config:
+            if idx is not None:
                 if ask_overwrite:
+                    # Imported here so headless callers never load tkinter
+                    import tkinter.messagebox as messagebox
+
                     # Ask user for confirmation with translated message
                     if messagebox.askyesno(
                         "Configuration Exists",
                         get_text('config_exists', name=new_config['name'])
                     ):
                         # Replace existing configuration
-                        idx = self.configurations.index(existing_config)
                         self.configurations[idx] = new_config
+                        changed_rows.append((idx, new_config))
                     # If user says no, skip this configuration
                 else:
                     # Replace without asking when ask_overwrite is False
-                    idx = self.configurations.index(existing_config)
                     self.configurations[idx] = new_config
+                    changed_rows.append((idx, new_config))
             else:
                 # Add new configuration
+                self._name_index[new_config['name']] = len(self.configurations)
+                changed_rows.append((len(self.configurations), new_config))
                 self.configurations.append(new_config)
 
         # Save after modifications
-        self.save_configurations()
+        if changed_rows:
+            self._changed(changed_rows)
 
     def replace_configurations(self, new_configs: List[Dict]) -> None:
         """
@@ -75,13 +146,19 @@ class ConfigurationManager:
             new_configs: List of new configurations to replace existing ones
         """
         self.configurations = new_configs
-        self.save_configurations()
+        self._rebuild_index()
+        self._changed(None)
 
     def clear_configurations(self) -> None:
         """Clear all configurations and save empty state."""
         self.configurations = []
-        self.save_configurations()
+        self._rebuild_index()
+        self._changed(None)
 
     def get_configurations(self) -> List[Dict]:
-        """Get current configurations."""
-        return self.configurations.copy()
\ No newline at end of file
+        """Get a copy of the current configurations."""
+        return self.configurations.copy()
+
+    def get_configurations_view(self) -> ConfigurationView:
+        """Get a read-only view of the current configurations without copying them."""
+        return ConfigurationView(self.configurations)
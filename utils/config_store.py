@@ -0,0 +1,301 @@
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+# Debounced JSON stores with writes that must reach disk before the interpreter exits
+_open_json_stores = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_json_stores() -> None:
+    for store in list(_open_json_stores):
+        try:
+            store.flush()
+        except Exception as e:
+            logger.error(f"Error saving configurations to {store.path}: {e}")
+
+
+class JsonConfigStore:
+    """
+    Stores configurations as a single JSON array (saved_configurations.json).
+
+    Saves are handed to a background writer that waits for a short quiet
+    period, so a burst of modifications results in one write of the latest
+    state. Each write goes to a temporary file that is fsynced and then moved
+    over the target, so a crash never leaves a truncated file behind.
+    """
+
+    DEFAULT_DEBOUNCE = 0.5
+
+    def __init__(self, path: str, debounce: float = DEFAULT_DEBOUNCE):
+        """
+        Args:
+            path: JSON configuration file
+            debounce: Seconds to wait for further changes before writing; 0 writes synchronously
+        """
+        self.path = path
+        self.debounce = debounce
+        self._condition = threading.Condition()
+        self._pending: Optional[List[Dict]] = None
+        self._deadline = 0.0
+        self._writing = False
+        self._writer = None
+        if debounce > 0:
+            _open_json_stores.add(self)
+
+    def load(self) -> List[Dict]:
+        """Load all configurations in order."""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def save_all(self, configurations: List[Dict]) -> None:
+        """Schedule a write of all configurations."""
+        snapshot = list(configurations)
+        if self.debounce <= 0:
+            self._write(snapshot)
+            return
+        with self._condition:
+            self._pending = snapshot
+            self._deadline = time.monotonic() + self.debounce
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._run_writer, name="config-writer", daemon=True)
+                self._writer.start()
+            self._condition.notify_all()
+
+    def upsert(self, rows: List[Tuple[int, Dict]], configurations: List[Dict]) -> None:
+        """Persist changed rows; a JSON file can only be rewritten as a whole."""
+        self.save_all(configurations)
+
+    def clear(self) -> None:
+        """Remove all configurations."""
+        self.save_all([])
+
+    def flush(self) -> None:
+        """Write any pending changes now and wait until they are on disk."""
+        with self._condition:
+            while self._writing:
+                self._condition.wait()
+            snapshot, self._pending = self._pending, None
+            if snapshot is None:
+                return
+            self._writing = True
+        try:
+            self._write(snapshot)
+        finally:
+            with self._condition:
+                self._writing = False
+                self._condition.notify_all()
+
+    def close(self) -> None:
+        """Write pending changes; the store is no longer flushed at exit."""
+        _open_json_stores.discard(self)
+        self.flush()
+
+    def _run_writer(self) -> None:
+        """Write the latest snapshot once changes settle, then exit when idle."""
+        while True:
+            with self._condition:
+                while self._writing:
+                    self._condition.wait()
+                if self._pending is None:
+                    # Exiting drops the thread's reference so unused stores can be collected
+                    self._writer = None
+                    return
+                remaining = self._deadline - time.monotonic()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+                snapshot, self._pending = self._pending, None
+                self._writing = True
+            try:
+                self._write(snapshot)
+            except Exception as e:
+                logger.error(f"Error saving configurations: {e}")
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _write(self, configurations: List[Dict]) -> None:
+        """Atomically replace the file with the given configurations."""
+        temp_file = f"{self.path}.tmp"
+        try:
+            with open(temp_file, 'w') as f:
+                json.dump(configurations, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.path)
+        except Exception:
+            if os.path.exists(temp_file):
+                try:
+                    os.remove(temp_file)
+                except OSError:
+                    pass
+            raise
+
+
+class SqliteConfigStore:
+    """
+    Stores configurations in SQLite, one row per configuration.
+
+    Lookups by name, environment type, server and tenant are indexed and
+    changes are written row by row inside a transaction instead of rewriting
+    the whole inventory.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS configurations (
+            name TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            environment_type TEXT NOT NULL COLLATE NOCASE,
+            server TEXT,
+            tenant TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_configurations_position ON configurations (position);
+        CREATE INDEX IF NOT EXISTS idx_configurations_environment_type ON configurations (environment_type);
+        CREATE INDEX IF NOT EXISTS idx_configurations_server ON configurations (server);
+        CREATE INDEX IF NOT EXISTS idx_configurations_tenant ON configurations (tenant);
+        CREATE TABLE IF NOT EXISTS metadata (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path: str, migrate_from: Optional[str] = None):
+        """
+        Args:
+            path: SQLite database file
+            migrate_from: JSON configuration file imported once into a new database
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.executescript(self.SCHEMA)
+        if migrate_from:
+            self.migrate_from_json(migrate_from)
+
+    @staticmethod
+    def _row(position: int, config: Dict) -> Tuple:
+        return (
+            config['name'],
+            position,
+            config['environmentType'],
+            config.get('server'),
+            config.get('tenant'),
+            json.dumps(config)
+        )
+
+    def _insert_rows(self, rows: List[Tuple[int, Dict]]) -> None:
+        self._connection.executemany(
+            """
+            INSERT INTO configurations (name, position, environment_type, server, tenant, data)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                position = excluded.position,
+                environment_type = excluded.environment_type,
+                server = excluded.server,
+                tenant = excluded.tenant,
+                data = excluded.data
+            """,
+            [self._row(position, config) for position, config in rows]
+        )
+
+    def migrate_from_json(self, json_path: str) -> int:
+        """
+        Import configurations from a JSON file into a new database, once.
+
+        The attempt is recorded even when the file does not exist or the
+        database already holds configurations, so a JSON file that shows up
+        later (a restored backup, an older version still writing it) never
+        overwrites newer edits.
+
+        Returns:
+            int: Number of imported configurations (0 if already migrated or nothing to import)
+        """
+        with self._lock:
+            migrated = self._connection.execute(
+                "SELECT value FROM metadata WHERE key = 'migrated_from'"
+            ).fetchone()
+            if migrated:
+                return 0
+            has_rows = self._connection.execute("SELECT 1 FROM configurations LIMIT 1").fetchone()
+            configurations = []
+            if not has_rows and os.path.exists(json_path):
+                configurations = JsonConfigStore(json_path, debounce=0).load()
+            with self._connection:
+                self._insert_rows(list(enumerate(configurations)))
+                self._connection.execute(
+                    "INSERT INTO metadata (key, value) VALUES ('migrated_from', ?)",
+                    (os.path.abspath(json_path),)
+                )
+            if configurations:
+                logger.info(f"Imported {len(configurations)} configuration(s) from {json_path}")
+            return len(configurations)
+
+    def load(self) -> List[Dict]:
+        """Load all configurations in order."""
+        with self._lock:
+            rows = self._connection.execute("SELECT data FROM configurations ORDER BY position").fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def save_all(self, configurations: List[Dict]) -> None:
+        """Replace all stored configurations in one transaction."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM configurations")
+            self._insert_rows(list(enumerate(configurations)))
+
+    def upsert(self, rows: List[Tuple[int, Dict]], configurations: List[Dict]) -> None:
+        """Insert or update only the given (position, configuration) rows."""
+        with self._lock, self._connection:
+            self._insert_rows(rows)
+
+    def clear(self) -> None:
+        """Remove all configurations."""
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM configurations")
+
+    def find(self, environment_type: Optional[str] = None, server: Optional[str] = None,
+             tenant: Optional[str] = None) -> List[Dict]:
+        """Find configurations matching all given criteria using the indexes."""
+        clauses, params = [], []
+        for column, value in (('environment_type', environment_type), ('server', server), ('tenant', tenant)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT data FROM configurations {where} ORDER BY position", params
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def flush(self) -> None:
+        """Nothing to do; every change is committed when it is made."""
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
+
+
+def create_config_store(config_file: str, migrate_from: Optional[str] = "saved_configurations.json"):
+    """Create the storage backend matching the file extension of config_file."""
+    if config_file.lower().endswith(SQLITE_EXTENSIONS):
+        if migrate_from and not os.path.isabs(migrate_from):
+            migrate_from = os.path.join(os.path.dirname(os.path.abspath(config_file)), migrate_from)
+        return SqliteConfigStore(config_file, migrate_from=migrate_from)
+    return JsonConfigStore(config_file)
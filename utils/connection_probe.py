@@ -0,0 +1,320 @@
+import logging
+import time
+from base64 import b64encode
+from functools import lru_cache
+from typing import Dict, Optional
+from urllib.parse import unquote, urlparse
+
+from utils.retry_policy import classify_exception
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10.0
+
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+
+@lru_cache(maxsize=2)
+def _ssl_context(verify: bool):
+    """TLS context shared by all probes; building one loads the CA store"""
+    import ssl
+
+    context = ssl.create_default_context()
+    if not verify:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+    return context
+
+
+def _find_proxy(parsed):
+    """The parsed HTTP(S)_PROXY URL for a target, honouring NO_PROXY, or None"""
+    from urllib.request import getproxies, proxy_bypass
+
+    proxy = getproxies().get(parsed.scheme)
+    if not proxy or proxy_bypass(parsed.hostname):
+        return None
+    return urlparse(proxy if '://' in proxy else f"http://{proxy}")
+
+
+def _proxy_authorization(proxy) -> str:
+    if not proxy.username:
+        return ""
+    credentials = f"{unquote(proxy.username)}:{unquote(proxy.password or '')}"
+    return f"Proxy-Authorization: Basic {b64encode(credentials.encode()).decode()}\r\n"
+
+
+def _connect_request(host: str, port: int, proxy) -> bytes:
+    """CONNECT request opening a tunnel through proxy for an https target"""
+    return (f"CONNECT {host}:{port} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+            f"{_proxy_authorization(proxy)}\r\n").encode()
+
+
+def _check_tunnel(response: bytes) -> None:
+    status_line = response.split(b"\r\n", 1)[0].decode('latin-1')
+    parts = status_line.split()
+    if len(parts) < 2 or not parts[1].startswith('2'):
+        raise ConnectionError(f"Proxy refused the tunnel: {status_line[:80] or 'no response'}")
+
+
+def _get_request(parsed, proxy) -> bytes:
+    """The probe's GET; plain http through a proxy uses the absolute URL"""
+    path = parsed.path or '/'
+    if parsed.query:
+        path += f"?{parsed.query}"
+    forwarded = proxy is not None and parsed.scheme != 'https'
+    if forwarded:
+        path = f"{parsed.scheme}://{parsed.netloc}{path}"
+    return (
+        f"GET {path} HTTP/1.1\r\n"
+        f"Host: {parsed.netloc}\r\n"
+        "User-Agent: bc-app-publisher\r\n"
+        "Accept: */*\r\n"
+        f"{_proxy_authorization(proxy) if forwarded else ''}"
+        "Connection: close\r\n\r\n"
+    ).encode()
+
+
+def probe_url(url: str, timeout: float = DEFAULT_TIMEOUT, verify: bool = True) -> Dict:
+    """
+    Send a GET request over a fresh connection and time each phase.
+
+    A fresh socket is used on purpose: a pooled keep-alive connection would
+    hide the DNS, connect and TLS costs. HTTP(S)_PROXY and NO_PROXY are
+    honoured like in the publish requests; through a proxy, the DNS and
+    connect timings are those of the proxy.
+
+    Args:
+        url: URL to request
+        timeout: Time budget in seconds for the whole probe
+        verify: Whether to verify the server's TLS certificate
+
+    Returns:
+        dict: 'status' (HTTP status code or None), 'error' (None on success),
+        'error_kind' (see utils.retry_policy) when it failed, and the
+        'dns_ms', 'connect_ms', 'tls_ms', 'ttfb_ms' and 'total_ms' timings
+        of the phases that completed
+    """
+    # Loaded on first use; the GUIs import this module for its formatting helpers at startup
+    import socket
+
+    parsed = urlparse(url)
+    is_https = parsed.scheme == 'https'
+    host = parsed.hostname
+    port = parsed.port or (443 if is_https else 80)
+    proxy = _find_proxy(parsed)
+    if proxy is not None:
+        connect_host, connect_port = proxy.hostname, proxy.port or 80
+    else:
+        connect_host, connect_port = host, port
+
+    result = {'status': None, 'error': None}
+    deadline = time.monotonic() + timeout
+    total_started = time.perf_counter()
+
+    def remaining() -> float:
+        left = deadline - time.monotonic()
+        if left <= 0:
+            raise socket.timeout("timed out")
+        return left
+
+    sock: Optional[socket.socket] = None
+    try:
+        # getaddrinfo has no timeout of its own; the budget is checked after it returns
+        started = time.perf_counter()
+        addresses = socket.getaddrinfo(connect_host, connect_port, type=socket.SOCK_STREAM)
+        result['dns_ms'] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        last_error = None
+        for family, sock_type, proto, _, address in addresses:
+            candidate = socket.socket(family, sock_type, proto)
+            try:
+                candidate.settimeout(remaining())
+                candidate.connect(address)
+                sock = candidate
+                break
+            except OSError as e:
+                candidate.close()
+                last_error = e
+        if sock is None:
+            raise last_error or OSError(f"No addresses for {connect_host}")
+        result['connect_ms'] = _elapsed_ms(started)
+
+        if is_https and proxy is not None:
+            sock.settimeout(remaining())
+            sock.sendall(_connect_request(host, port, proxy))
+            response = b""
+            while b"\r\n\r\n" not in response and len(response) < 8192:
+                sock.settimeout(remaining())
+                chunk = sock.recv(1024)
+                if not chunk:
+                    break
+                response += chunk
+            _check_tunnel(response)
+
+        if is_https:
+            started = time.perf_counter()
+            sock.settimeout(remaining())
+            sock = _ssl_context(verify).wrap_socket(sock, server_hostname=host)
+            result['tls_ms'] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        sock.settimeout(remaining())
+        sock.sendall(_get_request(parsed, proxy))
+        head = sock.recv(1)
+        if not head:
+            raise ConnectionError("Connection closed before a response was received")
+        result['ttfb_ms'] = _elapsed_ms(started)
+
+        # Read up to the end of the status line
+        while b"\r\n" not in head and len(head) < 1024:
+            sock.settimeout(remaining())
+            chunk = sock.recv(1024)
+            if not chunk:
+                break
+            head += chunk
+        status_line = head.split(b"\r\n", 1)[0].decode('latin-1')
+        parts = status_line.split()
+        if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit():
+            raise ValueError(f"Invalid HTTP response: {status_line[:80]}")
+        result['status'] = int(parts[1])
+
+    except (OSError, ValueError) as e:
+        result['error'] = str(e) or e.__class__.__name__
+        result['error_kind'] = classify_exception(e)['kind']
+        logger.debug(f"Probe of {url} failed: {result['error']}")
+    finally:
+        if sock is not None:
+            sock.close()
+        result['total_ms'] = _elapsed_ms(total_started)
+
+    return result
+
+
+async def probe_url_async(url: str, timeout: float = DEFAULT_TIMEOUT, verify: bool = True) -> Dict:
+    """Like probe_url(), as a coroutine; many probes can share one event loop thread"""
+    import asyncio
+    import socket
+
+    parsed = urlparse(url)
+    is_https = parsed.scheme == 'https'
+    host = parsed.hostname
+    port = parsed.port or (443 if is_https else 80)
+    proxy = _find_proxy(parsed)
+    if proxy is not None:
+        connect_host, connect_port = proxy.hostname, proxy.port or 80
+    else:
+        connect_host, connect_port = host, port
+
+    result = {'status': None, 'error': None}
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    total_started = time.perf_counter()
+
+    async def within_budget(awaitable):
+        left = deadline - loop.time()
+        if left <= 0:
+            raise socket.timeout("timed out")
+        try:
+            return await asyncio.wait_for(awaitable, left)
+        except asyncio.TimeoutError:
+            raise socket.timeout("timed out") from None
+
+    writer = None
+    try:
+        started = time.perf_counter()
+        addresses = await within_budget(loop.getaddrinfo(connect_host, connect_port, type=socket.SOCK_STREAM))
+        result['dns_ms'] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        last_error = None
+        for family, _, _, _, address in addresses:
+            try:
+                reader, writer = await within_budget(asyncio.open_connection(address[0], address[1], family=family))
+                break
+            except OSError as e:
+                last_error = e
+        if writer is None:
+            raise last_error or OSError(f"No addresses for {connect_host}")
+        result['connect_ms'] = _elapsed_ms(started)
+
+        if is_https and proxy is not None:
+            writer.write(_connect_request(host, port, proxy))
+            await within_budget(writer.drain())
+            try:
+                response = await within_budget(reader.readuntil(b"\r\n\r\n"))
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+                response = getattr(e, 'partial', b"")
+            _check_tunnel(response)
+
+        if is_https:
+            started = time.perf_counter()
+            await within_budget(writer.start_tls(_ssl_context(verify), server_hostname=host))
+            result['tls_ms'] = _elapsed_ms(started)
+
+        started = time.perf_counter()
+        writer.write(_get_request(parsed, proxy))
+        await within_budget(writer.drain())
+        head = await within_budget(reader.read(1))
+        if not head:
+            raise ConnectionError("Connection closed before a response was received")
+        result['ttfb_ms'] = _elapsed_ms(started)
+
+        try:
+            head += await within_budget(reader.readuntil(b"\r\n"))
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        status_line = head.split(b"\r\n", 1)[0].decode('latin-1')
+        parts = status_line.split()
+        if len(parts) < 2 or not parts[0].startswith('HTTP/') or not parts[1].isdigit():
+            raise ValueError(f"Invalid HTTP response: {status_line[:80]}")
+        result['status'] = int(parts[1])
+
+    except (OSError, ValueError) as e:
+        result['error'] = str(e) or e.__class__.__name__
+        result['error_kind'] = classify_exception(e)['kind']
+        logger.debug(f"Probe of {url} failed: {result['error']}")
+    finally:
+        if writer is not None:
+            writer.close()
+        result['total_ms'] = _elapsed_ms(total_started)
+
+    return result
+
+
+def format_timings(result: Dict) -> str:
+    """Format the phase timings of a probe result, e.g. 'DNS 2 ms, connect 15 ms, first byte 40 ms'"""
+    labels = (('dns_ms', 'DNS'), ('connect_ms', 'connect'), ('tls_ms', 'TLS'), ('ttfb_ms', 'first byte'))
+    return ", ".join(f"{label} {result[key]:.0f} ms" for key, label in labels if key in result)
+
+
+def format_test_result(success: bool, message: str, timings: Dict) -> str:
+    """Format one connection test result line for the progress log"""
+    status = "✓" if success else "✗"
+    described = format_timings(timings)
+    return f"{status} {message} ({described})" if described else f"{status} {message}"
+
+
+def summarize_connection_tests(results, slowest: int = 3):
+    """
+    Build the summary lines shown after a batch of connection tests.
+
+    Args:
+        results: (server_name, success, timings) for each tested server
+        slowest: Number of slowest reachable servers to list
+    """
+    successful = sum(1 for _, success, _ in results if success)
+    lines = [
+        "\nTest Summary:",
+        f"Successful connections: {successful}",
+        f"Failed connections: {len(results) - successful}"
+    ]
+    reachable = sorted(
+        ((timings['total_ms'], name) for name, success, timings in results if success and 'total_ms' in timings),
+        reverse=True
+    )
+    if len(reachable) > 1:
+        lines.append("Slowest: " + ", ".join(f"{name} ({total_ms:.0f} ms)" for total_ms, name in reachable[:slowest]))
+    return lines
@@ -0,0 +1,142 @@
+import logging
+import threading
+import uuid
+from queue import Queue, Empty
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def get_server_id(config: Dict) -> str:
+    """
+    Get the key under which credentials for a configuration are stored.
+
+    OnPrem servers store a user per server instance; Sandbox environments
+    store one app registration (client id and secret) per tenant.
+    """
+    if config['environmentType'].lower() == 'sandbox':
+        return f"sandbox_{config['tenant']}"
+    return f"{config['server']}_{config['serverInstance']}"
+
+
+def needs_credentials(config: Dict) -> bool:
+    """Whether publishing to a configuration requires user credentials"""
+    return config['environmentType'].lower() in ('onprem', 'sandbox')
+
+
+def describe_credentials(config: Dict) -> str:
+    """Describe which credentials a configuration needs, for credential prompts"""
+    if config['environmentType'].lower() == 'sandbox':
+        return f"{config['name']} (tenant {config['tenant']}: client ID / client secret)"
+    return f"{config['name']} ({config['server']}/{config['serverInstance']})"
+
+
+class CredentialBroker:
+    """
+    Routes credential requests from worker threads to the UI.
+
+    Every request carries a correlation id and gets its own reply queue, so
+    a reply can only reach the request it answers, and a late reply to a
+    request that already timed out is dropped.
+    """
+
+    DEFAULT_TIMEOUT = 300
+
+    def __init__(self, post: Callable[..., None], timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            post: Delivers ('need_credentials', request_id, missing) to the UI thread
+            timeout: Seconds to wait for the UI to answer a request
+        """
+        self._post = post
+        self.timeout = timeout
+        self._waiting: Dict[str, Queue] = {}
+        self._lock = threading.Lock()
+
+    def request(self, missing: List[Tuple[str, Dict]]) -> Dict[str, Tuple[str, str]]:
+        """
+        Ask the UI for credentials for several servers at once and wait for the answer.
+
+        Args:
+            missing: (server_id, configuration) for each server without credentials
+
+        Returns:
+            dict: (username, password) by server id for the servers the user provided
+
+        Raises:
+            TimeoutError: If the UI did not answer in time
+        """
+        request_id = uuid.uuid4().hex
+        reply = Queue(maxsize=1)
+        with self._lock:
+            self._waiting[request_id] = reply
+        try:
+            logger.debug(f"Requesting credentials for {len(missing)} server(s) (request {request_id})")
+            self._post('need_credentials', request_id, missing)
+            return reply.get(timeout=self.timeout) or {}
+        except Empty:
+            raise TimeoutError(f"No credentials received within {self.timeout} seconds")
+        finally:
+            with self._lock:
+                self._waiting.pop(request_id, None)
+
+    def respond(self, request_id: str, credentials: Optional[Dict[str, Tuple[str, str]]]) -> bool:
+        """
+        Answer a request; called from the UI thread.
+
+        Returns:
+            bool: False if the request is no longer waiting
+        """
+        with self._lock:
+            reply = self._waiting.get(request_id)
+        if reply is None:
+            logger.warning(f"Dropping credentials for unknown or expired request {request_id}")
+            return False
+        reply.put_nowait(credentials)
+        return True
+
+
+def collect_credentials(configs: List[Dict], credential_manager, broker: Optional[CredentialBroker] = None):
+    """
+    Resolve credentials for all configurations before publishing starts.
+
+    Stored credentials are used where available; the remaining servers are
+    requested from the user in a single prompt through the broker, once per
+    server id. Without a broker, servers with no stored credentials fail.
+
+    Returns:
+        tuple: (credentials by server id, configurations ready to publish,
+        list of (configuration, reason) that cannot be published)
+    """
+    credentials: Dict[str, Tuple[str, str]] = {}
+    missing: Dict[str, Dict] = {}
+    for config in configs:
+        if not needs_credentials(config):
+            continue
+        server_id = get_server_id(config)
+        if server_id in credentials or server_id in missing:
+            continue
+        stored = credential_manager.get_credentials(server_id)
+        if stored:
+            credentials[server_id] = (stored['username'], stored['password'])
+        else:
+            missing[server_id] = config
+
+    reason = None
+    if missing and broker is not None:
+        try:
+            provided = broker.request(list(missing.items()))
+            credentials.update((server_id, provided[server_id]) for server_id in missing if provided.get(server_id))
+            reason = "No credentials provided"
+        except TimeoutError as e:
+            logger.error(str(e))
+            reason = "Credential request timed out"
+
+    ready, failed = [], []
+    for config in configs:
+        if not needs_credentials(config) or get_server_id(config) in credentials:
+            ready.append(config)
+        else:
+            failed.append((config, reason or f"No credentials available for {get_server_id(config)}"))
+
+    return credentials, ready, failed
@@ -1,7 +1,10 @@
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QLabel, QLineEdit, 
-                            QPushButton, QHBoxLayout)
+                            QPushButton, QHBoxLayout, QGridLayout, QCheckBox,
+                            QScrollArea, QWidget)
 from PyQt6.QtCore import Qt
 
+from utils.credential_broker import describe_credentials
+
 def get_credentials(parent, server_config):
     dialog = QDialog(parent)
     dialog.setWindowTitle("Server Authentication")
@@ -63,4 +66,84 @@ def get_credentials(parent, server_config):
 
     if dialog.exec() == QDialog.DialogCode.Accepted:
         return result
-    return None
\ No newline at end of file
+    return None
+
+def get_batch_credentials(parent, missing):
+    """
+    Ask for the credentials of several servers in one dialog.
+
+    Args:
+        parent: Parent widget
+        missing: List of (server_id, server_config) without stored credentials
+
+    Returns:
+        dict: (username, password) by server id for the servers that were filled in
+    """
+    dialog = QDialog(parent)
+    dialog.setWindowTitle("Server Authentication")
+    dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
+    dialog.resize(560, min(260 + 70 * len(missing), 600))
+
+    layout = QVBoxLayout(dialog)
+
+    # Header
+    header = QLabel(f"Authentication Required\n{len(missing)} server(s)")
+    header.setStyleSheet("font-size: 14pt; font-weight: bold;")
+    header.setAlignment(Qt.AlignmentFlag.AlignCenter)
+    layout.addWidget(header)
+
+    # One row per server, scrolling beyond a few servers
+    rows = QWidget()
+    grid = QGridLayout(rows)
+    entries = []
+    for row, (server_id, server_config) in enumerate(missing):
+        grid.addWidget(QLabel(describe_credentials(server_config)), row * 2, 0, 1, 4)
+        username_entry = QLineEdit()
+        password_entry = QLineEdit()
+        password_entry.setEchoMode(QLineEdit.EchoMode.Password)
+        grid.addWidget(QLabel("Username"), row * 2 + 1, 0)
+        grid.addWidget(username_entry, row * 2 + 1, 1)
+        grid.addWidget(QLabel("Password"), row * 2 + 1, 2)
+        grid.addWidget(password_entry, row * 2 + 1, 3)
+        entries.append((server_id, username_entry, password_entry))
+
+    scroll_area = QScrollArea()
+    scroll_area.setWidgetResizable(True)
+    scroll_area.setWidget(rows)
+    layout.addWidget(scroll_area)
+
+    # Reuse the first server's credentials for all servers
+    shared_check = QCheckBox("Use the first credentials for all servers")
+    if len(missing) > 1:
+        layout.addWidget(shared_check)
+
+    def update_shared(checked):
+        for _, username_entry, password_entry in entries[1:]:
+            username_entry.setEnabled(not checked)
+            password_entry.setEnabled(not checked)
+
+    shared_check.toggled.connect(update_shared)
+
+    # Buttons
+    button_layout = QHBoxLayout()
+    cancel_btn = QPushButton("Cancel")
+    connect_btn = QPushButton("Connect")
+    connect_btn.setDefault(True)
+    button_layout.addWidget(cancel_btn)
+    button_layout.addWidget(connect_btn)
+    layout.addLayout(button_layout)
+
+    cancel_btn.clicked.connect(dialog.reject)
+    connect_btn.clicked.connect(dialog.accept)
+
+    result = {}
+    if dialog.exec() == QDialog.DialogCode.Accepted:
+        first_username, first_password = entries[0][1].text(), entries[0][2].text()
+        for server_id, username_entry, password_entry in entries:
+            if shared_check.isChecked():
+                username, password = first_username, first_password
+            else:
+                username, password = username_entry.text(), password_entry.text()
+            if username and password:
+                result[server_id] = (username, password)
+    return result
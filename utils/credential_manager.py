@@ -1,58 +1,214 @@
 import base64
+import hashlib
 import json
 import os
-from cryptography.fernet import Fernet, InvalidToken
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import logging
+import threading
+import time
 import traceback
 import uuid
 
-# Configure logging
-logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+KEYRING_SERVICE = "BC_Publisher"
+KEYRING_USERNAME = "credential_key"
+
+
+def _dpapi(data, protect):
+    """Encrypt or decrypt bytes with Windows DPAPI, bound to the current user account"""
+    import ctypes
+    from ctypes import wintypes
+
+    class DataBlob(ctypes.Structure):
+        _fields_ = [('cbData', wintypes.DWORD), ('pbData', ctypes.POINTER(ctypes.c_char))]
+
+    CRYPTPROTECT_UI_FORBIDDEN = 0x1
+    buffer = ctypes.create_string_buffer(data, len(data))
+    blob_in = DataBlob(len(data), ctypes.cast(buffer, ctypes.POINTER(ctypes.c_char)))
+    blob_out = DataBlob()
+    crypt32 = ctypes.windll.crypt32
+    function = crypt32.CryptProtectData if protect else crypt32.CryptUnprotectData
+    if not function(ctypes.byref(blob_in), None, None, None, None, CRYPTPROTECT_UI_FORBIDDEN, ctypes.byref(blob_out)):
+        raise ctypes.WinError()
+    try:
+        return ctypes.string_at(blob_out.pbData, blob_out.cbData)
+    finally:
+        ctypes.windll.kernel32.LocalFree(blob_out.pbData)
+
+
 class CredentialManager:
+    KDF_ITERATIONS = 480000
+    KDF_SALT = b'BC_Publisher_Static_Salt'
+
     def __init__(self):
-        """Initialize the credential manager."""
+        """Initialize the credential manager. The key is derived on first credential access."""
         self.credentials_file = "server_credentials.enc"
+        self.key_cache_file = "credential_key.cache"
+        # Publish threads may store credentials concurrently
+        self._lock = threading.RLock()
+        self._initialized = False
+        self._fernet = None
+        self._credentials = {}
+
+    def _ensure_initialized(self):
+        """Derive the key and load stored credentials on first use"""
+        if self._initialized:
+            return
+        with self._lock:
+            if self._initialized:
+                return
+            try:
+                logger.debug("Initializing credential manager")
+                # cryptography is imported on first use to keep application startup fast
+                from cryptography.fernet import Fernet
+                self._key = self._generate_key()
+                self._fernet = Fernet(self._key)
+                self._credentials = self._load_credentials()
+                logger.debug("Credential manager initialized successfully")
+            except Exception as e:
+                logger.error(f"Failed to initialize credential manager: {str(e)}\n{traceback.format_exc()}")
+                self._credentials = {}
+                # Remove potentially corrupted credentials file
+                if os.path.exists(self.credentials_file):
+                    try:
+                        os.remove(self.credentials_file)
+                        logger.info("Removed corrupted credentials file")
+                    except Exception as remove_error:
+                        logger.error(f"Failed to remove corrupted credentials file: {str(remove_error)}")
+            self._initialized = True
+
+    @staticmethod
+    def _get_machine_id():
+        """Get a stable machine identifier (MAC address based)"""
+        return str(uuid.getnode()).encode()
+
+    @staticmethod
+    def _get_keyring():
+        """The keyring module if it is installed and backed by an OS credential store, else None"""
         try:
-            logger.debug("Initializing credential manager")
-            self._key = self._generate_key()
-            self._fernet = Fernet(self._key)
-            self._credentials = self._load_credentials()
-            logger.debug("Credential manager initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize credential manager: {str(e)}\n{traceback.format_exc()}")
-            self._credentials = {}
-            # Remove potentially corrupted credentials file
-            if os.path.exists(self.credentials_file):
+            import keyring
+            from keyring.backends import fail
+            if isinstance(keyring.get_keyring(), fail.Keyring):
+                return None
+            return keyring
+        except Exception:
+            return None
+
+    def _get_cache_fernet(self, machine_id):
+        """
+        Get the cipher wrapping the key cache file on platforms without DPAPI.
+
+        It is derived from public inputs, so it only makes a cache copied to
+        another machine fail to decrypt; it does not keep the key secret from
+        anyone who can read the file. That rests on the file's 0600 mode.
+        """
+        from cryptography.fernet import Fernet
+        cache_key = hashlib.sha256(self.KDF_SALT + machine_id + str(self.KDF_ITERATIONS).encode()).digest()
+        return Fernet(base64.urlsafe_b64encode(cache_key))
+
+    def _protect(self, machine_id, key):
+        if os.name == 'nt':
+            return _dpapi(key, protect=True)
+        return self._get_cache_fernet(machine_id).encrypt(key)
+
+    def _unprotect(self, machine_id, data):
+        if os.name == 'nt':
+            return _dpapi(data, protect=False)
+        return self._get_cache_fernet(machine_id).decrypt(data)
+
+    def _load_cached_key(self, machine_id):
+        """
+        Load the derived key from the key cache, or None if unavailable.
+
+        The cache lives in the OS keyring (Windows Credential Manager, macOS
+        Keychain, Secret Service) when the keyring package is installed.
+        Otherwise it is a file readable only by the current user: protected
+        with DPAPI on Windows, and on other platforms by its 0600 mode alone,
+        so anyone able to read the file as this user recovers the key. The
+        trade-off is accepted because the key is itself derived from the MAC
+        address; the cache only saves the slow derivation.
+        """
+        from cryptography.fernet import Fernet, InvalidToken
+        keyring = self._get_keyring()
+        if keyring is not None:
+            try:
+                stored = keyring.get_password(KEYRING_SERVICE, f"{KEYRING_USERNAME}:{machine_id.decode()}")
+                if stored:
+                    Fernet(stored.encode())
+                    return stored.encode()
+            except Exception as e:
+                logger.warning(f"Ignoring key cache in the OS keyring: {str(e)}")
+        if not os.path.exists(self.key_cache_file):
+            return None
+        try:
+            with open(self.key_cache_file, 'rb') as f:
+                key = self._unprotect(machine_id, f.read())
+            # Validate that the cached value is a usable Fernet key
+            Fernet(key)
+            if keyring is not None:
+                # Move a cache written before the keyring was available
+                self._store_cached_key(machine_id, key)
+            return key
+        except (InvalidToken, ValueError, OSError) as e:
+            logger.warning(f"Ignoring invalid key cache: {str(e)}")
+            return None
+
+    def _store_cached_key(self, machine_id, key):
+        """Store the derived key in the OS keyring, or else in the key cache file"""
+        keyring = self._get_keyring()
+        if keyring is not None:
+            try:
+                keyring.set_password(KEYRING_SERVICE, f"{KEYRING_USERNAME}:{machine_id.decode()}", key.decode())
+                # Do not leave a weaker copy behind
+                if os.path.exists(self.key_cache_file):
+                    os.remove(self.key_cache_file)
+                return
+            except Exception as e:
+                logger.warning(f"Failed to store key in the OS keyring, using {self.key_cache_file}: {str(e)}")
+        temp_file = f"{self.key_cache_file}.tmp"
+        try:
+            if os.path.exists(temp_file):
+                # A leftover from another user or an older version may have a wider mode
+                os.remove(temp_file)
+            fd = os.open(temp_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self._protect(machine_id, key))
+            os.replace(temp_file, self.key_cache_file)
+        except OSError as e:
+            logger.warning(f"Failed to write key cache: {str(e)}")
+            if os.path.exists(temp_file):
                 try:
-                    os.remove(self.credentials_file)
-                    logger.info("Removed corrupted credentials file")
-                except Exception as remove_error:
-                    logger.error(f"Failed to remove corrupted credentials file: {str(remove_error)}")
+                    os.remove(temp_file)
+                except OSError:
+                    pass
 
     def _generate_key(self):
         """Generate a secure encryption key"""
         try:
-            logger.debug("Generating encryption key")
+            from cryptography.hazmat.primitives import hashes
+            from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
-            # Use a static salt
-            salt = b'BC_Publisher_Static_Salt'
+            logger.debug("Generating encryption key")
+            started = time.perf_counter()
 
             # Use a more stable machine identifier instead of just process ID
             # This ensures the same key is generated even across different runs
-            machine_id = str(uuid.getnode()).encode()  # Uses MAC address for stability
+            machine_id = self._get_machine_id()
+
+            key = self._load_cached_key(machine_id)
+            if key:
+                logger.debug(f"Encryption key loaded from cache in {(time.perf_counter() - started) * 1000:.1f} ms")
+                return key
 
             kdf = PBKDF2HMAC(
                 algorithm=hashes.SHA256(),
                 length=32,
-                salt=salt,
-                iterations=480000,
+                salt=self.KDF_SALT,
+                iterations=self.KDF_ITERATIONS,
             )
             key = base64.urlsafe_b64encode(kdf.derive(machine_id))
-            logger.debug("Encryption key generated successfully")
+            self._store_cached_key(machine_id, key)
+            logger.debug(f"Encryption key generated successfully in {(time.perf_counter() - started) * 1000:.1f} ms")
             return key
         except Exception as e:
             logger.error(f"Error generating encryption key: {str(e)}\n{traceback.format_exc()}")
@@ -60,6 +216,7 @@ class CredentialManager:
 
     def _load_credentials(self):
         """Load encrypted credentials from file"""
+        from cryptography.fernet import InvalidToken
         if not os.path.exists(self.credentials_file):
             logger.info(f"No credentials file found at {self.credentials_file}. Starting with empty credentials.")
             return {}
@@ -97,6 +254,7 @@ class CredentialManager:
     def _save_credentials(self):
         """Save credentials to encrypted file"""
         try:
+            self._ensure_initialized()
             logger.debug("Encrypting credentials data")
             encrypted_data = self._fernet.encrypt(json.dumps(self._credentials).encode())
 
@@ -124,12 +282,18 @@ class CredentialManager:
     def store_credentials(self, server_id, username, password):
         """Store credentials for a specific server"""
         try:
+            self._ensure_initialized()
             logger.debug(f"Storing credentials for server: {server_id}")
-            self._credentials[server_id] = {
+            new_creds = {
                 'username': username,
                 'password': password
             }
-            self._save_credentials()
+            with self._lock:
+                if self._credentials.get(server_id) == new_creds:
+                    logger.debug(f"Credentials for {server_id} unchanged, skipping save")
+                    return True
+                self._credentials[server_id] = new_creds
+                self._save_credentials()
             logger.info(f"Successfully stored credentials for server: {server_id}")
             return True
         except Exception as e:
@@ -138,6 +302,7 @@ class CredentialManager:
 
     def get_credentials(self, server_id):
         """Get credentials for a specific server"""
+        self._ensure_initialized()
         creds = self._credentials.get(server_id)
         if creds:
             logger.info(f"Retrieved credentials for server: {server_id}")
@@ -148,13 +313,15 @@ class CredentialManager:
     def remove_credentials(self, server_id):
         """Remove credentials for a specific server"""
         try:
-            if server_id in self._credentials:
-                logger.debug(f"Removing credentials for server: {server_id}")
-                del self._credentials[server_id]
-                self._save_credentials()
-                logger.info(f"Successfully removed credentials for server: {server_id}")
-                return True
-            return False
+            self._ensure_initialized()
+            with self._lock:
+                if server_id in self._credentials:
+                    logger.debug(f"Removing credentials for server: {server_id}")
+                    del self._credentials[server_id]
+                    self._save_credentials()
+                    logger.info(f"Successfully removed credentials for server: {server_id}")
+                    return True
+                return False
         except Exception as e:
             logger.error(f"Error removing credentials for {server_id}: {str(e)}\n{traceback.format_exc()}")
             return False
@@ -163,9 +330,11 @@ class CredentialManager:
         """Clear all stored credentials"""
         try:
             logger.debug("Clearing all credentials")
-            self._credentials = {}
-            if os.path.exists(self.credentials_file):
-                os.remove(self.credentials_file)
+            self._ensure_initialized()
+            with self._lock:
+                self._credentials = {}
+                if os.path.exists(self.credentials_file):
+                    os.remove(self.credentials_file)
             logger.info("Successfully cleared all credentials")
             return True
         except Exception as e:
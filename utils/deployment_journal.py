@@ -0,0 +1,228 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Per-target states, in the order a target moves through them
+QUEUED = 'queued'
+UPLOADING = 'uploading'
+SYNCED = 'synced'
+FAILED = 'failed'
+
+
+class Deployment:
+    """State of one deployment, rebuilt by replaying the journal"""
+
+    def __init__(self, deployment_id: str, record: Dict):
+        self.id = deployment_id
+        self.started = record.get('time')
+        self.app_path = record.get('app_path')
+        self.sha256 = record.get('sha256')
+        self.app = record.get('app')
+        self.configs: List[Dict] = record.get('configs', [])
+        self.states: Dict[str, str] = {}
+        self.messages: Dict[str, str] = {}
+        self.finished = False
+
+    def unfinished_configs(self) -> List[Dict]:
+        """Configurations whose last recorded state is not synced"""
+        return [config for config in self.configs if self.states.get(config['name']) != SYNCED]
+
+    def is_complete(self) -> bool:
+        return not self.unfinished_configs()
+
+
+class DeploymentJournal:
+    """
+    Append-only journal of deployments and per-target state transitions.
+
+    Each line is a JSON record carrying the deployment id and the artifact's
+    SHA-256, so after a crash or sleep the journal shows which targets
+    finished and a deployment can be resumed with only the unfinished
+    targets. A torn last line from a crash mid-write is ignored when replaying.
+
+    The file stays open for the whole deployment. Every record is flushed to
+    the OS before the call returns, which survives the process crashing, but
+    fsyncs are grouped: begin(), finish() and sync() fsync immediately and
+    per-target records at most every sync_interval seconds. A power loss can
+    therefore drop the last few transitions; those targets are published
+    again on resume and skipped if they are already up to date.
+    """
+
+    DEFAULT_PATH = "deployment_journal.jsonl"
+    DEFAULT_SYNC_INTERVAL = 1.0
+
+    def __init__(self, path: str = DEFAULT_PATH, sync_interval: float = DEFAULT_SYNC_INTERVAL):
+        self.path = path
+        self.sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._file = None
+        self._unsynced = False
+        self._last_sync = 0.0
+
+    def _ends_torn(self) -> bool:
+        """Whether the journal ends in a partial line left by a crash"""
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell() == 0:
+                    return False
+                f.seek(-1, os.SEEK_END)
+                return f.read(1) != b"\n"
+        except FileNotFoundError:
+            return False
+
+    def _append(self, *records: Dict, sync: bool = False) -> None:
+        """Write records, fsyncing if asked to or when sync_interval has passed"""
+        now = datetime.now().isoformat(timespec='seconds')
+        line = "".join(json.dumps({'time': now, **record}) + "\n" for record in records)
+        with self._lock:
+            if self._file is None:
+                # Terminate a torn line so it does not swallow this record
+                if self._ends_torn():
+                    line = "\n" + line
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(line)
+            self._file.flush()
+            self._unsynced = True
+            if sync or time.monotonic() - self._last_sync >= self.sync_interval:
+                self._sync()
+
+    def _sync(self) -> None:
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = False
+        self._last_sync = time.monotonic()
+
+    def sync(self) -> None:
+        """Fsync records written so far, e.g. between rollout waves"""
+        with self._lock:
+            self._sync()
+
+    def close(self) -> None:
+        """Fsync and close the journal file; it is reopened by the next record"""
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._sync()
+                finally:
+                    self._file.close()
+                    self._file = None
+
+    def begin(self, app_path: str, sha256: Optional[str], configs: List[Dict],
+              manifest: Optional[Dict] = None, deployment_id: Optional[str] = None) -> str:
+        """
+        Record the start of a deployment and queue its targets.
+
+        Returns:
+            str: The deployment id
+        """
+        deployment_id = deployment_id or f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:6]}"
+        app = {key: manifest[key] for key in ('id', 'name', 'publisher', 'version')} if manifest else None
+        self._append(
+            {
+                'event': 'started',
+                'deployment': deployment_id,
+                'sha256': sha256,
+                'app_path': os.path.abspath(app_path),
+                'app': app,
+                'configs': configs
+            },
+            *({'event': 'target', 'deployment': deployment_id, 'sha256': sha256, 'target': config['name'], 'state': QUEUED}
+              for config in configs),
+            sync=True
+        )
+        logger.debug(f"Deployment {deployment_id} started with {len(configs)} target(s)")
+        return deployment_id
+
+    def record(self, deployment_id: str, sha256: Optional[str], target: str, state: str, message: Optional[str] = None) -> None:
+        """Record a target's state transition"""
+        record = {'event': 'target', 'deployment': deployment_id, 'sha256': sha256, 'target': target, 'state': state}
+        if message:
+            record['message'] = message
+        self._append(record)
+
+    def finish(self, deployment_id: str, sha256: Optional[str]) -> None:
+        """Record that a deployment ran to the end (some targets may still have failed) and close the file"""
+        self._append({'event': 'finished', 'deployment': deployment_id, 'sha256': sha256}, sync=True)
+        self.close()
+
+    def replay(self) -> Dict[str, Deployment]:
+        """Rebuild all deployments from the journal, in start order"""
+        deployments: Dict[str, Deployment] = {}
+        if not os.path.exists(self.path):
+            return deployments
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping unreadable journal line {line_number} in {self.path}")
+                    continue
+                deployment_id = record.get('deployment')
+                if record.get('event') == 'started':
+                    deployments[deployment_id] = Deployment(deployment_id, record)
+                    continue
+                deployment = deployments.get(deployment_id)
+                if deployment is None:
+                    continue
+                if record.get('event') == 'target':
+                    deployment.states[record['target']] = record['state']
+                    if record.get('message'):
+                        deployment.messages[record['target']] = record['message']
+                elif record.get('event') == 'finished':
+                    deployment.finished = True
+        return deployments
+
+    def find(self, deployment_id: Optional[str] = None) -> Optional[Deployment]:
+        """Get a deployment by id, or the most recent one with unfinished targets"""
+        deployments = self.replay()
+        if deployment_id:
+            return deployments.get(deployment_id)
+        for deployment in reversed(list(deployments.values())):
+            if not deployment.is_complete():
+                return deployment
+        return None
+
+    def wrap(self, deployment_id: str, sha256: Optional[str], task: Callable[[Dict], tuple]) -> Callable[[Dict], tuple]:
+        """
+        Wrap an engine task so each target's upload and outcome are journaled.
+
+        Exceptions are journaled as failures and re-raised for the engine.
+        """
+        def journaled_task(config: Dict) -> tuple:
+            self.record(deployment_id, sha256, config['name'], UPLOADING)
+            try:
+                outcome = task(config)
+            except Exception as e:
+                self.record(deployment_id, sha256, config['name'], FAILED, f"Error: {str(e)}")
+                raise
+            self.record(deployment_id, sha256, config['name'], SYNCED if outcome[0] else FAILED, outcome[1])
+            return outcome
+
+        return journaled_task
+
+    def wrap_async(self, deployment_id: str, sha256: Optional[str],
+                   task: Callable[[Dict], Awaitable[tuple]]) -> Callable[[Dict], Awaitable[tuple]]:
+        """Like wrap(), for a coroutine function; records are written off the event loop"""
+        import asyncio
+
+        async def journaled_task(config: Dict) -> tuple:
+            await asyncio.to_thread(self.record, deployment_id, sha256, config['name'], UPLOADING)
+            try:
+                outcome = await task(config)
+            except Exception as e:
+                await asyncio.to_thread(self.record, deployment_id, sha256, config['name'], FAILED, f"Error: {str(e)}")
+                raise
+            await asyncio.to_thread(self.record, deployment_id, sha256, config['name'],
+                                    SYNCED if outcome[0] else FAILED, outcome[1])
+            return outcome
+
+        return journaled_task
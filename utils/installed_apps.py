@@ -0,0 +1,63 @@
+import logging
+import threading
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+def get_target_key(config: Dict) -> str:
+    """
+    Get the key of the extension inventory a configuration publishes into.
+
+    Configurations that point at the same server instance and tenant (or the
+    same cloud environment) share one inventory and one query.
+    """
+    if config['environmentType'].lower() == 'sandbox':
+        return f"sandbox:{config['tenant']}/{config['environmentName']}".lower()
+    return f"{config['server']}/{config['serverInstance']}/{config.get('tenant', 'default')}".lower()
+
+
+class InstalledAppsCache:
+    """
+    Remembers the installed extensions of each target for the current rollout.
+
+    Lookups for the same target share a single query: concurrent callers
+    wait for the first one instead of querying the server again.
+    """
+
+    def __init__(self):
+        self._apps: Dict[str, Dict[str, str]] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def get(self, config: Dict, query: Callable[[], Dict[str, str]]) -> Dict[str, str]:
+        """
+        Get the installed extensions of the configuration's target.
+
+        Args:
+            config: Target configuration
+            query: Returns {app_id: version} for the target; called once per target
+
+        Returns:
+            dict: Installed version by lower-case app id
+        """
+        key = get_target_key(config)
+        with self._key_lock(key):
+            if key not in self._apps:
+                self._apps[key] = {app_id.lower(): version for app_id, version in query().items()}
+                logger.debug(f"Found {len(self._apps[key])} installed extension(s) on {key}")
+            return self._apps[key]
+
+    def record(self, config: Dict, app_id: str, version: str) -> None:
+        """Note a successful publish so later lookups for the target see the new version"""
+        key = get_target_key(config)
+        with self._key_lock(key):
+            if key in self._apps:
+                self._apps[key][app_id.lower()] = version
@@ -1,3 +1,5 @@
+import json
+
 def parse_server_config(config_data):
     """
     Parse the server configuration JSON data.
@@ -103,4 +105,33 @@ def parse_single_config(config, index=1):
         raise ValueError(f"Configuration {index} ({config['name']}) is missing 'environmentType' field")
 
     # Convert to launch.json format and reparse
-    return parse_single_config({'type': 'al', **config}, index)
\ No newline at end of file
+    return parse_single_config({'type': 'al', **config}, index)
+
+def preprocess_json_text(json_text):
+    """
+    Preprocess JSON text to handle common formatting issues.
+    Args    :
+        json_text (str): Raw JSON text
+    Returns:
+        str: Preprocessed JSON text
+    """
+    # Remove trailing commas before arrays and objects
+    processed_text = json_text.replace(",]", "]").replace(",}", "}")
+    processed_text = processed_text.replace(",\n]", "\n]").replace(",\n}", "\n}")
+
+    try:
+        # Try to parse as JSON first
+        config = json.loads(processed_text)
+        # If it's already a valid configuration object (has version and configurations)
+        if isinstance(config, dict) and 'version' in config and 'configurations' in config:
+            return processed_text
+    except json.JSONDecodeError:
+        pass
+
+    # Check if we have multiple objects without array brackets
+    stripped = processed_text.strip()
+    if stripped.count('{') > 1 and not (stripped.startswith('[') and stripped.endswith(']')):
+        # Wrap in array brackets if not already wrapped and contains multiple objects
+        processed_text = f'[{processed_text}]'
+
+    return processed_text
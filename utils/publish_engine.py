@@ -0,0 +1,109 @@
+import logging
+import time
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterator, List, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+
+def get_host_key(config: Dict) -> str:
+    """Return the key used to group configurations that share a server host."""
+    if config['environmentType'].lower() == 'onprem':
+        server = config['server']
+        parsed = urlparse(server if '://' in server else f"//{server}")
+        return (parsed.hostname or server).lower()
+    return f"sandbox:{config.get('tenant', '')}".lower()
+
+
+class PublishEngine:
+    """
+    Runs one task per configuration on a bounded thread pool.
+
+    The engine caps the total number of in-flight tasks (max_workers) and the
+    number of in-flight tasks per server host (per_host_limit), so a rollout
+    across many tenants of the same instance does not overload that instance.
+    Results are yielded in completion order.
+    """
+
+    DEFAULT_MAX_WORKERS = 8
+    DEFAULT_PER_HOST_LIMIT = 2
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, per_host_limit: int = DEFAULT_PER_HOST_LIMIT):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if per_host_limit < 1:
+            raise ValueError("per_host_limit must be at least 1")
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+
+    def run(self, configs: List[Dict], task: Callable[[Dict], Tuple]) -> Iterator[Dict]:
+        """
+        Run task(config) for every configuration and yield results as they complete.
+
+        Args:
+            configs: Configurations to process
+            task: Callable returning a (success, message) tuple for one configuration,
+                optionally followed by a dict of extra result fields
+
+        Yields:
+            dict: Result with 'config', 'success', 'message' and 'elapsed' keys,
+            plus any extra fields returned by the task
+        """
+        pending: Dict[str, deque] = {}
+        for config in configs:
+            pending.setdefault(get_host_key(config), deque()).append(config)
+
+        active_per_host: Dict[str, int] = {host: 0 for host in pending}
+        in_flight = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="publish") as executor:
+
+            def dispatch():
+                # Round-robin over hosts so one large host does not starve the others
+                while len(in_flight) < self.max_workers:
+                    submitted = False
+                    for host, queue in pending.items():
+                        if len(in_flight) >= self.max_workers:
+                            break
+                        if queue and active_per_host[host] < self.per_host_limit:
+                            config = queue.popleft()
+                            active_per_host[host] += 1
+                            future = executor.submit(self._run_task, task, config)
+                            in_flight[future] = (host, config)
+                            submitted = True
+                    if not submitted:
+                        break
+
+            dispatch()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host, config = in_flight.pop(future)
+                    active_per_host[host] -= 1
+                    yield future.result()
+                dispatch()
+
+    @staticmethod
+    def _run_task(task: Callable[[Dict], Tuple], config: Dict) -> Dict:
+        """Run a single task, converting exceptions into failed results."""
+        started = time.monotonic()
+        details = {}
+        try:
+            outcome = task(config)
+            success, message = outcome[0], outcome[1]
+            if len(outcome) > 2:
+                details = outcome[2]
+        except Exception as e:
+            logger.error(f"Task for {config['name']} raised: {str(e)}\n{traceback.format_exc()}")
+            success, message = False, f"Error: {str(e)}"
+        result = {
+            'config': config,
+            'success': success,
+            'message': message,
+            'elapsed': time.monotonic() - started
+        }
+        result.update(details)
+        return result
@@ -0,0 +1,224 @@
+import logging
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.app_package import read_app_manifest
+from utils.app_publisher import AppPublisher
+from utils.artifact_hash import get_artifact_hasher
+from utils.async_engine import AsyncPublishEngine
+from utils.credential_broker import get_server_id, needs_credentials
+from utils.deployment_journal import FAILED, Deployment, DeploymentJournal
+from utils.installed_apps import InstalledAppsCache
+from utils.publish_engine import PublishEngine
+from utils.retry_policy import RetryBudget, RetryPolicy
+from utils.rollout_scheduler import RolloutScheduler
+
+logger = logging.getLogger(__name__)
+
+# GUI rollouts to more targets than this run on the async engine
+LARGE_FLEET_SIZE = 100
+
+
+def create_engine(target_count: int, max_workers: int = PublishEngine.DEFAULT_MAX_WORKERS,
+                  per_host_limit: int = PublishEngine.DEFAULT_PER_HOST_LIMIT):
+    """
+    Pick the engine for a rollout started from a GUI.
+
+    Large fleets run on AsyncPublishEngine, whose own loop thread bridges
+    the results to the Tk or Qt worker; targets waiting for their host then
+    hold no thread. Smaller selections keep max_workers threads.
+    """
+    if target_count > LARGE_FLEET_SIZE:
+        return AsyncPublishEngine(AsyncPublishEngine.DEFAULT_MAX_CONCURRENCY, per_host_limit)
+    return PublishEngine(max_workers, per_host_limit)
+
+
+class PublishPipeline:
+    """
+    Publishes one app file to many targets; shared by the GUIs and the CLI.
+
+    begin() reads the app's manifest and SHA-256 and starts (or resumes) a
+    journaled deployment. run() then publishes to every target on the given
+    engine, retrying transient failures within a budget shared by the whole
+    deployment, optionally in rollout waves, and yields each result as the
+    engine does. Front ends only resolve credentials and display progress.
+    """
+
+    def __init__(self, app_file_path: str, engine=None, journal: Optional[DeploymentJournal] = None,
+                 force: bool = False, max_attempts: int = RetryPolicy.DEFAULT_MAX_ATTEMPTS,
+                 retry_budget: Optional[int] = None, canary_size: Optional[int] = None,
+                 wave_growth: float = RolloutScheduler.DEFAULT_GROWTH,
+                 max_failure_rate: float = RolloutScheduler.DEFAULT_MAX_FAILURE_RATE,
+                 credential_manager=None, on_event: Optional[Callable[[Dict], None]] = None):
+        """
+        Args:
+            app_file_path: The .app file to publish
+            engine: PublishEngine or AsyncPublishEngine; a default PublishEngine if omitted
+            journal: Deployment journal; the default journal file if omitted
+            force: Publish even to targets that already run this version
+            max_attempts: Attempts per target for transient failures
+            retry_budget: Retries across all targets; scaled to the number of targets if omitted
+            canary_size: Stage the rollout, starting with this many targets; all at once if None
+            wave_growth: Size of each wave relative to the previous one
+            max_failure_rate: Abort the remaining waves when more of a wave fails
+            credential_manager: Stores credentials that published successfully; not stored if None
+            on_event: Called with rollout events ('wave', 'aborted') on the publishing thread
+        """
+        self.app_file_path = app_file_path
+        self.engine = engine or PublishEngine()
+        self.journal = journal or DeploymentJournal()
+        self.force = force
+        self.max_attempts = max_attempts
+        self.retry_budget = retry_budget
+        self.canary_size = canary_size
+        self.wave_growth = wave_growth
+        self.max_failure_rate = max_failure_rate
+        self.credential_manager = credential_manager
+        self.on_event = on_event
+        self.installed_apps = InstalledAppsCache()
+        self.manifest = None
+        self.digest = None
+        self.deployment_id = None
+        self.budget = None
+        self.aborted = False
+        # Targets published even if up to date because they cannot report their version
+        self.unchecked = 0
+
+    def begin(self, configs: List[Dict], deployment: Optional[Deployment] = None) -> str:
+        """
+        Read the app, then start a deployment to configs or resume the given one.
+
+        Raises:
+            ValueError: If the app file changed since the resumed deployment started
+
+        Returns:
+            str: The deployment id
+        """
+        self.manifest = self._read_manifest()
+        # Usually finished already: the GUIs start hashing when the file is dropped
+        self.digest = self._artifact_digest()
+        if self.manifest and not self.force:
+            self.unchecked = sum(not AppPublisher.can_check_installed_version(config) for config in configs)
+            if self.unchecked:
+                logger.warning(f"{self.unchecked} OnPrem target(s) cannot report their installed version (the "
+                               "automation API returns only major.minor); they are published even if already up to date")
+
+        if deployment is None:
+            self.deployment_id = self.journal.begin(self.app_file_path, self.digest, configs, self.manifest)
+        else:
+            # Resuming with a rebuilt artifact would mix versions across targets
+            if deployment.sha256 and deployment.sha256 != self.digest:
+                raise ValueError(f"{self.app_file_path} has changed since deployment {deployment.id} started "
+                                 f"(SHA-256 {self.digest}, expected {deployment.sha256})")
+            self.deployment_id = deployment.id
+            logger.info(f"Resuming deployment {self.deployment_id} with {len(configs)} unfinished target(s)")
+        return self.deployment_id
+
+    def fail(self, config: Dict, reason: str) -> None:
+        """Journal a target that cannot be published, e.g. for lack of credentials"""
+        self.journal.record(self.deployment_id, self.digest, config['name'], FAILED, reason)
+
+    def run(self, configs: List[Dict], credentials: Dict[str, Tuple[str, str]]) -> Iterator[Dict]:
+        """
+        Publish to every configuration and yield results as they complete.
+
+        The deployment is marked finished once all results have been yielded.
+        Stopping early leaves it unfinished, so it can be resumed.
+
+        Args:
+            configs: Configurations to publish to
+            credentials: (username, password) by server id
+        """
+        self.budget = (RetryBudget(self.retry_budget) if self.retry_budget is not None
+                       else RetryBudget.for_targets(len(configs)))
+        retry_policy = RetryPolicy(max_attempts=self.max_attempts, budget=self.budget)
+        if isinstance(self.engine, AsyncPublishEngine):
+            task = self.journal.wrap_async(self.deployment_id, self.digest,
+                                           self._async_task(credentials, retry_policy))
+        else:
+            task = self.journal.wrap(self.deployment_id, self.digest, self._task(credentials, retry_policy))
+
+        runner = self.engine
+        if self.canary_size is not None:
+            # Targets of aborted waves stay queued in the journal, so a resume picks them up
+            runner = RolloutScheduler(self.engine, self.canary_size, self.wave_growth, self.max_failure_rate,
+                                      on_event=self._on_rollout_event)
+        try:
+            yield from runner.run(configs, task)
+            self.aborted = runner is not self.engine and runner.aborted
+            self.journal.finish(self.deployment_id, self.digest)
+        finally:
+            self.journal.close()
+
+    def _on_rollout_event(self, event: Dict) -> None:
+        # Make the previous wave's outcomes durable before the next wave starts
+        self.journal.sync()
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def _read_manifest(self):
+        """Read the app's identity for the up-to-date check; without it every target is published"""
+        try:
+            return read_app_manifest(self.app_file_path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot read app manifest, publishing without version check: {str(e)}")
+            return None
+
+    def _artifact_digest(self):
+        """Get the app's SHA-256, attached to every publish result"""
+        try:
+            return get_artifact_hasher().digest(self.app_file_path)
+        except OSError as e:
+            logger.warning(f"Cannot hash app file: {str(e)}")
+            return None
+
+    @staticmethod
+    def _credentials_for(config: Dict, credentials: Dict) -> Tuple:
+        """(username, password, error message) for a configuration"""
+        username, password = credentials.get(get_server_id(config)) or (None, None)
+        if needs_credentials(config) and username is None:
+            return None, None, f"No credentials available for {get_server_id(config)}"
+        return username, password, None
+
+    def _task(self, credentials: Dict, retry_policy: RetryPolicy) -> Callable[[Dict], tuple]:
+        def publish(config: Dict) -> tuple:
+            username, password, error = self._credentials_for(config, credentials)
+            if error:
+                return False, error, {'attempts': 0}
+            logger.debug(f"Publishing to {get_server_id(config)}")
+            success, message, details = AppPublisher.publish_if_outdated(
+                self.app_file_path, config, username, password, manifest=self.manifest,
+                installed_apps=self.installed_apps, force=self.force, digest=self.digest,
+                retry_policy=retry_policy
+            )
+            self._published(config, username, password, success, message)
+            return success, message, details
+
+        return publish
+
+    def _async_task(self, credentials: Dict, retry_policy: RetryPolicy):
+        async def publish(config: Dict) -> tuple:
+            import asyncio
+
+            username, password, error = self._credentials_for(config, credentials)
+            if error:
+                return False, error, {'attempts': 0}
+            logger.debug(f"Publishing to {get_server_id(config)}")
+            success, message, details = await AppPublisher.publish_if_outdated_async(
+                self.app_file_path, config, username, password, manifest=self.manifest,
+                installed_apps=self.installed_apps, force=self.force, digest=self.digest,
+                retry_policy=retry_policy
+            )
+            await asyncio.to_thread(self._published, config, username, password, success, message)
+            return success, message, details
+
+        return publish
+
+    def _published(self, config: Dict, username: Optional[str], password: Optional[str],
+                   success: bool, message: str) -> None:
+        """Remember credentials that worked; runs on an engine thread"""
+        server_id = get_server_id(config)
+        if success and username and self.credential_manager is not None:
+            logger.debug(f"Successfully published to {server_id}, storing credentials")
+            self.credential_manager.store_credentials(server_id, username, password)
+        elif not success:
+            logger.warning(f"Failed to publish to {server_id}: {message}")
@@ -0,0 +1,263 @@
+import logging
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Failure kinds
+TRANSIENT = 'transient'        # connection refused or reset, timeouts
+SERVER_ERROR = 'server_error'  # HTTP 5xx
+THROTTLED = 'throttled'        # HTTP 429
+AUTH = 'auth'                  # HTTP 401 and 403
+VALIDATION = 'validation'      # other HTTP 4xx: the request or the app was rejected
+PERMANENT = 'permanent'        # anything else, e.g. a missing file or a certificate error
+UNCERTAIN = 'uncertain'        # the server may have acted on the request, e.g. a read timeout
+
+RETRYABLE = frozenset({TRANSIENT, SERVER_ERROR, THROTTLED})
+
+
+def _failure(kind: str, retry_after: Optional[float] = None) -> Dict:
+    return {'kind': kind, 'retry_after': retry_after}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    from email.utils import parsedate_to_datetime
+
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def classify_status(status: int) -> str:
+    """Classify a failed HTTP status code"""
+    if status == 429:
+        return THROTTLED
+    if status in (401, 403):
+        return AUTH
+    if status == 408:
+        return TRANSIENT
+    if status in (501, 505):
+        return PERMANENT
+    if status >= 500:
+        return SERVER_ERROR
+    return VALIDATION
+
+
+def classify_response(response) -> Dict:
+    """Classify a failed HTTP response; 429 and 503 may carry a Retry-After delay"""
+    return _failure(classify_status(response.status_code), parse_retry_after(response.headers.get('Retry-After')))
+
+
+def classify_exception(error: BaseException) -> Dict:
+    """
+    Classify an exception raised by an idempotent request, such as a probe or a token request.
+
+    Connection errors and timeouts are transient, wherever they happened:
+    repeating the request is harmless.
+    """
+    # Every entry point imports this module; socket and ssl are loaded on first use
+    import socket
+    import ssl
+
+    # requests exceptions can only occur once it has been imported; the raw
+    # socket probes never import it
+    requests = sys.modules.get('requests')
+    if requests is not None and isinstance(error, requests.RequestException):
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return classify_response(error.response)
+        if isinstance(error, requests.exceptions.SSLError):
+            return _failure(PERMANENT)
+        if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+            return _failure(TRANSIENT)
+        return _failure(PERMANENT)
+    if isinstance(error, ssl.SSLError):
+        return _failure(PERMANENT)
+    if isinstance(error, socket.gaierror):
+        # A temporary resolver failure is worth another try, an unknown host is not
+        return _failure(TRANSIENT if error.errno == socket.EAI_AGAIN else PERMANENT)
+    if isinstance(error, (ConnectionError, TimeoutError, socket.timeout)):
+        return _failure(TRANSIENT)
+    return _failure(PERMANENT)
+
+
+def classify_publish_response(response) -> Dict:
+    """
+    Classify a failed response to a publish request, which is not safe to repeat.
+
+    Only 429 and 503 (and 408) say the request was not processed; other
+    server errors may come from a proxy while the server is still syncing
+    the app, so they are uncertain instead of retryable.
+    """
+    failure = classify_response(response)
+    if failure['kind'] == SERVER_ERROR and response.status_code != 503:
+        failure['kind'] = UNCERTAIN
+    return failure
+
+
+def _failed_to_connect(error: BaseException) -> bool:
+    """Whether a requests ConnectionError happened before a connection was established"""
+    urllib3 = sys.modules.get('urllib3')
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return urllib3 is not None and isinstance(reason, urllib3.exceptions.NewConnectionError)
+
+
+def classify_publish_exception(error: BaseException) -> Dict:
+    """
+    Classify an exception raised by a publish request, which is not safe to repeat.
+
+    Only failures before the body was sent (a connect timeout, a refused
+    connection, an unresolvable host) are transient. A read timeout or a
+    reset after sending is uncertain: the server may still be syncing the
+    app, and publishing it again would start a second sync.
+    """
+    requests = sys.modules.get('requests')
+    if requests is not None and isinstance(error, requests.RequestException):
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return classify_publish_response(error.response)
+        if isinstance(error, requests.exceptions.SSLError):
+            return _failure(PERMANENT)
+        if isinstance(error, requests.ConnectTimeout) or (
+                isinstance(error, requests.ConnectionError) and _failed_to_connect(error)):
+            return classify_exception(error)
+        if isinstance(error, (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError)):
+            return _failure(UNCERTAIN)
+        return _failure(PERMANENT)
+    import socket
+
+    if isinstance(error, ConnectionRefusedError):
+        return _failure(TRANSIENT)
+    failure = classify_exception(error)
+    if failure['kind'] == TRANSIENT and not isinstance(error, socket.gaierror):
+        failure['kind'] = UNCERTAIN
+    return failure
+
+
+class RetryBudget:
+    """
+    Caps the number of retries across a whole deployment.
+
+    When many targets fail at once, typically during an outage, the budget
+    runs out and the remaining failures are reported instead of retried.
+    """
+
+    MIN_RETRIES = 10
+    RETRIES_PER_TARGET = 0.5
+
+    def __init__(self, max_retries: int):
+        self.max_retries = max_retries
+        self.used = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_targets(cls, target_count: int) -> "RetryBudget":
+        """Budget scaled to the number of targets"""
+        return cls(max(cls.MIN_RETRIES, int(target_count * cls.RETRIES_PER_TARGET)))
+
+    def try_spend(self) -> bool:
+        """Take one retry from the budget; False once it is exhausted"""
+        with self._lock:
+            if self.used >= self.max_retries:
+                return False
+            self.used += 1
+            return True
+
+
+class RetryPolicy:
+    """
+    Retries retryable failures with capped exponential backoff and full jitter.
+
+    The delay before retry n is drawn uniformly from [0, min(max_delay,
+    base_delay * 2 ** (n - 1))], so targets that failed together do not
+    retry in lockstep. A server's Retry-After is honoured up to max_delay.
+    """
+
+    DEFAULT_MAX_ATTEMPTS = 3
+    DEFAULT_BASE_DELAY = 1.0
+    DEFAULT_MAX_DELAY = 30.0
+
+    def __init__(self, max_attempts: int = DEFAULT_MAX_ATTEMPTS, base_delay: float = DEFAULT_BASE_DELAY,
+                 max_delay: float = DEFAULT_MAX_DELAY, budget: Optional[RetryBudget] = None,
+                 sleep: Callable[[float], None] = time.sleep, rng: Optional[random.Random] = None):
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self._sleep = sleep
+        self._rng = rng or random.Random()
+
+    def delay(self, retry: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before the given retry (1 for the first)"""
+        if retry_after is not None:
+            return min(self.max_delay, retry_after)
+        return self._rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (retry - 1)))
+
+    def run(self, attempt: Callable[[], Tuple[bool, str, Optional[Dict]]], name: str = "") -> Tuple[bool, str, int]:
+        """
+        Call attempt until it succeeds or fails for good.
+
+        Args:
+            attempt: Returns (success, message, failure) where failure is None
+                or a dict from classify_response/classify_exception
+            name: Target name for log messages
+
+        Returns:
+            tuple: (success, message, attempts)
+        """
+        attempts = 0
+        while True:
+            attempts += 1
+            success, message, failure = attempt()
+            if success or failure is None or failure['kind'] not in RETRYABLE:
+                return success, message, attempts
+            if attempts >= self.max_attempts:
+                return success, message, attempts
+            if self.budget is not None and not self.budget.try_spend():
+                logger.warning(f"Retry budget exhausted, not retrying {name}")
+                return success, message, attempts
+
+            delay = self.delay(attempts, failure.get('retry_after'))
+            logger.info(f"Attempt {attempts} for {name} failed ({failure['kind']}), retrying in {delay:.1f}s")
+            self._sleep(delay)
+
+
+    async def run_async(self, attempt: Callable[[], Awaitable[Tuple[bool, str, Optional[Dict]]]],
+                        name: str = "") -> Tuple[bool, str, int]:
+        """Like run(), for a coroutine function; waits without blocking the event loop"""
+        import asyncio
+
+        attempts = 0
+        while True:
+            attempts += 1
+            success, message, failure = await attempt()
+            if success or failure is None or failure['kind'] not in RETRYABLE:
+                return success, message, attempts
+            if attempts >= self.max_attempts:
+                return success, message, attempts
+            if self.budget is not None and not self.budget.try_spend():
+                logger.warning(f"Retry budget exhausted, not retrying {name}")
+                return success, message, attempts
+
+            delay = self.delay(attempts, failure.get('retry_after'))
+            logger.info(f"Attempt {attempts} for {name} failed ({failure['kind']}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+def describe_attempts(message: str, attempts: int) -> str:
+    """Append the attempt count to a result message when it took more than one"""
+    return f"{message} (after {attempts} attempts)" if attempts > 1 else message
@@ -0,0 +1,120 @@
+import logging
+import math
+from collections import deque
+from typing import Callable, Dict, Iterator, List, Optional
+
+from utils.publish_engine import get_host_key
+
+logger = logging.getLogger(__name__)
+
+
+def interleave_by_host(configs: List[Dict]) -> List[Dict]:
+    """Order configurations round-robin across hosts, so every wave spans as many hosts as it can"""
+    by_host: Dict[str, deque] = {}
+    for config in configs:
+        by_host.setdefault(get_host_key(config), deque()).append(config)
+    ordered = []
+    while by_host:
+        for key in list(by_host):
+            ordered.append(by_host[key].popleft())
+            if not by_host[key]:
+                del by_host[key]
+    return ordered
+
+
+def plan_waves(configs: List[Dict], canary_size: int = 1, growth: float = 2.0) -> List[List[Dict]]:
+    """
+    Split configurations into a canary wave followed by waves of increasing size.
+
+    Each wave is growth times the size of the previous one, and the last
+    wave takes whatever is left.
+    """
+    if canary_size < 1:
+        raise ValueError("canary_size must be at least 1")
+    if growth < 1:
+        raise ValueError("growth must be at least 1")
+
+    ordered = interleave_by_host(configs)
+    waves = []
+    start, size = 0, canary_size
+    while start < len(ordered):
+        waves.append(ordered[start:start + size])
+        start += size
+        size = max(size + 1, math.ceil(size * growth))
+    return waves
+
+
+class RolloutScheduler:
+    """
+    Publishes in waves: a canary subset first, then waves of increasing size.
+
+    Each wave runs on the given engine (PublishEngine or AsyncPublishEngine),
+    in parallel within the engine's limits, and must finish before the next
+    one starts. When more than max_failure_rate of a wave's targets fail, the
+    remaining waves are not started, so a bad build reaches only the targets
+    published so far.
+    """
+
+    DEFAULT_CANARY_SIZE = 1
+    DEFAULT_GROWTH = 2.0
+    DEFAULT_MAX_FAILURE_RATE = 0.2
+
+    def __init__(self, engine, canary_size: int = DEFAULT_CANARY_SIZE, growth: float = DEFAULT_GROWTH,
+                 max_failure_rate: float = DEFAULT_MAX_FAILURE_RATE,
+                 on_event: Optional[Callable[[Dict], None]] = None):
+        if not 0 <= max_failure_rate <= 1:
+            raise ValueError("max_failure_rate must be between 0 and 1")
+        self.engine = engine
+        self.canary_size = canary_size
+        self.growth = growth
+        self.max_failure_rate = max_failure_rate
+        self.on_event = on_event
+        self.aborted = False
+
+    def _notify(self, event: Dict) -> None:
+        if self.on_event is not None:
+            self.on_event(event)
+
+    def run(self, configs: List[Dict], task: Callable) -> Iterator[Dict]:
+        """
+        Run task for every configuration, wave by wave, and yield results as they complete.
+
+        Results carry a 'wave' number. After an abort, every target that was
+        not attempted is yielded as a failed result with 'aborted' set and
+        0 'attempts'.
+        """
+        waves = plan_waves(configs, self.canary_size, self.growth)
+        self.aborted = False
+        for number, wave in enumerate(waves, 1):
+            self._notify({'event': 'wave', 'wave': number, 'waves': len(waves), 'size': len(wave)})
+            failed = 0
+            for result in self.engine.run(wave, task):
+                result['wave'] = number
+                failed += not result['success']
+                yield result
+
+            failure_rate = failed / len(wave)
+            if failure_rate <= self.max_failure_rate or number == len(waves):
+                continue
+
+            remaining = [config for later_wave in waves[number:] for config in later_wave]
+            self.aborted = True
+            logger.warning(f"Rollout aborted after wave {number}/{len(waves)}: {failed} of {len(wave)} failed, "
+                           f"{len(remaining)} target(s) not published")
+            self._notify({'event': 'aborted', 'wave': number, 'waves': len(waves),
+                          'failure_rate': round(failure_rate, 3), 'remaining': len(remaining)})
+            message = (f"Not published: rollout aborted after wave {number}, "
+                       f"{failure_rate:.0%} of its targets failed (limit {self.max_failure_rate:.0%})")
+            for config in remaining:
+                yield {'config': config, 'success': False, 'message': message, 'elapsed': 0.0,
+                       'wave': None, 'aborted': True, 'attempts': 0}
+            return
+
+
+def describe_rollout_event(event: Dict) -> str:
+    """Format a scheduler event for the progress window"""
+    if event['event'] == 'aborted':
+        return (f"Rollout aborted after wave {event['wave']}/{event['waves']} "
+                f"({event['failure_rate']:.0%} failed), {event['remaining']} server(s) not published")
+    label = "Canary" if event['wave'] == 1 else "Wave"
+    return f"{label} {event['wave']}/{event['waves']}: {event['size']} server(s)"
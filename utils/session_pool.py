@@ -0,0 +1,77 @@
+import logging
+import threading
+from typing import Dict
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+
+class SessionPool:
+    """
+    Keeps one requests.Session per server host.
+
+    Reusing a session keeps the underlying connections alive, so repeated
+    publishes and connection tests against the same server skip the TCP and
+    TLS handshakes after the first request.
+    """
+
+    DEFAULT_POOL_CONNECTIONS = 4
+    DEFAULT_POOL_MAXSIZE = 8
+
+    def __init__(self, pool_connections: int = DEFAULT_POOL_CONNECTIONS, pool_maxsize: int = DEFAULT_POOL_MAXSIZE):
+        """
+        Args:
+            pool_connections: Number of connection pools each session caches
+            pool_maxsize: Maximum number of keep-alive connections per pool
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self._sessions: Dict[str, requests.Session] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        """Return scheme://host:port for a URL"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}".lower()
+
+    def get_session(self, url: str) -> requests.Session:
+        """Get the shared session for the host of the given URL, creating it if needed"""
+        key = self._host_key(url)
+        with self._lock:
+            session = self._sessions.get(key)
+            if session is None:
+                logger.debug(f"Creating HTTP session for {key}")
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=self.pool_connections,
+                    pool_maxsize=self.pool_maxsize
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[key] = session
+            return session
+
+    def close(self) -> None:
+        """Close all sessions and their pooled connections"""
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_session_pool() -> SessionPool:
+    """Get the process-wide session pool"""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = SessionPool()
+        return _default_pool
@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """
+    Caches OAuth access tokens by key (e.g. tenant and client id).
+
+    A token is reused until it is within refresh_margin seconds of expiring
+    (or half its lifetime, for short-lived tokens).
+    Each key has its own lock, so concurrent publishes to one tenant wait for
+    a single token acquisition while other tenants proceed independently.
+    """
+
+    DEFAULT_REFRESH_MARGIN = 300
+
+    def __init__(self, refresh_margin: float = DEFAULT_REFRESH_MARGIN, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            refresh_margin: Seconds before expiry at which a token is refreshed
+            clock: Monotonic time source
+        """
+        self.refresh_margin = refresh_margin
+        self._clock = clock
+        # key -> (token, time at which it should be refreshed)
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            lock = self._key_locks.get(key)
+            if lock is None:
+                lock = self._key_locks[key] = threading.Lock()
+            return lock
+
+    def _valid_token(self, key: str) -> Optional[str]:
+        cached = self._tokens.get(key)
+        if cached and self._clock() < cached[1]:
+            return cached[0]
+        return None
+
+    def get_token(self, key: str, acquire: Callable[[], Tuple[str, float]]) -> str:
+        """
+        Get a cached token, acquiring a new one if needed.
+
+        Args:
+            key: Cache key
+            acquire: Returns (access_token, expires_in_seconds); called with the key's lock held
+
+        Returns:
+            str: Access token
+        """
+        token = self._valid_token(key)
+        if token:
+            return token
+
+        with self._key_lock(key):
+            # Another thread may have refreshed the token while we waited
+            token = self._valid_token(key)
+            if token:
+                return token
+
+            start = self._clock()
+            token, expires_in = acquire()
+            expires_in = float(expires_in)
+            self._tokens[key] = (token, start + expires_in - min(self.refresh_margin, expires_in / 2))
+            logger.debug(f"Acquired token for {key}, valid for {int(expires_in)} seconds")
+            return token
+
+    def invalidate(self, key: str, token: Optional[str] = None) -> None:
+        """Drop the cached token for key, e.g. after it was rejected; only if it still matches token"""
+        with self._key_lock(key):
+            cached = self._tokens.get(key)
+            if cached and (token is None or cached[0] == token):
+                del self._tokens[key]
+
+    def clear(self) -> None:
+        """Drop all cached tokens"""
+        with self._lock:
+            self._tokens.clear()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_token_cache() -> TokenCache:
+    """Get the process-wide token cache"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = TokenCache()
+        return _default_cache
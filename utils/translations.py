@@ -11,6 +11,8 @@ TRANSLATIONS = {
     'parse_config': 'Konfiguration Parsen',
     'server_configs': 'Server-Konfigurationen',
     'publish_button': 'Auf ausgewählte Server veröffentlichen',
+    'force_publish': 'Auch veröffentlichen, wenn diese Version bereits installiert ist',
+    'staged_rollout': 'Gestaffelt veröffentlichen (erst Canary, Abbruch bei zu vielen Fehlern)',
     'config_editor': 'Konfigurationseditor',
     'apply_changes': 'Änderungen übernehmen',
     'open_editor': 'Editor öffnen',
@@ -30,6 +32,11 @@ TRANSLATIONS = {
     'col_type': 'Typ',
     'col_name': 'Name',
     'col_environment': 'Umgebung / Instanz',
+    'col_health': 'Status',
+
+    # Host health (circuit breaker) shown in the server list
+    'host_unavailable': 'Nicht erreichbar, pausiert',
+    'host_recovering': 'Wird erneut geprüft',
 
     # Messages
     'confirm_deployment':